@@ -0,0 +1,52 @@
+"""Benchmarks the encoding and rasterization throughput of the barcode generators.
+
+Usage:
+    python benchmarks/bench_barcode.py [--n N] [--length N] [--size W H]
+"""
+import argparse
+import random
+import string
+import time
+
+from wordcanvas import Code39Generator, Code128Generator
+
+
+def timeit(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--length", type=int, default=12)
+    parser.add_argument("--size", type=int, nargs=2, default=(512, 64))
+    args = parser.parse_args()
+    w, h = args.size
+
+    rng = random.Random(0)
+    texts = [
+        "".join(rng.choices(string.ascii_uppercase + string.digits, k=args.length))
+        for _ in range(args.n)
+    ]
+    for name, gen, encode in [
+        ("Code128", Code128Generator(), "_gen_code128"),
+        ("Code39", Code39Generator(), "_gen_code39"),
+    ]:
+        encode = getattr(gen, encode)
+        it = iter(texts * 2)
+        t_encode = timeit(lambda: encode(next(it)), args.n)
+        bars = encode(texts[0])
+        t_image = timeit(lambda: gen._gen_image(bars, w, h), args.n)
+        start = time.perf_counter()
+        gen.generate_batch(texts, w, h)
+        t_batch = (time.perf_counter() - start) / args.n
+        print(
+            f"{name:<10}encode {t_encode * 1e6:8.1f} us   "
+            f"image {t_image * 1e6:8.1f} us   batch {t_batch * 1e6:8.1f} us/img")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmarks the import cost of each public symbol of `wordcanvas`.
+
+Every symbol is imported in a fresh interpreter under `python -X importtime`,
+and the self times of all imported modules are summed. The heaviest
+third-party packages pulled in are listed too.
+
+Usage:
+    python benchmarks/bench_import_time.py [--repeat N] [--top N] [symbols ...]
+"""
+import argparse
+import subprocess
+import sys
+
+import wordcanvas
+
+
+def import_time(statement: str):
+    """Returns the total import time (s) of `statement` and the time per top-level package."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True)
+    total, packages = 0, {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        total += int(self_us)
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return total / 1e6, {k: v / 1e6 for k, v in packages.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("symbols", nargs="*", default=wordcanvas.__all__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=3)
+    args = parser.parse_args()
+
+    statements = [("import wordcanvas", "import wordcanvas")] + [
+        (name, f"from wordcanvas import {name}") for name in args.symbols]
+    for label, statement in statements:
+        runs = [import_time(statement) for _ in range(args.repeat)]
+        total, packages = min(runs, key=lambda run: run[0])
+        heaviest = sorted(
+            ((t, p) for p, t in packages.items() if p != "wordcanvas"),
+            reverse=True)[:args.top]
+        print(f"{label:<28}{total * 1e3:>9.1f} ms   " + ", ".join(
+            f"{p} {t * 1e3:.0f} ms" for t, p in heaviest))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmarks `WordCanvas` with a fixed `output_size`.
+
+Compares the default path (render at `font_size`, then resize and pad in
+`regularize_image`) with `render_at_output_size`, which renders at the font
+size whose raster fits the output box and pastes it without resampling.
+Each timing is the best of a few rounds, so background load only shows up
+as noise between runs.
+
+Usage:
+    python benchmarks/bench_output_size.py [--font PATH] [--repeat N]
+"""
+import argparse
+import time
+from pathlib import Path
+
+from wordcanvas import AlignMode, WordCanvas
+
+FONT_PATH = Path(__file__).parent.parent / "wordcanvas" / "fonts" / "NotoSansTC-Regular.otf"
+
+TEXTS = [
+    "Hello, World!",
+    "測試輸出文字生成器",
+    "你好！Hello, World! 1234567890",
+]
+
+OUTPUT_SIZES = [(32, 256), (64, 512), (128, 1024)]
+
+
+def bench(gen, repeat, rounds=5):
+    for text in TEXTS:
+        gen(text)  # Warm up caches
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for text in TEXTS:
+                gen(text)
+        best = min(best, time.perf_counter() - start)
+    return best / (repeat * len(TEXTS)) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", type=str, default=str(FONT_PATH))
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'output_size':<14}{'font_size':>10}{'direction':>10}{'default':>12}{'fitted':>12}  (ms/call)")
+    for output_size in OUTPUT_SIZES:
+        for font_size in (64, 128):
+            for direction in ("ltr", "ttb"):
+                kwargs = dict(
+                    font_path=args.font,
+                    font_size=font_size,
+                    direction=direction,
+                    output_size=output_size,
+                    align_mode=AlignMode.Center,
+                )
+                t_old = bench(WordCanvas(**kwargs), args.repeat)
+                t_new = bench(
+                    WordCanvas(render_at_output_size=True, **kwargs), args.repeat)
+                print(f"{str(output_size):<14}{font_size:>10}{direction:>10}{t_old:>12.3f}{t_new:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
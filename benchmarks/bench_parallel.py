@@ -0,0 +1,51 @@
+"""Benchmarks the throughput of `ParallelWordCanvas` against worker count.
+
+Usage:
+    python benchmarks/bench_parallel.py [--n N] [--chunk-size N] [--workers 1 2 4 ...]
+"""
+import argparse
+import os
+import time
+
+from wordcanvas import ParallelWordCanvas, RandomWordCanvas
+
+CONFIG = dict(
+    output_size=(64, 512),
+    random_text=True,
+    random_text_color=True,
+    random_background_color=True,
+    random_align_mode=True,
+    min_random_text_length=4,
+    max_random_text_length=16,
+)
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=4096)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument(
+        "--workers", type=int, nargs="+",
+        default=sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1))))
+    args = parser.parse_args()
+
+    gen = RandomWordCanvas(**CONFIG)
+    gen.generate_batch(16)  # Warm up caches
+    start = time.perf_counter()
+    gen.generate_batch(args.n // 8)
+    base = (args.n // 8) / (time.perf_counter() - start)
+    print(f"{'single process':<16}{base:>12.1f} img/s")
+
+    for workers in args.workers:
+        with ParallelWordCanvas(CONFIG, workers=workers, chunk_size=args.chunk_size) as gen:
+            gen(workers * args.chunk_size)  # Start the workers
+            start = time.perf_counter()
+            for _ in gen.iter_chunks(args.n):
+                pass
+            rate = args.n / (time.perf_counter() - start)
+        print(f"{f'{workers} workers':<16}{rate:>12.1f} img/s  (x{rate / base:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmarks the per-call cost of `text2image`.
+
+Compares `text2image` of a previous revision (by default the first commit,
+which measures with `textbbox` and then lays out again in `ImageDraw.text`)
+with the current single-pass rendering, and with the glyph cache enabled.
+The old module is read with `git show`, so the repository is needed. The
+glyph cache only applies to the basic layout, so that column uses the font
+loaded with `ImageFont.Layout.BASIC`.
+
+Usage:
+    python benchmarks/bench_text2image.py [--font PATH] [--repeat N] [--baseline REV]
+"""
+import argparse
+import subprocess
+import time
+import types
+from pathlib import Path
+
+from PIL import ImageFont
+
+from wordcanvas import load_truetype_font, text2image
+
+FONT_PATH = Path(__file__).parent.parent / "wordcanvas" / "fonts" / "NotoSansTC-Regular.otf"
+
+TEXTS = [
+    "Hello, World!",
+    "測試輸出文字生成器",
+    "你好！Hello, World! 1234567890",
+]
+
+
+def load_baseline(revision: str) -> types.ModuleType:
+    """Imports `text_image_renderer.py` as of `revision`, first commit if empty."""
+    root = Path(__file__).parent.parent
+    if not revision:
+        revision = subprocess.run(
+            ["git", "rev-list", "--max-parents=0", "HEAD"], cwd=root,
+            capture_output=True, text=True, check=True).stdout.split()[0]
+    source = subprocess.run(
+        ["git", "show", f"{revision}:wordcanvas/text_image_renderer.py"],
+        cwd=root, capture_output=True, text=True, check=True).stdout
+    module = types.ModuleType("baseline_text_image_renderer")
+    exec(compile(source, module.__name__, "exec"), module.__dict__)
+    return module
+
+
+def bench(fn, repeat, rounds=5):
+    """Returns the best time per call (ms) over `rounds` runs of `repeat` calls."""
+    fn()  # Warm up caches
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeat * 1e3)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", type=str, default=str(FONT_PATH))
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--baseline", type=str, default="")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+
+    font = load_truetype_font(args.font, size=args.size)
+    basic_font = load_truetype_font(
+        args.font, size=args.size, layout_engine=ImageFont.Layout.BASIC)
+
+    print(f"{'text':<32}{'stroke':>8}{'baseline':>12}{'current':>12}{'glyphs':>12}  (ms/call)")
+    for text in TEXTS:
+        for stroke_width in (0, 2):
+            t_old = bench(
+                lambda: baseline.text2image(text, font, stroke_width=stroke_width),
+                args.repeat)
+            t_new = bench(
+                lambda: text2image(text, font, stroke_width=stroke_width), args.repeat)
+            t_glyph = bench(
+                lambda: text2image(text, basic_font, stroke_width=stroke_width,
+                                   use_glyph_cache=True), args.repeat)
+            print(f"{text[:30]:<32}{stroke_width:>8}{t_old:>12.3f}{t_new:>12.3f}{t_glyph:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from wordcanvas import Code39Generator, Code128Generator
+
+
+@pytest.mark.parametrize("gen_cls", [Code128Generator, Code39Generator])
+@pytest.mark.parametrize("size", [(512, 64), (301, 20), (50, 8)])
+def test_barcode_image(gen_cls, size):
+    """
+    測試條碼影像直接輸出指定尺寸，且每一欄只有條或空白兩種顏色。
+    """
+    w, h = size
+    gen = gen_cls(color=(10, 20, 30))
+    img = gen("ABC123", w, h)
+    assert img.shape == (h, w, 3)
+    assert img.dtype == np.uint8
+    assert (img == img[:1]).all()
+    colors = {tuple(c) for c in img[0]}
+    assert colors == {(10, 20, 30), (255, 255, 255)}
+
+
+@pytest.mark.parametrize("gen_cls", [Code128Generator, Code39Generator])
+def test_barcode_generate_batch(gen_cls):
+    """
+    測試批次產生與逐張產生的結果一致。
+    """
+    gen = gen_cls()
+    texts = ["ABC", "HELLO123", "42"]
+    imgs = gen.generate_batch(texts, 256, 32)
+    assert imgs.shape == (3, 32, 256, 3)
+    for img, text in zip(imgs, texts):
+        np.testing.assert_array_equal(img, gen(text, 256, 32))
+    assert gen.generate_batch([], 256, 32).shape == (0, 32, 256, 3)
+
+
+def test_barcode_modules_layout():
+    """
+    測試寬度為模組數整數倍時，每個模組佔相同的像素數。
+    """
+    gen = Code128Generator()
+    encode = gen._gen_code128("AB")
+    img = gen._gen_image(encode, 3 * len(encode), 4)
+    bars = (img[0, :, 0] == 0).reshape(-1, 3)
+    assert (bars == bars[:, :1]).all()
+    assert "".join("1" if b else "0" for b in bars[:, 0]) == encode
+
+
+def test_barcode_encode():
+    """
+    測試 Code128 的起始、檢查與結束碼，以及無法編碼的字元會拋出例外。
+    """
+    gen = Code128Generator("Code128_B")
+    # Start B (104) + "A" (33)，檢查碼為 (104 + 33) % 103 = 34
+    assert gen._gen_code128("A") == (
+        "11010010000" + "10100011000" + "10001011000" + "1100011101011")
+    with pytest.raises(ValueError):
+        gen._gen_code128("測")
+    with pytest.raises(ValueError):
+        Code39Generator()._gen_code39("a")
+
+
+def test_code128_c_requires_digit_pairs():
+    """
+    測試 Code128_C 以兩位數字為一組編碼，奇數長度或非數字會拋出例外。
+    """
+    gen = Code128Generator("Code128_C")
+    assert gen._encode_values("1234") == [105, 12, 34]
+    for text in ["123", "12a4"]:
+        with pytest.raises(ValueError):
+            gen._gen_code128(text)
+
+
+def test_code128_auto():
+    """
+    測試自動模式會切換字集，得到不比單一字集更長的編碼。
+    """
+    auto = Code128Generator("Code128_Auto")
+    code_b = Code128Generator("Code128_B")
+
+    # 純數字使用 Code C
+    assert auto._encode_values("1234567890") == [105, 12, 34, 56, 78, 90]
+    # 英數混合時，在數字段切換為 Code C
+    assert auto._encode_values("AB123456") == [104, 33, 34, 99, 12, 34, 56]
+    # 控制字元以 Shift A 編碼
+    assert auto._encode_values("ab\x01c") == [104, 65, 66, 98, 65, 67]
+
+    rng = np.random.default_rng(0)
+    alphabet = list("0123456789ABCxyz-")
+    for _ in range(50):
+        text = "".join(rng.choice(alphabet, rng.integers(1, 20)))
+        assert len(auto._gen_code128(text)) <= len(code_b._gen_code128(text))
+    with pytest.raises(ValueError):
+        auto._gen_code128("測")
+    assert auto("A1234", 256, 32).shape == (32, 256, 3)
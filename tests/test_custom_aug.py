@@ -1,3 +1,4 @@
+import math
 from unittest.mock import patch
 
 import cv2
@@ -100,6 +101,48 @@ class TestShear:
         # 測試至少不拋錯、執行正常
         assert applied_count == 10
 
+    @pytest.mark.parametrize("angle", [-20, -11, 0, 10, 19])
+    def test_shear_border_value(self, monkeypatch, angle):
+        """
+        測試邊界以 border_value 填補，與背景同色時純色圖不會出現雜色邊緣。
+        """
+        monkeypatch.setattr("numpy.random.uniform", lambda *args: angle)
+        img = np.full((50, 60, 3), (10, 20, 30), dtype=np.uint8)
+        out = Shear(p=1.0, border_value=(10, 20, 30))(img)
+        np.testing.assert_array_equal(out, img)
+        # 呼叫時指定的顏色優先
+        out = Shear(p=1.0)(img, border_value=(10, 20, 30))
+        np.testing.assert_array_equal(out, img)
+
+    @pytest.mark.parametrize("angle", [10, -11])
+    def test_shear_geometry(self, monkeypatch, angle):
+        """
+        測試垂直線經 shear 後會傾斜，上下兩端的水平位移符合角度。
+        """
+        monkeypatch.setattr("numpy.random.uniform", lambda *args: angle)
+        img = np.zeros((60, 120, 3), dtype=np.uint8)
+        img[:, 60] = 255
+        out = Shear(p=1.0)(img)[..., 0].astype(float)
+        xs = np.arange(out.shape[1])
+        centers = (out * xs).sum(1) / out.sum(1)
+        sheared = angle + 1 if angle != -1 else angle
+        shift = math.tan(math.radians(sheared)) * (out.shape[0] - 1)
+        width_scale = 1 - abs(math.ceil(shift) if shift > 0 else math.floor(shift)) / 120
+        assert centers[-1] - centers[0] == pytest.approx(-shift / width_scale, abs=1)
+
+
+    @pytest.mark.parametrize("angle", [-20, -11, 10, 19])
+    def test_shear_narrow_image(self, monkeypatch, angle):
+        """
+        測試窄圖的位移超過寬度時會限制角度，影像不會左右翻轉。
+        """
+        monkeypatch.setattr("numpy.random.uniform", lambda *args: angle)
+        img = np.tile(
+            (np.arange(10) * 25).astype(np.uint8)[None, :, None], (60, 1, 3))
+        out = Shear(p=1.0)(img)
+        assert out.shape == img.shape
+        # 由左至右遞增的漸層經 shear 後仍維持遞增
+        assert np.all(np.diff(out[30, :, 0].astype(int)) > 0)
 
 # ----------------------------------------------------------------------------
 #                           Tests for ExampleAug
@@ -1,11 +1,17 @@
+import os
 from pathlib import Path
 
+import numpy as np
+
 import pytest
 from fontTools.ttLib import TTFont
 
-from wordcanvas.font_utils import (CHARACTER_RANGES, extract_font_info,
+from wordcanvas.font_utils import (CHARACTER_RANGES, CharsTable,
+                                   FontCharsTables, FontCoverageIndex,
+                                   extract_font_info,
                                    filter_characters_by_range,
                                    get_supported_characters,
+                                   get_supported_codepoints,
                                    is_character_supported, load_ttfont,
                                    remove_control_characters)
 
@@ -94,3 +100,88 @@ def test_extract_font_info_invalid_path():
 
 if __name__ == "__main__":
     pytest.main()
+
+
+def test_font_coverage_index(tmp_path):
+    """
+    測試字型覆蓋索引的結果與直接解析一致，且只會重建有變動的字型。
+    """
+    font_path = tmp_path / "OcrB-Regular.ttf"
+    font_path.write_bytes((FONT_ROOT / "OcrB-Regular.ttf").read_bytes())
+    index_path = tmp_path / "index.sqlite"
+
+    with FontCoverageIndex(index_path) as index:
+        chars = index.get_supported_characters(font_path)
+        assert chars == get_supported_characters(font_path)
+        assert index.get_metrics(font_path)["unitsPerEm"] > 0
+        assert (index.hits, index.misses) == (1, 1)
+
+    # 重新開啟索引後直接讀取，不需解析字型
+    with FontCoverageIndex(index_path) as index:
+        assert index.get_supported_characters(font_path) == chars
+        assert (index.hits, index.misses) == (1, 0)
+
+        # 只更新修改時間時，以內容雜湊判斷仍可沿用
+        stat = font_path.stat()
+        os.utime(font_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        index.get_supported_characters(font_path)
+        assert index.misses == 0
+
+        # 內容變動時重新解析
+        font_path.write_bytes((FONT_ROOT / "OcrB-Regular.ttf").read_bytes() + b"\0")
+        index.get_supported_characters(font_path)
+        assert index.misses == 1
+
+        font_path.unlink()
+        assert len(index) == 1
+        assert index.prune() == 1
+        assert len(index) == 0
+
+
+def test_filter_characters_by_range_matches_reference():
+    """
+    測試向量化的範圍篩選與逐字比對的結果一致，重疊範圍也不會重複。
+    """
+    font_path = FONT_ROOT / "OcrB-Regular.ttf"
+    ranges = {
+        "Digits": [(0x30, 0x39)],
+        "Overlap": [(0x41, 0x50), (0x48, 0x5A)],
+        "Empty": [],
+        "Outside": [(0x10FFF0, 0x10FFFF)],
+    }
+    cmap = TTFont(font_path).getBestCmap()
+    result = filter_characters_by_range(font_path, ranges)
+    for category, category_ranges in ranges.items():
+        expected = sorted(
+            chr(c) for c in cmap
+            if any(start <= c <= end for start, end in category_ranges))
+        assert result[category] == expected
+
+    chars = get_supported_characters(font_path, ranges)
+    assert chars == sorted(set(result["Digits"] + result["Overlap"]), key=ord)
+
+
+def test_chars_table_views():
+    """
+    測試以碼位陣列實作的字元表，行為與原本的 dict / list 相同。
+    """
+    font_path = FONT_ROOT / "OcrB-Regular.ttf"
+    chars = get_supported_characters(font_path)
+    codepoints = get_supported_codepoints(font_path)
+    assert codepoints.dtype == np.uint32
+    assert [chr(c) for c in codepoints] == chars
+
+    table = CharsTable(codepoints)
+    assert dict(table) == {char: i for i, char in enumerate(chars)}
+    assert len(table) == len(chars)
+    assert "A" in table and "測" not in table and "AB" not in table
+    with pytest.raises(KeyError):
+        table["測"]
+    np.testing.assert_array_equal(
+        table.indices([ord("A"), ord("測")]), [table["A"], -1])
+    assert len(CharsTable(np.zeros(0, np.uint32)).indices([65])) == 1
+
+    tables = FontCharsTables({"ocrb": codepoints})
+    assert tables["ocrb"] == chars
+    assert tables.codepoints("ocrb") is not None
+    assert list(tables) == ["ocrb"] and "ocrb" in tables
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+import pytest
+
+import wordcanvas
+
+
+def test_public_symbols_resolve():
+    """
+    測試所有公開名稱都能延遲載入，且出現在 `dir` 中。
+    """
+    for name in wordcanvas.__all__:
+        assert getattr(wordcanvas, name) is not None
+        assert name in dir(wordcanvas)
+    with pytest.raises(AttributeError):
+        wordcanvas.NotAName
+
+
+def test_import_does_not_load_heavy_dependencies():
+    """
+    測試只使用 `text2image` 時不會載入 albumentations、pandas 等重量級套件。
+    """
+    code = (
+        "import sys\n"
+        "from wordcanvas import text2image, get_supported_characters\n"
+        "heavy = ['albumentations', 'cv2', 'pandas', 'capybara', 'prettytable']\n"
+        "print([m for m in heavy if m in sys.modules])\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
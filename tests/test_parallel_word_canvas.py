@@ -0,0 +1,109 @@
+import gc
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from wordcanvas import ParallelWordCanvas
+
+CONFIG = dict(
+    output_size=(32, 128),
+    random_text=True,
+    random_text_color=True,
+    random_align_mode=True,
+    min_random_text_length=1,
+    max_random_text_length=4,
+    return_infos=True,
+)
+
+
+def test_parallel_word_canvas_output():
+    """
+    測試平行產生的影像會依序堆疊，且資訊欄位長度與影像數一致。
+    """
+    with ParallelWordCanvas(CONFIG, workers=2, chunk_size=3, seed=0) as gen:
+        imgs, infos = gen(10)
+        chunks = list(gen.iter_chunks(5))
+    assert imgs.shape == (10, 32, 128, 3)
+    assert imgs.dtype == np.uint8
+    assert len(infos["text"]) == 10
+    assert infos["text_color"].shape == (10, 3)
+    assert [len(chunk[0]) for chunk in chunks] == [3, 2]
+
+
+def test_parallel_word_canvas_reproducible():
+    """
+    測試相同種子的輸出與 worker 數量無關，且連續呼叫不會重複。
+    """
+    with ParallelWordCanvas(CONFIG, workers=1, chunk_size=4, seed=42) as gen:
+        imgs_a, infos_a = gen(8)
+        imgs_next, infos_next = gen(8)
+    with ParallelWordCanvas(CONFIG, workers=3, chunk_size=4, seed=42) as gen:
+        imgs_b, infos_b = gen(8)
+    np.testing.assert_array_equal(imgs_a, imgs_b)
+    assert infos_a["text"] == infos_b["text"]
+    assert infos_a["text"] != infos_next["text"]
+
+
+def test_parallel_word_canvas_reproducible_balanced():
+    """
+    測試開啟 balance_chars 時，輸出與字元計數仍與 worker 數量無關。
+    """
+    config = {**CONFIG, "balance_chars": True}
+    results = []
+    for workers in (1, 3):
+        with ParallelWordCanvas(config, workers=workers, chunk_size=2, seed=3) as gen:
+            calls = [gen(8), gen(8)]
+        results.append((calls, gen.char_sampler.counts))
+    (calls_a, counts_a), (calls_b, counts_b) = results
+    for (imgs_a, infos_a), (imgs_b, infos_b) in zip(calls_a, calls_b):
+        np.testing.assert_array_equal(imgs_a, imgs_b)
+        assert infos_a["text"] == infos_b["text"]
+    np.testing.assert_array_equal(counts_a, counts_b)
+
+
+def test_parallel_word_canvas_resumes_after_break():
+    """
+    測試中途離開 iter_chunks 後，未取用的區塊會在下次呼叫重新產生。
+    """
+    with ParallelWordCanvas(CONFIG, workers=1, chunk_size=4, seed=7) as gen:
+        for first, _ in gen.iter_chunks(12):
+            break
+        imgs_a, infos_a = gen(8)
+        assert len(gen._free_slots) == len(gen._slots)
+    with ParallelWordCanvas(CONFIG, workers=1, chunk_size=4, seed=7) as gen:
+        expected_first, _ = gen(4)
+        imgs_b, infos_b = gen(8)
+    np.testing.assert_array_equal(first, expected_first)
+    np.testing.assert_array_equal(imgs_a, imgs_b)
+    assert infos_a["text"] == infos_b["text"]
+
+
+def test_parallel_word_canvas_requires_output_size():
+    with pytest.raises(ValueError, match="output_size"):
+        ParallelWordCanvas({"random_text": True}, workers=1)
+
+
+def test_parallel_word_canvas_merges_char_counts():
+    """
+    測試各 worker 的字元計數會合併回主行程。
+    """
+    config = {**CONFIG, "balance_chars": True}
+    with ParallelWordCanvas(config, workers=2, chunk_size=4, seed=0) as gen:
+        _, infos = gen(8)
+    num_chars = sum(len(text.replace("\n", "")) for text in infos["text"])
+    assert gen.char_sampler.counts.sum() == num_chars
+
+
+def test_parallel_word_canvas_released_without_close():
+    """
+    測試未呼叫 close 就釋放物件時，共享記憶體區塊仍會被清除。
+    """
+    gen = ParallelWordCanvas(CONFIG, workers=1, chunk_size=2, seed=0)
+    gen(2)
+    names = [slot.name for slot in gen._slots]
+    del gen
+    gc.collect()
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
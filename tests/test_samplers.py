@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from wordcanvas.samplers import AliasSampler, BalancedCharSampler
+
+
+def test_alias_sampler_distribution():
+    """
+    測試別名表抽樣的頻率與權重成正比，權重為零的類別不會被抽到。
+    """
+    weights = [1, 2, 3, 4, 0]
+    sampler = AliasSampler(weights)
+    assert len(sampler) == 5
+    idx = sampler.sample(200000, rng=np.random.default_rng(0))
+    freq = np.bincount(idx, minlength=5) / len(idx)
+    np.testing.assert_allclose(freq, np.array(weights) / 10, atol=0.005)
+    assert isinstance(sampler.sample(rng=np.random.default_rng(0)), int)
+    assert sampler.sample((2, 3)).shape == (2, 3)
+
+
+def test_alias_sampler_reproducible():
+    sampler = AliasSampler(np.random.default_rng(0).random(1000))
+    a = sampler.sample(100, rng=np.random.default_rng(1))
+    b = sampler.sample(100, rng=np.random.default_rng(1))
+    np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize("weights", [[], [0, 0], [1, -1], [1, np.nan], [[1, 2]]])
+def test_alias_sampler_invalid_weights(weights):
+    with pytest.raises(ValueError):
+        AliasSampler(weights)
+
+
+def test_balanced_char_sampler_balances_counts():
+    """
+    測試平衡抽樣會偏向出現次數較少的字元，且只從候選字元中抽樣。
+    """
+    sampler = BalancedCharSampler(6)
+    sampler.counts[:] = [1000, 0, 0, 0, 0, 0]
+    candidates = np.array([0, 1, 2])
+    idx = sampler.sample(candidates, 300, np.random.default_rng(0))
+    drawn = np.bincount(candidates[idx], minlength=6)
+    assert drawn[0] < 5
+    assert drawn[3:].sum() == 0
+    assert sampler.counts.sum() == 1300
+
+    # 逐次抽樣時，計數會趨於一致
+    sampler = BalancedCharSampler(4, strength=4.0)
+    rng = np.random.default_rng(0)
+    for _ in range(400):
+        sampler.sample(np.arange(4), 1, rng)
+    assert sampler.counts.max() - sampler.counts.min() <= 5
+
+
+def test_balanced_char_sampler_merge_and_state():
+    """
+    測試計數可跨行程合併，並可存取狀態。
+    """
+    a, b = BalancedCharSampler(3), BalancedCharSampler(3)
+    a.sample(np.arange(3), 10, np.random.default_rng(0))
+    b.sample(np.arange(3), 5, np.random.default_rng(1))
+    a.merge(b)
+    a.merge(np.array([1, 0, 0]))
+    assert a.counts.sum() == 16
+
+    c = BalancedCharSampler(3, strength=0.0)
+    c.load_state_dict(a.state_dict())
+    np.testing.assert_array_equal(c.counts, a.counts)
+    assert c.strength == a.strength
+    with pytest.raises(ValueError):
+        c.merge(np.zeros(4))
+    with pytest.raises(ValueError):
+        c.load_state_dict({"counts": np.zeros(2)})
+    with pytest.raises(ValueError):
+        BalancedCharSampler(3, strength=-1)
@@ -1,11 +1,19 @@
+import gc
+import weakref
 from pathlib import Path
 
 import numpy as np
 import pytest
-from PIL import ImageFont
+from PIL import Image, ImageDraw, ImageFont
 
-from wordcanvas.text_image_renderer import (_clamp_color, load_truetype_font,
-                                            text2image)
+from wordcanvas.text_image_renderer import (_MEASURE_CACHE, _MEASURE_DRAW,
+                                            FontPool, FontTable, GlyphCache,
+                                            _clamp_color, colorize_mask,
+                                            get_font_pool,
+                                            get_glyph_cache,
+                                            load_truetype_font, measure_text,
+                                            text2image, text2image_batch,
+                                            text2mask)
 
 FONT_ROOT = Path(__file__).parent.parent / "wordcanvas" / "fonts"
 
@@ -85,6 +93,19 @@ class TestLoadTrueTypeFont:
         assert font_info["font_path"] == str(sample_font_path)
         assert font_info["font_size"] == 18
 
+    def test_load_truetype_font_shared_by_pool(self, sample_font_path):
+        """
+        測試以不同形式的相同路徑載入時，會取得同一個字型物件。
+        """
+        font_a = load_truetype_font(str(sample_font_path), size=22)
+        font_b = load_truetype_font(
+            sample_font_path.parent / ".." / sample_font_path.parent.name
+            / sample_font_path.name, size=22)
+        assert font_a is font_b
+        assert load_truetype_font(sample_font_path, size=23) is not font_a
+        get_font_pool().discard(sample_font_path)
+        assert load_truetype_font(sample_font_path, size=22) is not font_a
+
     def test_load_truetype_font_invalid_source_type(self):
         """
         測試傳入不支援的類型，預期程式碼內若無保護，可能拋 IOError 或 TypeError。
@@ -229,18 +250,102 @@ class TestText2Image:
 
     def test_text2image_error_during_text_rendering(self, mocker, sample_font_path):
         """
-        模擬 PIL 在 textbbox 時出現錯誤，預期 text2image 會拋出 ValueError。
+        模擬 PIL 在 getmask2 時出現錯誤，預期 text2image 會拋出 ValueError。
         """
-        # mock PIL 的 textbbox 讓它直接拋錯
-        mock_draw = mocker.patch(
-            "PIL.ImageDraw.ImageDraw.textbbox", side_effect=Exception("Mock error"))
+        # mock PIL 的 getmask2 讓它直接拋錯
+        mock_render = mocker.patch(
+            "PIL.ImageFont.FreeTypeFont.getmask2", side_effect=Exception("Mock error"))
         with pytest.raises(ValueError, match="Error rendering text: 'Test'"):
             text2image(
                 text="Test",
                 font=sample_font_path,
                 return_infos=True
             )
-        mock_draw.assert_called_once()
+        mock_render.assert_called_once()
+
+    def test_text2image_single_layout_pass(self, mocker, sample_font_path):
+        """
+        單行文字只需一次排版：不應再呼叫 textbbox 量測。
+        """
+        mock_bbox = mocker.patch.object(
+            ImageDraw.ImageDraw, "textbbox")
+        img_arr, info = text2image(
+            text="Single pass",
+            font=sample_font_path,
+            return_infos=True
+        )
+        mock_bbox.assert_not_called()
+        assert img_arr.shape[:2] == info["bbox(wh)"][::-1]
+
+    def test_text2image_matches_draw_text(self, sample_font_path):
+        """
+        測試單次排版的結果與 ImageDraw.textbbox + ImageDraw.text 完全一致。
+        """
+        font = load_truetype_font(sample_font_path, size=32)
+        for stroke_width in (0, 2):
+            draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+            left, top, right, bottom = draw.textbbox(
+                (0, 0), "Hello 測試", font=font, stroke_width=stroke_width)
+            expected = Image.new("RGB", (right - left, bottom - top))
+            ImageDraw.Draw(expected).text(
+                (-left, -top), "Hello 測試", font=font, fill=(255, 255, 255),
+                stroke_width=stroke_width, stroke_fill=(255, 0, 0))
+            img_arr = text2image(
+                "Hello 測試", font=font, stroke_width=stroke_width,
+                stroke_fill=(255, 0, 0))
+            assert np.array_equal(img_arr, np.array(expected))
+
+    def test_measure_text_memoized(self, sample_font_path, mocker):
+        """
+        測試 measure_text 對相同字型檔與參數會重複使用量測結果。
+        """
+        font = load_truetype_font(sample_font_path, size=24)
+        bbox = measure_text("AB\nCD", font, spacing=4)
+        spy = mocker.spy(_MEASURE_DRAW, "textbbox")
+        # 另外載入的同一字型檔也應命中快取
+        other = ImageFont.truetype(str(sample_font_path), size=24)
+        assert measure_text("AB\nCD", other, spacing=4) == bbox
+        assert spy.call_count == 0
+        assert measure_text("AB\nCD", other, spacing=8) != bbox
+        assert spy.call_count == 1
+
+    def test_measure_text_does_not_keep_fonts_alive(self, sample_font_path):
+        """
+        測試量測快取不會持有字型物件，字型可被回收。
+        """
+        font = ImageFont.truetype(str(sample_font_path), size=23)
+        measure_text("AB", font)
+        ref = weakref.ref(font)
+        del font
+        gc.collect()
+        assert ref() is None
+
+    def test_font_pool_discard_drops_measurements(self, sample_font_path):
+        """
+        測試 FontPool.discard 會一併移除該字型檔的量測結果。
+        """
+        font = load_truetype_font(sample_font_path, size=24)
+        measure_text("AB", font)
+        path = str(Path(sample_font_path).resolve())
+        assert any(key[0] == path for key in _MEASURE_CACHE)
+        get_font_pool().discard(sample_font_path)
+        assert not any(key[0] == path for key in _MEASURE_CACHE)
+
+    def test_font_pool_discard_drops_linked_measurements(
+        self, sample_font_path, monkeypatch
+    ):
+        """
+        測試以相對路徑或符號連結開啟的字型，其量測結果也會被 discard 移除。
+        """
+        link = sample_font_path.parent / "link.ttf"
+        link.symlink_to(sample_font_path)
+        monkeypatch.chdir(sample_font_path.parent)
+        for font_path in (link, sample_font_path.name):
+            measure_text("AB", ImageFont.truetype(str(font_path), size=25))
+        path = str(Path(sample_font_path).resolve())
+        assert sum(key[0] == path for key in _MEASURE_CACHE) == 1
+        get_font_pool().discard(sample_font_path)
+        assert not any(key[0] == path for key in _MEASURE_CACHE)
 
 
 @pytest.mark.parametrize(
@@ -269,3 +374,273 @@ def test_text2image_color_clamping(text_color, bg_color, sample_font_path):
     for c in info["background_color"]:
         assert 0 <= c <= 255
     assert isinstance(img_arr, np.ndarray)
+
+
+# ----------------------------------------------
+#           Tests for FontPool
+# ----------------------------------------------
+class TestFontPool:
+    def test_font_pool_counters(self, sample_font_path):
+        """
+        測試重複取得相同字型時，hits 與 misses 計數正確。
+        """
+        pool = FontPool()
+        font = pool.get(sample_font_path, size=20)
+        assert pool.get(str(sample_font_path), size=20) is font
+        stats = pool.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert pool.nbytes == sample_font_path.stat().st_size
+        pool.clear()
+        assert len(pool) == 0 and pool.nbytes == 0
+
+    def test_font_pool_lru_eviction(self, sample_font_path):
+        """
+        測試超過記憶體上限時，最久未使用的字型會被淘汰。
+        """
+        pool = FontPool(max_bytes=1)
+        pool.get(sample_font_path, size=20)
+        pool.get(sample_font_path, size=30)
+        assert len(pool) == 1
+        assert pool.evictions == 1
+
+    def test_font_pool_reloads_changed_file(self, sample_font_path):
+        """
+        測試字型檔案被替換後，會重新載入而不是回傳舊的物件。
+        """
+        pool = FontPool()
+        font = pool.get(sample_font_path, size=20)
+        data = sample_font_path.read_bytes()
+        sample_font_path.write_bytes(data + b"\0")
+        assert pool.get(sample_font_path, size=20) is not font
+        assert len(pool) == 1
+        assert pool.nbytes == len(data) + 1
+
+
+# ----------------------------------------------
+#           Tests for FontTable
+# ----------------------------------------------
+class TestFontTable:
+    def test_font_table_is_lazy(self):
+        """
+        測試建立字型表時不會開啟字型，查詢時才載入並共用字型池。
+        """
+        table = FontTable(
+            {"ocrb": FONT_ROOT / "OcrB-Regular.ttf"}, size=24)
+        assert "ocrb" in table and len(table) == 1
+        assert list(table) == ["ocrb"]
+        assert table.num_open == 0
+        font = table["ocrb"]
+        assert font.size == 24
+        assert table["ocrb"] is font
+        assert table.num_open == 1
+        with pytest.raises(KeyError):
+            table["missing"]
+
+    def test_font_table_lru_eviction(self):
+        """
+        測試開啟的字型超過上限時，最久未使用的字型會被關閉並移出字型池。
+        """
+        table = FontTable(
+            {
+                "ocrb": FONT_ROOT / "OcrB-Regular.ttf",
+                "noto": FONT_ROOT / "NotoSansTC-Regular.otf",
+            },
+            size=17,
+            max_open_fonts=1,
+        )
+        font = table["ocrb"]
+        table["noto"]
+        assert table.num_open == 1
+        assert "ocrb" in table
+        # 被淘汰的字型也已移出字型池，再次查詢會重新載入
+        assert table["ocrb"] is not font
+
+        with pytest.raises(ValueError):
+            FontTable(max_open_fonts=0)
+
+
+# ----------------------------------------------
+#           Tests for GlyphCache
+# ----------------------------------------------
+class TestGlyphCache:
+    def test_glyph_cache_matches_pillow_layout(self, sample_font_path):
+        """
+        測試 basic layout 下，使用 glyph cache 組合的影像與 Pillow 直接繪製的結果逐像素相同。
+        """
+        fonts = [
+            load_truetype_font(
+                font_path, size=32, layout_engine=ImageFont.Layout.BASIC)
+            for font_path in (sample_font_path, FONT_ROOT / "OcrB-Regular.ttf")
+        ]
+        texts = ["Hello 測試", "각갂 ", " AV.Ta,", "”%Y!Œ”", "HNh”%”Łym"]
+        for font, text in [(font, text) for font in fonts for text in texts]:
+            for stroke_width in (0, 2):
+                img_ref = text2image(
+                    text, font=font, stroke_width=stroke_width)
+                img_glyph = text2image(
+                    text, font=font, stroke_width=stroke_width,
+                    use_glyph_cache=True)
+                assert np.array_equal(img_ref, img_glyph)
+
+    def test_glyph_cache_skips_raqm_layout(self, sample_font_path):
+        """
+        raqm 可能套用連字 (ligature) 與 GPOS 調整，glyph cache 不適用，結果應與 Pillow 相同。
+        """
+        font = load_truetype_font(sample_font_path, size=32)
+        cache = get_glyph_cache()
+        misses = cache.misses
+        img_ref = text2image("fi ffl", font=font)
+        img_glyph = text2image("fi ffl", font=font, use_glyph_cache=True)
+        assert np.array_equal(img_ref, img_glyph)
+        assert cache.misses == misses
+
+    def test_glyph_cache_counters(self, sample_font_path):
+        """
+        測試重複繪製相同字元時，hits 與 misses 計數正確。
+        """
+        font = load_truetype_font(sample_font_path, size=20)
+        cache = GlyphCache()
+        cache.get(font, "A")
+        cache.get(font, "A")
+        cache.get(font, "B", stroke_width=1)
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert cache.get(font, "B", stroke_width=1).stroke_mask is not None
+
+    def test_glyph_cache_lru_eviction(self, sample_font_path):
+        """
+        測試超過記憶體上限時，最久未使用的字元會被淘汰。
+        """
+        font = load_truetype_font(sample_font_path, size=20)
+        cache = GlyphCache(max_bytes=1)
+        cache.get(font, "A")
+        cache.get(font, "B")
+        assert len(cache) == 1
+        assert cache.evictions == 1
+        cache.clear()
+        assert len(cache) == 0 and cache.nbytes == 0
+
+    def test_glyph_cache_fallback_for_multiline(self, sample_font_path):
+        """
+        多行文字不適用 glyph cache，應回退到 Pillow 繪製並得到相同結果。
+        """
+        font = load_truetype_font(sample_font_path, size=20)
+        img_ref = text2image("AB\nCD", font=font)
+        img_glyph = text2image("AB\nCD", font=font, use_glyph_cache=True)
+        assert np.array_equal(img_ref, img_glyph)
+
+
+# ----------------------------------------------
+#           Tests for text2mask / colorize_mask
+# ----------------------------------------------
+class TestText2Mask:
+    @pytest.mark.parametrize("direction", ["ltr", "rtl", "ttb"])
+    @pytest.mark.parametrize("stroke_width", [0, 2])
+    def test_colorized_mask_matches_text2image(
+        self, direction, stroke_width, sample_font_path
+    ):
+        """
+        測試 colorize_mask(*text2mask(...)) 與 text2image 的結果完全一致。
+        """
+        font = load_truetype_font(sample_font_path, size=32)
+        colors = dict(
+            text_color=(200, 30, 60),
+            background_color=(10, 120, 240),
+            stroke_fill=(0, 255, 0),
+        )
+        img_ref = text2image(
+            "Hello 測試", font=font, direction=direction,
+            stroke_width=stroke_width, **colors)
+        fill, stroke = text2mask(
+            "Hello 測試", font=font, direction=direction,
+            stroke_width=stroke_width)
+        assert fill.ndim == 2 and fill.dtype == np.uint8
+        assert (stroke is None) == (stroke_width == 0)
+        assert np.array_equal(colorize_mask(fill, stroke, **colors), img_ref)
+
+    def test_text2mask_multiline(self, sample_font_path):
+        """
+        測試多行文字的遮罩上色後與 text2image 一致。
+        """
+        font = load_truetype_font(sample_font_path, size=20)
+        img_ref, infos_ref = text2image(
+            "AB\nCD", font=font, stroke_width=1, stroke_fill=(255, 0, 0),
+            return_infos=True)
+        fill, stroke, infos = text2mask(
+            "AB\nCD", font=font, stroke_width=1, return_infos=True)
+        img = colorize_mask(fill, stroke, stroke_fill=(255, 0, 0))
+        assert np.array_equal(img, img_ref)
+        assert infos["bbox(wh)"] == infos_ref["bbox(wh)"]
+        assert "text_color" not in infos
+
+    def test_colorize_mask_batched_colors(self, sample_font_path):
+        """
+        測試一次傳入多組顏色時，輸出為 (N, H, W, 3) 且每張都正確上色。
+        """
+        fill, _ = text2mask("Batch", font=sample_font_path, size=24)
+        text_colors = np.array([[255, 0, 0], [0, 255, 0], [0, 0, 255]])
+        imgs = colorize_mask(fill, text_color=text_colors,
+                             background_color=(300, -1, 128))
+        assert imgs.shape == (3, *fill.shape, 3)
+        for img, color in zip(imgs, text_colors):
+            expected = colorize_mask(
+                fill, text_color=tuple(color),
+                background_color=(255, 0, 128))
+            assert np.array_equal(img, expected)
+
+
+# ----------------------------------------------
+#           Tests for text2image_batch
+# ----------------------------------------------
+class TestText2ImageBatch:
+    @pytest.mark.parametrize("stroke_width", [0, 2])
+    def test_batch_matches_text2image(self, stroke_width, sample_font_path):
+        """
+        測試批次輸出的每一張都與 text2image 相同，其餘區域為背景色。
+        """
+        texts = ["Hello", "測試文字", "AB\nCD", ""]
+        colors = dict(
+            text_color=(200, 30, 60),
+            background_color=(10, 120, 240),
+            stroke_fill=(0, 255, 0),
+        )
+        imgs, widths, bboxes = text2image_batch(
+            texts, font=sample_font_path, size=24,
+            stroke_width=stroke_width, **colors)
+        assert imgs.dtype == np.uint8
+        assert imgs.shape[0] == len(texts) and imgs.shape[-1] == 3
+        assert widths.shape == (len(texts),)
+        assert bboxes.shape == (len(texts), 4)
+        for i, text in enumerate(texts):
+            img_ref, infos = text2image(
+                text, font=sample_font_path, size=24,
+                stroke_width=stroke_width, return_infos=True, **colors)
+            h, w = img_ref.shape[:2]
+            assert widths[i] == w
+            assert tuple(bboxes[i]) == infos["bbox(xyxy)"]
+            assert np.array_equal(imgs[i, :h, :w], img_ref)
+            assert (imgs[i, h:] == colors["background_color"]).all()
+            assert (imgs[i, :, w:] == colors["background_color"]).all()
+
+    def test_batch_fixed_size_and_masks(self, sample_font_path):
+        """
+        測試指定 height/width 時會裁切，mask_only 時回傳 (N, H, W) 遮罩。
+        """
+        texts = ["Hello", "A much longer text"]
+        masks, widths, _ = text2image_batch(
+            texts, font=sample_font_path, size=24,
+            height=16, width=40, mask_only=True)
+        assert masks.shape == (2, 16, 40)
+        assert widths[1] > 40
+
+    def test_batch_per_item_colors(self, sample_font_path):
+        """
+        測試每筆資料可使用不同的文字顏色。
+        """
+        text_colors = np.array([[255, 0, 0], [0, 0, 255]])
+        imgs, _, _ = text2image_batch(
+            ["I", "I"], font=sample_font_path, size=24,
+            text_color=text_colors)
+        assert imgs[0, ..., 0].max() == 255 and imgs[0, ..., 2].max() == 0
+        assert imgs[1, ..., 2].max() == 255 and imgs[1, ..., 0].max() == 0
@@ -0,0 +1,95 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from wordcanvas import CorpusTextSource, RandomWordCanvas
+
+LINES = ["Hello world", "", "今天天氣很好", "abc\tdef", "最後一行"]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / "corpus.txt"
+    path.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    return path
+
+
+def test_corpus_text_source_index(corpus, tmp_path):
+    """
+    測試行索引正確，且可快取到檔案並重複使用。
+    """
+    index_path = tmp_path / "corpus.npz"
+    source = CorpusTextSource(corpus, index_path=index_path, chunk_size=4)
+    assert len(source) == len(LINES)
+    assert [source.line(i) for i in range(len(source))] == LINES
+    assert index_path.exists()
+
+    cached = CorpusTextSource(corpus, index_path=index_path)
+    np.testing.assert_array_equal(cached.starts, source.starts)
+    source.close()
+    cached.close()
+
+
+def test_corpus_text_source_sample(corpus):
+    """
+    測試抽出的片段來自語料，長度不超過上限，且不含換行。
+    """
+    source = CorpusTextSource(corpus)
+    texts = source.sample([4] * 200, rng=np.random.default_rng(0))
+    joined = "\n".join(LINES).replace("\t", "")
+    for text in texts:
+        assert len(text) <= 4
+        assert "\n" not in text
+        assert text in joined
+    assert len(set(texts)) > 10
+
+    # 只接受字型支援的字元
+    codepoints = np.array(sorted(map(ord, "今天氣很好")), np.uint32)
+    texts = source.sample([3] * 50, np.random.default_rng(0), codepoints)
+    assert all(set(text) <= set("今天氣很好") for text in texts)
+
+
+def test_corpus_text_source_cjk_span_length(tmp_path):
+    """
+    測試多位元組字元的長行，靠近行尾的片段仍有完整長度。
+    """
+    line = "".join(chr(0x4E00 + i) for i in range(40))
+    path = tmp_path / "cjk.txt"
+    path.write_text(line + "\n", encoding="utf-8")
+    with CorpusTextSource(path) as source:
+        spans = [source._span(offset, 8) for offset in range(source.size)]
+    assert all(len(span) == 8 and span in line for span in spans)
+    assert spans[-1] == line[-8:]
+    assert spans[0] == line[:8]
+
+
+def test_corpus_text_source_pickle(corpus):
+    source = CorpusTextSource(corpus)
+    restored = pickle.loads(pickle.dumps(source))
+    assert restored.line(2) == LINES[2]
+
+
+def test_corpus_text_source_empty(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.touch()
+    with pytest.raises(ValueError):
+        CorpusTextSource(path)
+
+
+def test_random_word_canvas_text_source(corpus):
+    """
+    測試 `RandomWordCanvas` 可從語料抽樣文字。
+    """
+    rwc = RandomWordCanvas(
+        output_size=(32, 128),
+        random_text=True,
+        min_random_text_length=2,
+        max_random_text_length=6,
+        text_source=corpus,
+        return_infos=True,
+        seed=0,
+    )
+    _, infos = rwc.generate_batch(16)
+    joined = "\n".join(LINES).replace("\t", "")
+    assert all(text and text in joined for text in infos["text"])
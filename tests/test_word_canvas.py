@@ -1,9 +1,14 @@
+import gc
+import weakref
 from pathlib import Path
 
 import numpy as np
 import pytest
 
-from wordcanvas import AlignMode, OutputDirection, RandomWordCanvas, WordCanvas
+from PIL import ImageFont
+
+from wordcanvas import (AlignMode, OutputDirection, RandomWordCanvas,
+                        WordCanvas, get_glyph_cache)
 
 FONT_ROOT = Path(__file__).parent.parent / "wordcanvas" / "fonts"
 
@@ -63,6 +68,43 @@ def test_regularize_image():
     assert regularized_img.shape == (300, 300, 3)
 
 
+@pytest.mark.parametrize("direction", ["ltr", "ttb"])
+@pytest.mark.parametrize(
+    "align_mode, start",
+    [
+        (AlignMode.Left, 0),
+        (AlignMode.Right, 200),
+        (AlignMode.Center, 100),
+        (AlignMode.Scatter, 100),
+    ]
+)
+def test_regularize_image_placement(direction, align_mode, start):
+    """
+    測試單次縮放後文字在畫布中的位置符合對齊模式，且可重複使用 out 緩衝區。
+    """
+    wc = WordCanvas(output_size=(50, 300))
+    img = np.full((20, 40, 3), 255, dtype=np.uint8)
+    if direction == "ttb":
+        img = img.transpose(1, 0, 2)
+    out = np.zeros((300, 50, 3) if direction == "ttb" else (50, 300, 3),
+                   dtype=np.uint8)
+    result = wc.regularize_image(
+        img, direction=direction, align_mode=align_mode,
+        background_color=(1, 2, 3), out=out)
+    assert result is out
+    if direction == "ttb":
+        result = result.transpose(1, 0, 2)
+    text_cols = np.flatnonzero(result[..., 0].max(axis=0) == 255)
+    assert text_cols[0] == start and len(text_cols) == 100
+    assert (result[:, :start] == (1, 2, 3)).all()
+    assert (result[:, start + 100:] == (1, 2, 3)).all()
+
+    with pytest.raises(ValueError):
+        wc.regularize_image(
+            img, direction=direction, align_mode=align_mode,
+            background_color=(1, 2, 3), out=np.zeros((1, 1, 3), np.uint8))
+
+
 def test_gen_scatter_image():
     wc = WordCanvas(
         output_size=(300, 300),
@@ -73,6 +115,51 @@ def test_gen_scatter_image():
     assert scatter_image.dtype == np.uint8
 
 
+@pytest.mark.parametrize("direction", ["ltr", "ttb"])
+def test_gen_scatter_single_layout(mocker, direction):
+    """
+    測試 Scatter 模式只排版一次，且文字分散填滿整個輸出寬度。
+    """
+    import wordcanvas.word_canvas as word_canvas
+    spy = mocker.spy(word_canvas, "text2mask")
+    wc = WordCanvas(
+        font_path=FONT_ROOT / "NotoSansTC-Regular.otf",
+        output_size=(64, 512),
+        align_mode=AlignMode.Scatter,
+        direction=direction,
+        background_color=(0, 0, 0),
+        text_color=(255, 255, 255),
+    )
+    img = wc("測試 AB")
+    assert spy.call_count == 1
+    assert img.dtype == np.uint8
+    # 垂直排版的輸出會旋轉為直式
+    if direction == "ttb":
+        assert img.shape == (512, 64, 3)
+        img = img.transpose(1, 0, 2)
+    assert img.shape == (64, 512, 3)
+    # 首尾兩個字元分別貼齊兩側
+    cols = np.flatnonzero(img.max(axis=(0, 2)))
+    assert cols[0] < 64 and cols[-1] > 512 - 64
+
+    # mask_first 模式同樣支援 Scatter
+    img_mask_first = WordCanvas(
+        font_path=FONT_ROOT / "NotoSansTC-Regular.otf",
+        output_size=(64, 512),
+        align_mode=AlignMode.Scatter,
+        direction=direction,
+        background_color=(0, 0, 0),
+        text_color=(255, 255, 255),
+        mask_first=True,
+    )("測試 AB")
+    if direction == "ttb":
+        img_mask_first = img_mask_first.transpose(1, 0, 2)
+    assert np.abs(img_mask_first.astype(int) - img).max() <= 2
+
+    with pytest.raises(ValueError):
+        wc.gen_scatter_masks("測試\nAB", wc.font, direction, 0, 0)
+
+
 def test_call_method():
     wc = WordCanvas(
         font_path=FONT_ROOT / "NotoSansTC-Regular.otf",
@@ -86,6 +173,90 @@ def test_call_method():
     assert infos["text"] == text
 
 
+def test_mask_first_mode():
+    """
+    測試 mask_first 模式的輸出與預設模式幾乎一致，且相同文字只會繪製一次。
+    """
+    kwargs = dict(
+        font_path=FONT_ROOT / "NotoSansTC-Regular.otf",
+        output_size=(64, 256),
+        stroke_width=2,
+        text_color=(255, 0, 0),
+        background_color=(0, 0, 255),
+        stroke_fill=(0, 255, 0),
+        return_infos=True,
+    )
+    img_ref, infos_ref = WordCanvas(**kwargs)("測試 mask")
+    wc = WordCanvas(mask_first=True, **kwargs)
+    img, infos = wc("測試 mask")
+    assert img.shape == img_ref.shape
+    # 縮放在遮罩上進行，只允許四捨五入造成的微小差異
+    assert np.abs(img.astype(int) - img_ref).max() <= 2
+    assert infos["text_color"] == infos_ref["text_color"]
+    assert infos["stroke_fill"] == infos_ref["stroke_fill"]
+
+    wc.text_color = (0, 0, 0)
+    img2, _ = wc("測試 mask")
+    assert len(wc._mask_cache) == 1
+    assert not np.array_equal(img, img2)
+
+
+def test_mask_cache_does_not_keep_fonts_alive():
+    """
+    測試遮罩快取以字型檔為鍵，不會持有字型物件，且同一字型檔可共用快取。
+    """
+    wc = WordCanvas(output_size=(32, 128), mask_first=True)
+    font_path = str(FONT_ROOT / "OcrB-Regular.ttf")
+    font = ImageFont.truetype(font_path, size=32)
+    fill, _, _ = wc.gen_masks("ABC", font, "ltr", AlignMode.Left, 0, 4)
+    ref = weakref.ref(font)
+    del font
+    gc.collect()
+    assert ref() is None
+
+    other = ImageFont.truetype(font_path, size=32)
+    fill2, _, _ = wc.gen_masks("ABC", other, "ltr", AlignMode.Left, 0, 4)
+    assert len(wc._mask_cache) == 1
+    assert fill2 is fill
+
+
+def test_render_at_output_size():
+    """
+    測試 render_at_output_size 模式：輸出尺寸與預設模式一致，
+    文字以符合輸出框的字級繪製並直接貼上，不經縮放。
+    """
+    for font_size in [16, 128]:
+        wc = WordCanvas(
+            font_path=FONT_ROOT / "NotoSansTC-Regular.otf",
+            font_size=font_size,
+            output_size=(32, 256),
+            return_infos=True,
+        )
+        for direction in ["ltr", "ttb"]:
+            for align_mode in [AlignMode.Left, AlignMode.Right, AlignMode.Center]:
+                wc.direction = direction
+                wc.align_mode = align_mode
+                wc.render_at_output_size = False
+                img_ref, _ = wc("測試 Hello")
+                wc.render_at_output_size = True
+                img, infos = wc("測試 Hello")
+                assert img.shape == img_ref.shape
+                # 小字級會放大、大字級會縮小，字級以輸出框為準
+                assert 16 < infos["font_size_actual"] < 128
+
+                # 輸出應包含以相同字級直接繪製、未經縮放的文字
+                raw = WordCanvas(
+                    font_path=FONT_ROOT / "NotoSansTC-Regular.otf",
+                    font_size=infos["font_size_actual"],
+                    direction=direction,
+                )("測試 Hello")
+                raw_h, raw_w = raw.shape[:2]
+                assert raw_h <= img.shape[0] and raw_w <= img.shape[1]
+                windows = np.lib.stride_tricks.sliding_window_view(
+                    img, raw.shape)
+                assert (windows == raw).all(axis=(-3, -2, -1)).any()
+
+
 def test_output_direction():
     for direction in [OutputDirection.Remain, OutputDirection.Horizontal, OutputDirection.Vertical]:
         wc = WordCanvas(
@@ -225,3 +396,282 @@ def test_random_spacing_and_stroke():
     img, infos = rwc("Test")
     assert infos["spacing"] >= 1 and infos["spacing"] <= 10
     assert infos["stroke_width"] >= 1 and infos["stroke_width"] <= 5
+
+
+def test_generate_batch():
+    """
+    測試批次產生影像時會堆疊成 (N, H, W, 3)，且資訊以欄位形式回傳。
+    """
+    wc = WordCanvas(
+        font_path=FONT_ROOT / "NotoSansTC-Regular.otf",
+        output_size=(64, 256),
+        return_infos=True,
+    )
+    texts = ["Hello", "測試", "World!"]
+    imgs, infos = wc(texts=texts)
+    assert imgs.shape == (3, 64, 256, 3)
+    assert infos["text"] == texts
+    assert infos["text_color"].shape == (3, 3)
+    for img, text in zip(imgs, texts):
+        np.testing.assert_array_equal(img, wc(text)[0])
+
+    imgs, _ = wc.generate_batch(2, texts="Hello")
+    assert imgs.shape == (2, 64, 256, 3)
+    with pytest.raises(ValueError):
+        wc.generate_batch(2, texts=texts)
+    with pytest.raises(ValueError):
+        wc.generate_batch()
+
+
+def test_random_generate_batch():
+    """
+    測試隨機批次產生時，各參數在批次內一次抽樣且符合設定範圍。
+    """
+    rwc = RandomWordCanvas(
+        font_bank=FONT_ROOT,
+        output_size=(64, 256),
+        random_text=True,
+        random_text_color=True,
+        random_background_color=True,
+        random_align_mode=True,
+        random_spacing=True,
+        random_lines=True,
+        min_random_text_length=2,
+        max_random_text_length=6,
+        min_random_spacing=1,
+        max_random_spacing=5,
+        return_infos=True,
+    )
+    imgs, infos = rwc.generate_batch(16)
+    assert imgs.shape == (16, 64, 256, 3)
+    assert imgs.dtype == np.uint8
+    assert len(infos["text"]) == 16
+    for text, align_mode in zip(infos["text"], infos["align_mode"]):
+        assert 2 <= len(text.replace("\n", "")) <= 6
+        # 多行文字不會使用 Scatter 模式
+        if "\n" in text:
+            assert align_mode != AlignMode.Scatter
+    assert infos["background_color"].shape == (16, 3)
+    # Scatter 模式的資訊不含 spacing，該欄位以 None 補齊
+    assert all(1 <= s < 5 for s in infos["spacing"] if s is not None)
+
+
+def test_random_word_canvas_seed_and_sample():
+    """
+    測試相同種子會產生相同結果，且 sample(index) 與呼叫順序無關。
+    """
+    kwargs = dict(
+        font_bank=FONT_ROOT,
+        output_size=(32, 128),
+        random_text=True,
+        random_text_color=True,
+        random_align_mode=True,
+        return_infos=True,
+    )
+    gen_a = RandomWordCanvas(seed=123, **kwargs)
+    gen_b = RandomWordCanvas(seed=123, **kwargs)
+    img_a, infos_a = gen_a()
+    img_b, infos_b = gen_b()
+    np.testing.assert_array_equal(img_a, img_b)
+    assert infos_a["text"] == infos_b["text"]
+
+    # 先抽取其他樣本也不影響指定索引的結果
+    gen_b.sample(7)
+    img_a, infos_a = gen_a.sample(3)
+    img_b, infos_b = gen_b.sample(3)
+    np.testing.assert_array_equal(img_a, img_b)
+    assert infos_a["text"] == infos_b["text"]
+    assert gen_a.sample(4)[1]["text"] != infos_a["text"]
+
+    gen_rng = RandomWordCanvas(seed=np.random.default_rng(0), **kwargs)
+    with pytest.raises(ValueError):
+        gen_rng.sample(0)
+
+
+def test_random_font_bank_is_lazy():
+    """
+    測試字型庫只在抽中字型時才開啟，且開啟數量不超過 max_open_fonts。
+    """
+    rwc = RandomWordCanvas(
+        font_bank=FONT_ROOT,
+        output_size=(32, 128),
+        random_font=True,
+        random_text=True,
+        max_open_fonts=1,
+        return_infos=True,
+        seed=0,
+    )
+    assert len(rwc.font_table) == 2
+    assert rwc.font_table.num_open == 0
+    _, infos = rwc.generate_batch(8)
+    assert set(infos["font_name"]) <= set(rwc.font_table)
+    assert rwc.font_table.num_open == 1
+
+
+def test_random_word_canvas_glyph_cache():
+    """
+    測試 use_glyph_cache 預設以 basic layout 載入字型，產生時確實使用字形快取，
+    且 ttb 方向的文字仍可正常產生。
+    """
+    rwc = RandomWordCanvas(
+        font_bank=FONT_ROOT,
+        output_size=(32, 128),
+        random_font=True,
+        random_text=True,
+        random_direction=True,
+        random_align_mode=True,
+        use_glyph_cache=True,
+        return_infos=True,
+        seed=0,
+    )
+    assert rwc.layout_engine == ImageFont.Layout.BASIC
+    cache = get_glyph_cache()
+    cache.clear()
+    imgs, infos = rwc.generate_batch(32)
+    assert len(imgs) == 32
+    assert "ttb" in set(infos["direction"])
+    assert cache.stats()["misses"] > 0
+    rwc.generate_batch(32)
+    assert cache.stats()["hits"] > 0
+
+    # 明確指定 layout_engine 時沿用該設定，快取不會被使用
+    rwc = RandomWordCanvas(
+        random_text=True, output_size=(32, 128), use_glyph_cache=True,
+        layout_engine=ImageFont.Layout.RAQM, seed=0)
+    cache.clear()
+    rwc.generate_batch(8)
+    assert cache.stats()["misses"] == 0
+
+
+def test_font_index(tmp_path):
+    """
+    測試字型覆蓋索引可指定路徑或關閉，且字元表與直接解析一致。
+    """
+    index_path = tmp_path / "index.sqlite"
+    wc_ref = WordCanvas(
+        font_path=FONT_ROOT / "OcrB-Regular.ttf", font_index=False)
+    wc = WordCanvas(
+        font_path=FONT_ROOT / "OcrB-Regular.ttf", font_index=index_path)
+    assert index_path.is_file()
+    assert wc.chars_table == wc_ref.chars_table
+
+    rwc_ref = RandomWordCanvas(
+        font_bank=FONT_ROOT, random_font=True, random_font_weight=True,
+        font_index=False)
+    rwc = RandomWordCanvas(
+        font_bank=FONT_ROOT, random_font=True, random_font_weight=True,
+        font_index=index_path)
+    assert rwc.chars_table == rwc_ref.chars_table
+    assert rwc.weighted_font == rwc_ref.weighted_font
+
+
+def test_font_index_default_location(tmp_path, monkeypatch):
+    """
+    測試預設的字型覆蓋索引寫入使用者快取目錄，而非字型所在的目錄。
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    before = set(FONT_ROOT.iterdir())
+    WordCanvas(font_path=FONT_ROOT / "OcrB-Regular.ttf")
+    assert (tmp_path / "wordcanvas" / "font_index.sqlite").is_file()
+    assert set(FONT_ROOT.iterdir()) == before
+
+
+def test_parallel_font_bank_scan(tmp_path):
+    """
+    測試多行程掃描字型庫的結果與逐一掃描完全相同。
+    """
+    kwargs = dict(
+        font_bank=FONT_ROOT,
+        random_font=True,
+        random_font_weight=True,
+        block_font_list=["NotExist"],
+        font_index=False,
+    )
+    rwc_ref = RandomWordCanvas(**kwargs)
+    rwc = RandomWordCanvas(num_scan_workers=2, **kwargs)
+    assert list(rwc.font_table) == list(rwc_ref.font_table)
+    assert rwc.chars_table == rwc_ref.chars_table
+    assert rwc.weighted_font == rwc_ref.weighted_font
+    assert rwc.font_chars_tables == rwc_ref.font_chars_tables
+
+    rwc = RandomWordCanvas(
+        num_scan_workers=2, **{**kwargs, "font_index": tmp_path / "index.sqlite"})
+    assert rwc.chars_table == rwc_ref.chars_table
+
+
+@pytest.mark.parametrize("policy", ["raise", "best", "random"])
+def test_font_coverage_policy(policy):
+    """
+    測試指定文字時只會抽到支援全部字元的字型，並依策略處理無字型支援的情況。
+    """
+    rwc = RandomWordCanvas(
+        font_bank=FONT_ROOT,
+        output_size=(32, 128),
+        random_font=True,
+        font_coverage_policy=policy,
+        return_infos=True,
+        seed=0,
+    )
+    # OcrB 不支援中文，只能選到 NotoSansTC
+    _, infos = rwc.generate_batch(texts=["測試 A"] * 16)
+    assert set(infos["font_name"]) == {"NotoSansTC-Regular"}
+    _, infos = rwc.generate_batch(texts=["AB\nC"] * 32)
+    assert set(infos["font_name"]) == set(rwc.font_table)
+
+    # 兩個字型都不支援泰文
+    if policy == "raise":
+        with pytest.raises(ValueError, match="No font in the bank"):
+            rwc("測ก")
+    elif policy == "best":
+        _, infos = rwc.generate_batch(texts=["測ก"] * 16)
+        assert set(infos["font_name"]) == {"NotoSansTC-Regular"}
+    else:
+        _, infos = rwc.generate_batch(texts=["測ก"] * 32)
+        assert set(infos["font_name"]) == set(rwc.font_table)
+
+
+def test_char_and_font_weights():
+    """
+    測試可指定字元與字型的抽樣權重，權重為零者不會被抽到。
+    """
+    from wordcanvas import get_supported_characters
+    chars = get_supported_characters(FONT_ROOT / "OcrB-Regular.ttf")
+    char_weights = {char: 0 for char in chars}
+    char_weights.update({"A": 1, "B": 3})
+    rwc = RandomWordCanvas(
+        font_bank=FONT_ROOT,
+        output_size=(32, 128),
+        random_font=True,
+        random_text=True,
+        font_weights={"NotoSansTC-Regular": 0},
+        char_weights=char_weights,
+        return_infos=True,
+        seed=0,
+    )
+    _, infos = rwc.generate_batch(32)
+    assert set(infos["font_name"]) == {"OcrB-Regular"}
+    text = "".join(infos["text"])
+    assert set(text) == {"A", "B"}
+    assert text.count("B") > text.count("A")
+
+
+def test_balance_chars():
+    """
+    測試平衡字元抽樣只抽出字型支援的字元，並記錄每個字元的出現次數。
+    """
+    rwc = RandomWordCanvas(
+        font_bank=FONT_ROOT,
+        output_size=(32, 128),
+        random_font=True,
+        random_text=True,
+        balance_chars=True,
+        return_infos=True,
+        seed=0,
+    )
+    _, infos = rwc.generate_batch(32)
+    for font_name, text in zip(infos["font_name"], infos["text"]):
+        supported = rwc.font_chars_tables[font_name]
+        assert all(char in supported for char in text.replace("\n", ""))
+    num_chars = sum(len(text.replace("\n", "")) for text in infos["text"])
+    assert rwc.char_sampler.counts.sum() == num_chars
+    assert len(rwc.char_sampler) == len(rwc.chars_table)
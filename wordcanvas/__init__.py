@@ -1,12 +1,83 @@
-from .barcode import Code39Generator, Code128Generator, CodeType
-from .custom_aug import ExampleAug, Shear
-from .font_utils import (CHARACTER_RANGES, extract_font_info,
-                         filter_characters_by_range, get_supported_characters,
-                         is_character_supported, load_ttfont,
-                         remove_control_characters)
-from .mrz_generator import MRZGenerator
-from .text_image_renderer import load_truetype_font, text2image
-from .word_canvas import (AlignMode, OutputDirection, RandomWordCanvas,
-                          WordCanvas)
+import importlib
+from typing import TYPE_CHECKING
 
 __version__ = '2.1.0'
+
+# Public names and their submodules. They are imported on first access
+# (PEP 562), so `from wordcanvas import text2image` does not pay for
+# albumentations, cv2, pandas or capybara.
+_LAZY_ATTRS = {
+    'Code39Generator': 'barcode',
+    'Code128Generator': 'barcode',
+    'CodeType': 'barcode',
+    'ExampleAug': 'custom_aug',
+    'Shear': 'custom_aug',
+    'CHARACTER_RANGES': 'font_utils',
+    'CharsTable': 'font_utils',
+    'FontCharsTables': 'font_utils',
+    'FontCoverageIndex': 'font_utils',
+    'extract_font_info': 'font_utils',
+    'filter_characters_by_range': 'font_utils',
+    'get_supported_characters': 'font_utils',
+    'get_supported_codepoints': 'font_utils',
+    'is_character_supported': 'font_utils',
+    'load_ttfont': 'font_utils',
+    'remove_control_characters': 'font_utils',
+    'MRZGenerator': 'mrz_generator',
+    'ParallelWordCanvas': 'parallel_word_canvas',
+    'AliasSampler': 'samplers',
+    'BalancedCharSampler': 'samplers',
+    'FontPool': 'text_image_renderer',
+    'FontTable': 'text_image_renderer',
+    'GlyphCache': 'text_image_renderer',
+    'colorize_mask': 'text_image_renderer',
+    'get_font_pool': 'text_image_renderer',
+    'get_glyph_cache': 'text_image_renderer',
+    'load_truetype_font': 'text_image_renderer',
+    'measure_text': 'text_image_renderer',
+    'text2image': 'text_image_renderer',
+    'text2image_batch': 'text_image_renderer',
+    'text2mask': 'text_image_renderer',
+    'CorpusTextSource': 'text_source',
+    'AlignMode': 'word_canvas',
+    'OutputDirection': 'word_canvas',
+    'RandomWordCanvas': 'word_canvas',
+    'WordCanvas': 'word_canvas',
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
+
+if TYPE_CHECKING:
+    from .barcode import Code39Generator, Code128Generator, CodeType
+    from .custom_aug import ExampleAug, Shear
+    from .font_utils import (CHARACTER_RANGES, CharsTable, FontCharsTables,
+                             FontCoverageIndex, extract_font_info,
+                             filter_characters_by_range,
+                             get_supported_characters,
+                             get_supported_codepoints, is_character_supported,
+                             load_ttfont, remove_control_characters)
+    from .mrz_generator import MRZGenerator
+    from .parallel_word_canvas import ParallelWordCanvas
+    from .samplers import AliasSampler, BalancedCharSampler
+    from .text_image_renderer import (FontPool, FontTable, GlyphCache,
+                                      colorize_mask, get_font_pool,
+                                      get_glyph_cache, load_truetype_font,
+                                      measure_text, text2image,
+                                      text2image_batch, text2mask)
+    from .text_source import CorpusTextSource
+    from .word_canvas import (AlignMode, OutputDirection, RandomWordCanvas,
+                              WordCanvas)
@@ -1,4 +1,3 @@
-import pandas as pd
 from capybara import dump_json, get_curdir, load_json
 
 DIR = get_curdir(__file__)
@@ -8,6 +7,9 @@ def load_128table():
     if (fp := DIR / 'code128_table.json').is_file():
         table128 = load_json(fp)
     else:
+        # Only rebuilding the table from the web needs pandas and lxml,
+        # see the `barcode` extra.
+        import pandas as pd
         df = pd.read_html('https://en.wikipedia.org/wiki/Code_128',
                           encoding='utf-8', header=0)
 
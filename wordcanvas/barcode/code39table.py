@@ -1,4 +1,3 @@
-import pandas as pd
 from capybara import dump_json, get_curdir, load_json
 
 DIR = get_curdir(__file__)
@@ -8,6 +7,9 @@ def load_39table():
     if (fp := DIR / 'code39_table.json').is_file():
         table39 = load_json(fp)
     else:
+        # Only rebuilding the table from the web needs pandas and lxml,
+        # see the `barcode` extra.
+        import pandas as pd
         df = pd.read_html('http://taggedwiki.zubiaga.org/new_content/ad336847cd67ef045e2106d1a89f2af8',
                           encoding='utf-8', header=0)
 
@@ -1,10 +1,9 @@
+import math
 from enum import Enum
-from typing import Union
+from typing import List, Union
 
 import capybara as cb
-import cv2
 import numpy as np
-import pandas as pd
 
 from .code39table import load_39table
 from .code128table import load_128table
@@ -12,10 +11,36 @@ from .code128table import load_128table
 DIR = cb.get_curdir(__file__)
 
 
+def _bar_row(encode: str, width: int, color: tuple) -> np.ndarray:
+    """Rasterizes a module string ('1' for a bar) into one (width, 3) pixel row.
+
+    Pixel `x` shows module `x * len(encode) // width`, which is what drawing
+    `width // len(encode)` pixels per module and resizing the result to
+    `width` with nearest interpolation used to give.
+    """
+    if width < 1 or not encode:
+        raise ValueError(
+            f'Cannot rasterize {len(encode)} modules into {width} pixels.')
+    modules = np.frombuffer(encode.encode('ascii'), np.uint8) == ord('1')
+    bars = modules[np.arange(width) * len(modules) // width]
+    return np.where(
+        bars[:, None], np.asarray(color, dtype=np.uint8), np.uint8(255))
+
+
+def _gen_images(encodes: List[str], width: int, height: int, color: tuple) -> np.ndarray:
+    """Broadcasts the bar rows of `encodes` to a (N, height, width, 3) batch."""
+    imgs = np.empty((len(encodes), height, width, 3), dtype=np.uint8)
+    if encodes:
+        rows = np.stack([_bar_row(encode, width, color) for encode in encodes])
+        imgs[:] = rows[:, None]
+    return imgs
+
+
 class CodeType(cb.EnumCheckMixin, Enum):
     Code128_A = 0
     Code128_B = 1
     Code128_C = 2
+    Code128_Auto = 3
 
 
 class Code128Generator:
@@ -25,12 +50,54 @@ class Code128Generator:
         code_type: Union[CodeType, str, int] = CodeType.Code128_B,
         color: tuple = (0, 0, 0)
     ):
-        """ Code128 barcode generator """
-        table = load_128table()
-        self.table = pd.DataFrame.from_dict(table)
+        """ Code128 barcode generator
+        Args:
+            code_type: Code set of the whole text, or `Code128_Auto` to
+                switch between A, B and C for the fewest symbols.
+            color: Bar color.
+        """
+        self._table = load_128table()
         self.code_type = CodeType.obj_to_enum(code_type)
         self.color = color
 
+        # Lookup tables built once: (bar pattern, value) of each symbol per
+        # code set, and bar pattern of each value for the check symbol.
+        # The first row wins, as with the former DataFrame filters.
+        rows = list(self._table['Value'])
+        patterns = [self._table['bar_pattern'][row] for row in rows]
+        values = [self._table['Value'][row] for row in rows]
+        self._symbols = {}
+        for code_type, (_, col) in self.start_type.items():
+            symbols = self._symbols[code_type] = {}
+            for row, pattern, value in zip(rows, patterns, values):
+                # The space of code sets A and B is stored as ''.
+                symbol = self._table[col][row] or ' '
+                if value.isdigit():
+                    symbols.setdefault(symbol, (pattern, int(value)))
+        self._value_patterns = {}
+        for pattern, value in zip(patterns, values):
+            if value.isdigit():
+                self._value_patterns.setdefault(int(value), pattern)
+        self._stop_code = next(
+            pattern for row, pattern in zip(rows, patterns)
+            if self._table['_128A'][row] == 'Stop_pattern')
+
+        # Values of the characters of code sets A and B, whose control
+        # characters and DEL are only named in the table.
+        self._char_values = {
+            CodeType.Code128_A: {
+                chr(value + 32 if value < 64 else value - 64): value
+                for value in range(96)
+            },
+            CodeType.Code128_B: {chr(value + 32): value for value in range(96)},
+        }
+
+    @property
+    def table(self):
+        """ Symbol table as a DataFrame, needs pandas """
+        import pandas as pd
+        return pd.DataFrame.from_dict(self._table)
+
     @property
     def start_type(self):
         return {
@@ -47,64 +114,97 @@ class Code128Generator:
         Returns:
             output_code (str): barcode encoded in string
         """
-        start, col = self.start_type[self.code_type]
-        start_code, start_value = self.table.loc[
-            self.table._128A == start,
-            ['bar_pattern', 'Value']
-        ].values.reshape(-1)
-        end_code = self.table.loc[
-            self.table._128A == 'Stop_pattern',
-            'bar_pattern'
-        ].values[0]
-
-        code_ls, value_ls = [], []
+        values = self._encode_values(src)
+        checksum = values[0] + sum(
+            idx * value for idx, value in enumerate(values[1:], 1))
+
+        codes = [self._value_patterns[value] for value in values]
+        codes.append(self._value_patterns[checksum % 103])
+        codes.append(self._stop_code)
+        return ''.join(codes)
+
+    def _encode_values(self, src: str) -> List[int]:
+        """ Symbol values of `src`, start code included """
+        if self.code_type == CodeType.Code128_Auto:
+            return self._encode_auto(src)
+
+        start, _ = self.start_type[self.code_type]
+        symbols = self._symbols[self.code_type]
+        if self.code_type == CodeType.Code128_C:
+            if len(src) % 2 or any(char not in '0123456789' for char in src):
+                raise ValueError(
+                    f'Code128_C encodes an even number of digits, got {src!r}.')
+            src = [src[idx:idx + 2] for idx in range(0, len(src), 2)]
+
+        values = [symbols[start][1]]
         for char in src:
-            code_ls.append(
-                self.table.loc[self.table[col] == char, 'bar_pattern'].values[0])
-            value_ls.append(
-                self.table.loc[self.table[col] == char, 'Value'].values[0])
-
-        info_code = ''
-        for code in code_ls:
-            info_code += code
-
-        values = 0
-        for idx, value in enumerate(value_ls):
-            value = int(value)
-            values += value * (idx+1)
-
-        check_value = str((int(start_value) + values) % 103)
-        check_code = self.table.loc[self.table.Value ==
-                                    check_value, 'bar_pattern'].values[0]
-        output_code = start_code + info_code + check_code + end_code
-
-        return output_code
+            if char not in symbols:
+                raise ValueError(
+                    f'Character {char!r} cannot be encoded in {self.code_type.name}.')
+            values.append(symbols[char][1])
+        return values
+
+    def _encode_auto(self, src: str) -> List[int]:
+        """ Shortest symbol values of `src` over code sets A, B and C
+
+        A dynamic program over the positions gives, for each code set, the
+        fewest symbols encoding the rest of the text. At each position the
+        encoder may switch set (one symbol), encode a character of A or B,
+        shift to the other of A and B for one character (two symbols), or
+        encode a pair of digits in C.
+        """
+        sets = (CodeType.Code128_A, CodeType.Code128_B, CodeType.Code128_C)
+        chars = [self._char_values[sets[0]], self._char_values[sets[1]]]
+        for char in src:
+            if char not in chars[0] and char not in chars[1]:
+                raise ValueError(
+                    f'Character {char!r} cannot be encoded in Code128.')
+
+        n = len(src)
+        digits = [char in '0123456789' for char in src]
+        # cost[i][s]: fewest symbols for src[i:] in set s, move[i][s]: the
+        # set to switch to (or s) and how to encode src[i] there.
+        cost = [[0] * 3 for _ in range(n + 1)]
+        move = [[None] * 3 for _ in range(n)]
+        for i in range(n - 1, -1, -1):
+            here = [math.inf] * 3
+            how = [None] * 3
+            for s in (0, 1):
+                if src[i] in chars[s]:
+                    here[s], how[s] = 1 + cost[i + 1][s], 'char'
+                else:
+                    here[s], how[s] = 2 + cost[i + 1][s], 'shift'
+            if i + 1 < n and digits[i] and digits[i + 1]:
+                here[2], how[2] = 1 + cost[i + 2][2], 'pair'
+            for s in range(3):
+                t = min(range(3), key=lambda t: (here[t] + (t != s), t != s))
+                cost[i][s] = here[t] + (t != s)
+                move[i][s] = (t, how[t])
+
+        # Ties start in B, then C.
+        s = min((1, 2, 0), key=lambda s: cost[0][s])
+        symbols = [self._symbols[code_type] for code_type in sets]
+        values = [symbols[s][self.start_type[sets[s]][0]][1]]
+        i = 0
+        while i < n:
+            t, how = move[i][s]
+            if t != s:
+                values.append(symbols[s][f'Code {"ABC"[t]}'][1])
+                s = t
+            if how == 'pair':
+                values.append(int(src[i:i + 2]))
+                i += 2
+                continue
+            if how == 'shift':
+                values.append(symbols[s][f'Shift {"AB"[1 - s]}'][1])
+                values.append(chars[1 - s][src[i]])
+            else:
+                values.append(chars[s][src[i]])
+            i += 1
+        return values
 
     def _gen_image(self, encode: str, width: int, height: int):
-
-        def draw_line(img, x, thickness, rand_color):
-
-            for _ in range(thickness):
-                point_start = np.array([x, 0])
-                point_end = np.array([x, height])
-                cv2.line(img, point_start, point_end, rand_color, thickness=1)
-                x += 1
-
-        thickness = width // len(encode)
-        img = np.ones((height, width, 3), dtype='uint8') * 255
-
-        x = 0
-        for Bool in encode:
-            if Bool == '1':
-                draw_line(img, x, thickness, self.color)
-            x = x + thickness
-
-        # Calibration
-        # There is space error between self.width and barcode width within 0~144
-        img = img[0:height, 0:len(encode)*thickness]
-        img = cb.imresize(img, (height, width), interpolation=cb.INTER.NEAREST)
-
-        return img
+        return _gen_images([encode], width, height, self.color)[0]
 
     def __call__(self, text: str, w: int, h: int):
         """Generate Code128 barcode image
@@ -119,6 +219,19 @@ class Code128Generator:
         encode = self._gen_code128(text)
         return self._gen_image(encode, w, h)
 
+    def generate_batch(self, texts: List[str], w: int, h: int) -> np.ndarray:
+        """Generate Code128 barcode images of the same size at once
+        Args:
+            texts (List[str]): input strings
+            w (int): barcode width
+            h (int): barcode height
+
+        Returns:
+            imgs (np.ndarray): barcode images of shape (N, h, w, 3)
+        """
+        encodes = [self._gen_code128(text) for text in texts]
+        return _gen_images(encodes, w, h, self.color)
+
 
 class Code39Generator:
 
@@ -137,12 +250,26 @@ class Code39Generator:
             raise ValueError(
                 f'width_rate should be at least 2, but got {width_rate}')
 
-        table = load_39table()
-        self.table = pd.DataFrame.from_dict(table)
+        self._table = load_39table()
         self.convert_dict = {'w': '0', 'W': '0' *
                              width_rate, 'b': '1', 'B': '1'*width_rate}
         self.color = color
 
+        # Bar pattern of each character, built once.
+        self._patterns = {
+            self._table['character'][row]: ''.join(
+                self.convert_dict[c] for c in self._table['pattern'][row])
+            for row in self._table['character']
+        }
+
+    @property
+    def table(self):
+        """ Symbol table as a DataFrame, needs pandas """
+        import pandas as pd
+        table = pd.DataFrame.from_dict(self._table)
+        table['bar_pattern'] = table['character'].map(self._patterns)
+        return table
+
     def _gen_code39(self, src: str):
         """ Generate Code39 barcode
         Args:
@@ -152,58 +279,25 @@ class Code39Generator:
             output_code (str): barcode encoded in string
         """
 
-        def tobar(string):
-            bar_ls = [self.convert_dict[char] for char in string]
-            bar_pattern = ''.join(bar_ls)
-            return bar_pattern
-
-        self.table['bar_pattern'] = self.table['pattern'].apply(
-            lambda x: tobar(x))
-
-        start_code = self.table.loc[self.table['character']
-                                    == '*', 'bar_pattern'].values[0] + '0'
-        end_code = start_code
+        start_code = self._patterns['*'] + '0'
 
-        info_code = ''
+        codes = [start_code]
         for char in src:
-            info = self.table.loc[self.table['character']
-                                  == char, 'bar_pattern'].values[0]
-            info_code += (info + '0')
-
-        output_code = start_code + info_code + end_code
-
-        return output_code
+            if char not in self._patterns:
+                raise ValueError(
+                    f'Character {char!r} cannot be encoded in Code39.')
+            codes.append(self._patterns[char] + '0')
+        codes.append(start_code)
+        return ''.join(codes)
 
     def _gen_image(self, encode: str, width: int, height: int):
         """ Draw barcode line makes code string to barcode image.
         Args:
             encode: encoded string
-            color: barcode random color range
+            width: image width
+            height: image height
         """
-
-        def draw_line(img, x, thickness, rand_color):
-
-            for _ in range(thickness):
-                point_start = np.array([x, 0])
-                point_end = np.array([x, height])
-                cv2.line(img, point_start, point_end, rand_color, thickness=1)
-                x += 1
-
-        thickness = width // len(encode)
-        img = np.ones((height, width, 3), dtype='uint8') * 255
-
-        x = 0
-        for Bool in encode:
-            if Bool == '1':
-                draw_line(img, x, thickness, self.color)
-            x = x + thickness
-
-        # Calibration
-        # There is space error between self.width and barcode width within 0~144
-        img = img[0:height, 0:len(encode)*thickness]
-        img = cb.imresize(img, (height, width), interpolation=cb.INTER.NEAREST)
-
-        return img
+        return _gen_images([encode], width, height, self.color)[0]
 
     def __call__(self, text: str, w: int, h: int):
         """Generate Code128 barcode image
@@ -217,3 +311,16 @@ class Code39Generator:
         """
         encode = self._gen_code39(text)
         return self._gen_image(encode, w, h)
+
+    def generate_batch(self, texts: List[str], w: int, h: int) -> np.ndarray:
+        """Generate Code39 barcode images of the same size at once
+        Args:
+            texts (List[str]): input strings
+            w (int): barcode width
+            h (int): barcode height
+
+        Returns:
+            imgs (np.ndarray): barcode images of shape (N, h, w, 3)
+        """
+        encodes = [self._gen_code39(text) for text in texts]
+        return _gen_images(encodes, w, h, self.color)
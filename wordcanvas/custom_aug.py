@@ -1,11 +1,10 @@
 import math
 import random
+from typing import Tuple, Union
 
 import albumentations as A
 import cv2
 import numpy as np
-from capybara import imresize
-from PIL import Image
 
 
 class Shear:
@@ -14,25 +13,51 @@ class Shear:
         self,
         max_shear_left: int = 20,
         max_shear_right: int = 20,
-        p: float = 0.5
+        p: float = 0.5,
+        border_value: Union[int, Tuple[int, int, int]] = 0,
     ):
+        """Shears the image horizontally, keeping its size.
+
+        The shear, the crop of the shifted border and the resize back to
+        the input size are folded into one affine matrix, so the image is
+        resampled once by `cv2.warpAffine` with bicubic interpolation.
+
+        Args:
+            max_shear_left (int, optional):
+                Maximum shear angle to the left, in degrees. Defaults to 20.
+            max_shear_right (int, optional):
+                Maximum shear angle to the right, in degrees. Defaults to 20.
+            p (float, optional):
+                Probability to shear. Defaults to 0.5.
+            border_value (Union[int, Tuple[int, int, int]], optional):
+                Color of the uncovered corners, usually the background
+                color. Defaults to 0.
+        """
         self.probability = p
         self.max_shear_left = max_shear_left
         self.max_shear_right = max_shear_right
+        self.border_value = border_value
 
-    def __call__(self, image):
+    def __call__(
+        self,
+        image: np.ndarray,
+        border_value: Union[int, Tuple[int, int, int]] = None,
+    ) -> np.ndarray:
         if np.random.rand() <= self.probability:
 
             height, width = image.shape[0:2]
-            image = Image.fromarray(image)
 
             angle_to_shear = int(np.random.uniform(
                 (abs(self.max_shear_left)*-1) - 1, self.max_shear_right + 1))
             if angle_to_shear != -1:
                 angle_to_shear += 1
 
+            # The shift must stay under the width, or the crop would mirror
+            # the image.
+            max_phi = (width - 1) / height
             phi = math.tan(math.radians(angle_to_shear))
-            shift_in_pixels = phi * height
+            phi = math.copysign(min(abs(phi), max_phi), phi)
+            shift_in_pixels = min(max(phi * height, 1 - width), width - 1)
 
             if shift_in_pixels > 0:
                 shift_in_pixels = math.ceil(shift_in_pixels)
@@ -45,18 +70,29 @@ class Shear:
                 matrix_offset = 0
                 phi = abs(phi) * -1
 
-            transform_matrix = (1, phi, -matrix_offset, 0, 1, 0)
-            image = image.transform(
-                (int(round(width + shift_in_pixels)), height),
-                Image.AFFINE,
-                transform_matrix,
-                Image.BICUBIC
+            # Output x maps to the cropped sheared image at x * sx, shifted
+            # by the crop, then sheared: x_in = sx * x + shift + phi * y -
+            # offset. The constants move it from pixel corners to centers.
+            shift = abs(shift_in_pixels)
+            sx = (width - shift) / width
+            matrix = np.array([
+                [sx, phi, 0.5 * sx - 0.5 + shift + 0.5 * phi - matrix_offset],
+                [0, 1, 0],
+            ], dtype=np.float64)
+
+            if border_value is None:
+                border_value = self.border_value
+            if np.ndim(border_value) == 0:
+                border_value = (border_value,) * 3
+            image = cv2.warpAffine(
+                image,
+                matrix,
+                (width, height),
+                flags=cv2.INTER_CUBIC | cv2.WARP_INVERSE_MAP,
+                borderMode=cv2.BORDER_CONSTANT,
+                borderValue=tuple(int(v) for v in border_value),
             )
 
-            image = image.crop((abs(shift_in_pixels), 0, width, height))
-            image.resize((width, height), resample=Image.BICUBIC)
-            image = imresize(np.array(image), size=(height, width))
-
         return image
 
 
@@ -96,7 +132,7 @@ class ExampleAug:
         ])
 
     def __call__(self, img, background_color=(255, 255, 255)):
-        img = self.shear(img)
+        img = self.shear(img, border_value=background_color)
 
         self.shift_scale.border_mode = random.choice([
             cv2.BORDER_CONSTANT,
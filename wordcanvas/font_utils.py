@@ -1,20 +1,29 @@
+import hashlib
+import json
 import re
+import sqlite3
 import unicodedata
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, Iterator, List, Tuple, Union
 
-from capybara import get_curdir
+import numpy as np
 from fontTools.ttLib import TTFont
 
-DIR = get_curdir(__file__)
+# Resolved without capybara, which is slow to import.
+DIR = Path(__file__).resolve().parent
 
 __all__ = [
     'load_ttfont',
     'remove_control_characters',
     'extract_font_info',
     'get_supported_characters',
+    'get_supported_codepoints',
     'filter_characters_by_range',
     'is_character_supported',
+    'FontCoverageIndex',
+    'CharsTable',
+    'FontCharsTables',
     'CHARACTER_RANGES',
     'TTFont',
 ]
@@ -179,22 +188,55 @@ def filter_characters_by_range(
         FileNotFoundError: If the specified font file does not exist.
         TTLibError: If the font cannot be loaded due to invalid format or corruption.
     """
-    font = load_ttfont(font_path)
-    cmap = font.getBestCmap()
-    supported_chars = {chr(char_code) for char_code in cmap.keys()}
+    codepoints = _cmap_codepoints(font_path)
 
     if not do_filter:
-        return {"All Characters": list(supported_chars)}
+        return {"All Characters": _codepoints_to_chars(codepoints)}
 
     result = {}
     for category, category_ranges in ranges.items():
-        result[category] = [
-            char for char in supported_chars if is_in_ranges(char, category_ranges)
-        ]
+        result[category] = _codepoints_to_chars(
+            _codepoints_in_ranges(codepoints, category_ranges))
 
     return result
 
 
+def _cmap_codepoints(font_path: Union[str, Path, TTFont]) -> np.ndarray:
+    """Returns the sorted code points of the best cmap of a font as uint32."""
+    cmap = load_ttfont(font_path).getBestCmap()
+    codepoints = np.fromiter(cmap.keys(), dtype=np.uint32, count=len(cmap))
+    codepoints.sort()
+    return codepoints
+
+
+def _codepoints_in_ranges(
+    codepoints: np.ndarray,
+    ranges: List[tuple]
+) -> np.ndarray:
+    """Selects the sorted `codepoints` that fall in any of the inclusive `ranges`.
+
+    The range boundaries are located with `searchsorted`, and a running sum
+    of +1 / -1 at those positions marks the covered code points, so
+    overlapping ranges select a code point only once.
+    """
+    bounds = np.asarray(ranges, dtype=np.int64).reshape(-1, 2)
+    starts = np.searchsorted(codepoints, bounds[:, 0], side='left')
+    stops = np.searchsorted(codepoints, bounds[:, 1], side='right')
+    coverage = np.zeros(len(codepoints) + 1, dtype=np.int64)
+    np.add.at(coverage, starts, 1)
+    np.add.at(coverage, stops, -1)
+    return codepoints[np.cumsum(coverage[:-1]) > 0]
+
+
+def _codepoints_to_str(codepoints: np.ndarray) -> str:
+    return np.asarray(codepoints, dtype='<u4').tobytes().decode(
+        'utf-32-le', 'surrogatepass')
+
+
+def _codepoints_to_chars(codepoints: np.ndarray) -> List[str]:
+    return list(_codepoints_to_str(codepoints))
+
+
 def remove_control_characters(text: str, normalize: bool = True) -> str:
     """Removes control characters and optional Unicode normalization from a string.
 
@@ -449,18 +491,34 @@ def get_supported_characters(
         FileNotFoundError: If the font file does not exist.
         TTLibError: If the font file is invalid or cannot be loaded.
     """
-    chars_dict = []
+    return _codepoints_to_chars(
+        get_supported_codepoints(font_path, ranges, do_filter))
 
-    # Extract supported characters from the font using specified ranges
-    for chars in filter_characters_by_range(font_path, ranges, do_filter).values():
-        chars_dict.extend(chars)
 
-    chars_dict = ''.join(chars_dict)
-    chars_dict = remove_control_characters(chars_dict, normalize=True)
-    chars_dict = list(set(chars_dict))
-    chars_dict = sorted(chars_dict, key=lambda x: ord(x))
+def get_supported_codepoints(
+    font_path: Union[str, Path],
+    ranges: Dict[str, List[tuple]] = CHARACTER_RANGES,
+    do_filter: bool = True
+) -> np.ndarray:
+    """Same as `get_supported_characters`, as a sorted uint32 code point array.
+
+    Raises:
+        FileNotFoundError: If the font file does not exist.
+        TTLibError: If the font file is invalid or cannot be loaded.
+    """
+    codepoints = _cmap_codepoints(font_path)
+    if do_filter:
+        parts = [
+            _codepoints_in_ranges(codepoints, category_ranges)
+            for category_ranges in ranges.values()
+        ]
+        codepoints = np.concatenate(parts) if parts else codepoints[:0]
 
-    return chars_dict
+    # Sanitize the joined characters, then deduplicate and sort them.
+    chars = remove_control_characters(
+        _codepoints_to_str(codepoints), normalize=True)
+    return np.unique(np.frombuffer(
+        chars.encode('utf-32-le', 'surrogatepass'), dtype='<u4')).astype(np.uint32)
 
 
 def is_character_supported(
@@ -516,3 +574,242 @@ def is_character_supported(
             f"Character '{character}' ({ord(character):#x}) is not supported by the font.")
 
     return character_supported
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _blob_to_codepoints(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype='<u4').astype(np.uint32)
+
+
+def _font_metrics(font: TTFont) -> dict:
+    hhea = font['hhea']
+    return {
+        'unitsPerEm': font['head'].unitsPerEm,
+        'ascent': hhea.ascent,
+        'descent': hhea.descent,
+        'lineGap': hhea.lineGap,
+        'numGlyphs': font['maxp'].numGlyphs,
+    }
+
+
+class FontCoverageIndex:
+
+    def __init__(
+        self,
+        index_path: Union[str, Path],
+        ranges: Dict[str, List[tuple]] = CHARACTER_RANGES,
+    ):
+        """Persistent SQLite index of the characters supported by fonts.
+
+        Each font is stored with its file size, mtime and content hash, the
+        result of `get_supported_codepoints(font, ranges)` as a little-endian
+        uint32 blob and a few layout metrics. A font whose size and mtime are unchanged is served from
+        the index without touching the file. If only the mtime changed, the
+        content hash decides whether the entry is still valid. Otherwise the
+        font is parsed again and its entry replaced, so the index is rebuilt
+        incrementally. Changing `ranges` invalidates the whole index.
+
+        Args:
+            index_path (Union[str, Path]):
+                Path of the SQLite file, created if it does not exist.
+            ranges (Dict[str, List[tuple]], optional):
+                Unicode ranges passed to `get_supported_codepoints`.
+                Defaults to `CHARACTER_RANGES`.
+
+        Example:
+            ```python
+            with FontCoverageIndex("font_index.sqlite") as index:
+                chars = index.get_supported_characters("fonts/arial.ttf")
+            ```
+        """
+        self.index_path = Path(index_path)
+        self.ranges = ranges
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(str(self.index_path), timeout=30)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS fonts ('
+                'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, '
+                'hash TEXT, chars BLOB, metrics TEXT)')
+
+            version = hashlib.blake2b(
+                repr(sorted(ranges.items())).encode(), digest_size=16).hexdigest()
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'ranges'").fetchone()
+            if row is None or row[0] != version:
+                self._conn.execute('DELETE FROM fonts')
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('ranges', ?)", (version,))
+
+    def get(self, font_path: Union[str, Path]) -> Tuple[np.ndarray, dict]:
+        """Returns the supported code points (sorted uint32) and the metrics of a font.
+
+        Raises:
+            FileNotFoundError: If the font file does not exist.
+            TTLibError: If the font file is invalid or cannot be loaded.
+        """
+        path = Path(font_path).resolve()
+        stat = path.stat()
+        row = self._conn.execute(
+            'SELECT size, mtime_ns, hash, chars, metrics FROM fonts WHERE path = ?',
+            (str(path),)
+        ).fetchone()
+
+        if row is not None and row[0] == stat.st_size:
+            if row[1] == stat.st_mtime_ns:
+                self.hits += 1
+                return _blob_to_codepoints(row[3]), json.loads(row[4])
+
+            digest = _file_hash(path)
+            if row[2] == digest:
+                with self._conn:
+                    self._conn.execute(
+                        'UPDATE fonts SET mtime_ns = ? WHERE path = ?',
+                        (stat.st_mtime_ns, str(path)))
+                self.hits += 1
+                return _blob_to_codepoints(row[3]), json.loads(row[4])
+        else:
+            digest = _file_hash(path)
+
+        self.misses += 1
+        font = load_ttfont(path)
+        codepoints = get_supported_codepoints(font, self.ranges)
+        metrics = _font_metrics(font)
+        with self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO fonts VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    str(path), stat.st_size, stat.st_mtime_ns, digest,
+                    codepoints.astype('<u4').tobytes(), json.dumps(metrics),
+                )
+            )
+        return codepoints, metrics
+
+    def get_supported_characters(self, font_path: Union[str, Path]) -> List[str]:
+        """Same as `get_supported_characters(font_path, ranges)`, served from the index."""
+        return _codepoints_to_chars(self.get(font_path)[0])
+
+    def get_supported_codepoints(self, font_path: Union[str, Path]) -> np.ndarray:
+        """Same as `get_supported_codepoints(font_path, ranges)`, served from the index."""
+        return self.get(font_path)[0]
+
+    def get_metrics(self, font_path: Union[str, Path]) -> dict:
+        """Returns `unitsPerEm`, `ascent`, `descent`, `lineGap` and `numGlyphs`."""
+        return self.get(font_path)[1]
+
+    def prune(self) -> int:
+        """Removes the entries of deleted fonts and returns their number."""
+        paths = [
+            path for path, in self._conn.execute('SELECT path FROM fonts')
+            if not Path(path).is_file()
+        ]
+        with self._conn:
+            self._conn.executemany(
+                'DELETE FROM fonts WHERE path = ?', [(p,) for p in paths])
+        return len(paths)
+
+    def __len__(self):
+        return self._conn.execute('SELECT COUNT(*) FROM fonts').fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class CharsTable(Mapping):
+
+    def __init__(self, codepoints: np.ndarray):
+        """Read-only `{char: index}` mapping over a sorted code point array.
+
+        It replaces a dict over every character of the vocabulary: the
+        index of a character is its position in `codepoints`, found with
+        `searchsorted` in O(log n). The single array is shared copy-on-write
+        by forked workers.
+
+        Args:
+            codepoints (np.ndarray):
+                Sorted, unique code points of the vocabulary.
+        """
+        self.codepoints = np.ascontiguousarray(codepoints, dtype=np.uint32)
+
+    def indices(self, codepoints: np.ndarray) -> np.ndarray:
+        """Returns the indices of `codepoints`, -1 for the missing ones."""
+        codepoints = np.asarray(codepoints, dtype=np.uint32)
+        idx = np.searchsorted(self.codepoints, codepoints)
+        idx[idx == len(self.codepoints)] = 0
+        found = len(self.codepoints) > 0 \
+            and self.codepoints[idx] == codepoints
+        return np.where(found, idx, -1)
+
+    def __getitem__(self, char: str) -> int:
+        if not isinstance(char, str) or len(char) != 1:
+            raise KeyError(char)
+        codepoint = ord(char)
+        index = int(self.codepoints.searchsorted(np.uint32(codepoint)))
+        if index == len(self.codepoints) or self.codepoints[index] != codepoint:
+            raise KeyError(char)
+        return index
+
+    def __contains__(self, char) -> bool:
+        try:
+            self[char]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_codepoints_to_str(self.codepoints))
+
+    def __len__(self):
+        return len(self.codepoints)
+
+
+class FontCharsTables(Mapping):
+
+    def __init__(self, codepoints: Dict[str, np.ndarray] = None):
+        """Read-only `{font name: [chars]}` mapping over code point arrays.
+
+        Each font keeps a sorted uint32 array instead of a list of
+        one-character strings. The list is only built when a font is looked
+        up; use `codepoints` to get the array itself.
+
+        Args:
+            codepoints (Dict[str, np.ndarray], optional):
+                Sorted code points supported by each font.
+        """
+        self._codepoints = {}
+        for name, font_codepoints in (codepoints or {}).items():
+            self.add(name, font_codepoints)
+
+    def add(self, name: str, codepoints: np.ndarray):
+        self._codepoints[name] = np.ascontiguousarray(codepoints, dtype=np.uint32)
+
+    def codepoints(self, name: str) -> np.ndarray:
+        return self._codepoints[name]
+
+    def __getitem__(self, name: str) -> List[str]:
+        return _codepoints_to_chars(self._codepoints[name])
+
+    def __contains__(self, name) -> bool:
+        return name in self._codepoints
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._codepoints)
+
+    def __len__(self):
+        return len(self._codepoints)
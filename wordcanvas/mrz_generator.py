@@ -1,6 +1,6 @@
-import random
 from typing import List, Tuple, Union
 
+import numpy as np
 from capybara import get_curdir
 
 from .word_canvas import RandomWordCanvas
@@ -15,6 +15,7 @@ class MRZGenerator:
         text_color: Tuple[int, int, int] = (0, 0, 0),
         background_color: Tuple[int, int, int] = (255, 255, 255),
         spacing: int = None,
+        seed: Union[int, np.random.Generator] = None,
         **kwargs
     ):
 
@@ -29,9 +30,17 @@ class MRZGenerator:
                 'spacing': spacing
             }
 
+        if isinstance(seed, np.random.Generator):
+            self.seed = None
+            self.rng = seed
+        else:
+            self.seed = np.random.SeedSequence(seed).entropy
+            self.rng = np.random.default_rng(self.seed)
+
         self.spacing = spacing
         self.background_color = background_color
         self.gen = RandomWordCanvas(
+            seed=self.rng,
             font_path=DIR / 'fonts' / 'OcrB-Regular.ttf',
             text_color=text_color,
             background_color=background_color,
@@ -40,9 +49,14 @@ class MRZGenerator:
             **kwargs
         )
 
-    def gen_random_mrz(self, l: int):
-        candidate = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<'
-        return ''.join(random.choices(candidate, k=l))
+    def gen_random_mrz(self, l: int, rng: np.random.Generator = None):
+        rng = self.rng if rng is None else rng
+        candidate = list('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<')
+        return ''.join(rng.choice(candidate, l))
+
+    def _render(self, mrz_text: str, rng: np.random.Generator):
+        params = self.gen._sample_params(1, [mrz_text], rng)
+        return self.gen._render_params(params, 0)
 
     @property
     def mrz_l(self):
@@ -56,16 +70,43 @@ class MRZGenerator:
         self,
         mrz_type: str = None,
         mrz_text: Union[str, List[str]] = None,
+    ):
+        return self._generate(mrz_type, mrz_text, self.rng)
+
+    def sample(
+        self,
+        index: int,
+        mrz_type: str = None,
+        mrz_text: Union[str, List[str]] = None,
+    ):
+        """Generates the `index`-th MRZ of the dataset defined by `seed`.
+
+        All randomness comes from `np.random.default_rng([seed, index])`, so
+        the same (seed, index) always gives the same MRZ.
+        """
+        if self.seed is None:
+            raise ValueError(
+                '`sample` needs an integer `seed`, not a `np.random.Generator`.')
+        if index < 0:
+            raise ValueError(f'`index` must be non-negative, got {index}.')
+        return self._generate(
+            mrz_type, mrz_text, np.random.default_rng([self.seed, index]))
+
+    def _generate(
+        self,
+        mrz_type: str,
+        mrz_text: Union[str, List[str], None],
+        rng: np.random.Generator,
     ):
         if mrz_type is None:
-            mrz_type = random.choice(['TD1', 'TD2', 'TD3'])
+            mrz_type = str(rng.choice(['TD1', 'TD2', 'TD3']))
 
         if mrz_text is None:
             # Using random MRZ text
             n = 3 if mrz_type == 'TD1' else 2
             length = self.mrz_l[mrz_type]
             mrz_text = '\n'.join(
-                [self.gen_random_mrz(length) for _ in range(n)])
+                [self.gen_random_mrz(length, rng) for _ in range(n)])
         else:
             if isinstance(mrz_text, str):
                 lines = mrz_text.split('\n')
@@ -90,7 +131,7 @@ class MRZGenerator:
         if mrz_type == 'TD1':
 
             # Generate MRZ image
-            mrz_image, infos = self.gen(mrz_text)
+            mrz_image, infos = self._render(mrz_text, rng)
             spacing = infos['spacing']
 
             # Generate coordinates for each character
@@ -110,7 +151,7 @@ class MRZGenerator:
         else:
 
             # Generate MRZ image
-            mrz_image, infos = self.gen(mrz_text)
+            mrz_image, infos = self._render(mrz_text, rng)
             spacing = infos['spacing']
 
             # Generate coordinates for each character
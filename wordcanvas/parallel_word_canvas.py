@@ -0,0 +1,279 @@
+import os
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Iterator, List, Tuple, Union
+
+import numpy as np
+
+from .samplers import BalancedCharSampler
+from .word_canvas import RandomWordCanvas
+
+__all__ = [
+    'ParallelWordCanvas',
+]
+
+
+# Per-process state of the workers, set once by `_init_worker`.
+_WORKER_GEN = None
+_WORKER_SHM = {}
+
+
+def _init_worker(config: dict):
+    global _WORKER_GEN
+    _WORKER_GEN = RandomWordCanvas(**{**config, 'return_infos': True})
+
+
+def _worker_generate(
+    shm_name: str,
+    n: int,
+    seed_seq: np.random.SeedSequence,
+    texts: Union[List[str], None],
+    counts: Union[np.ndarray, None],
+) -> Tuple[List[Tuple[int, ...]], dict, Union[np.ndarray, None]]:
+    """Renders one chunk straight into the shared memory block `shm_name`.
+
+    The worker's `char_sampler`, if any, first loads the parent's `counts`
+    (zeros when `None`), and the characters it counts during the chunk are
+    returned to be merged by the parent.
+    """
+    if shm_name not in _WORKER_SHM:
+        _WORKER_SHM[shm_name] = shared_memory.SharedMemory(name=shm_name)
+    buf = _WORKER_SHM[shm_name].buf
+
+    _WORKER_GEN.rng = np.random.default_rng(seed_seq)
+    sampler = _WORKER_GEN.char_sampler
+    if sampler is not None:
+        if counts is None:
+            counts = np.zeros_like(sampler.counts)
+        sampler.load_state_dict({'counts': counts})
+    imgs, infos = _WORKER_GEN.generate_batch(n, texts=texts)
+
+    shapes, start = [], 0
+    for img in imgs:
+        stop = start + img.nbytes
+        if stop > len(buf):
+            raise ValueError(
+                f'Image of shape {img.shape} does not fit in the shared chunk.')
+        np.ndarray(img.shape, np.uint8, buffer=buf, offset=start)[:] = img
+        shapes.append(img.shape)
+        start = stop
+    if sampler is not None:
+        counts = sampler.counts - counts
+    return shapes, infos, counts
+
+
+def _release(pool: ProcessPoolExecutor, slots: List[shared_memory.SharedMemory]):
+    """Shuts down `pool` and frees the shared memory blocks `slots`."""
+    pool.shutdown()
+    for slot in slots:
+        slot.close()
+        slot.unlink()
+
+
+class ParallelWordCanvas:
+
+    def __init__(
+        self,
+        config: dict = None,
+        workers: int = None,
+        chunk_size: int = 64,
+        seed: int = None,
+        mp_context=None,
+    ):
+        """Generates `RandomWordCanvas` images with a pool of processes.
+
+        Each worker builds its own `RandomWordCanvas(**config)` once, so the
+        font bank is never pickled. The images of a chunk are written into a
+        shared memory block owned by this process, and only their shapes and
+        the infos go through the pipe. Every chunk draws from its own
+        `np.random.Generator`, seeded by
+        `np.random.SeedSequence(seed, spawn_key=(chunk_index,))`, so the
+        streams never overlap and the output only depends on `seed`, not on
+        the number of workers. With `balance_chars`, every chunk of a call
+        is balanced against the counts merged into `char_sampler` by the
+        previous calls, which keeps this independence, and its own counts
+        are merged once it is collected.
+
+        Args:
+            config (dict, optional):
+                Keyword arguments of `RandomWordCanvas`. `output_size` is
+                required, since every chunk has a fixed number of bytes.
+            workers (int, optional):
+                Number of processes. Defaults to `os.cpu_count()`.
+            chunk_size (int, optional):
+                Number of images rendered per task. Defaults to 64.
+            seed (int, optional):
+                Root seed of the chunk streams. Defaults to `config['seed']`
+                or fresh entropy.
+            mp_context (optional):
+                The multiprocessing context of the pool.
+        """
+        config = dict(config or {})
+        if config.get('output_size') is None:
+            raise ValueError(
+                '`output_size` must be set in `config` to generate in parallel.')
+        if chunk_size < 1:
+            raise ValueError(f'`chunk_size` must be positive, got {chunk_size}.')
+
+        self.config = config
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.return_infos = config.get('return_infos', False)
+        self._seed_seq = np.random.SeedSequence(
+            config.get('seed') if seed is None else seed)
+        self._next_chunk = 0
+        self.char_sampler = None
+
+        h, w = config['output_size']
+        self._slot_nbytes = chunk_size * h * w * 3
+        self._slots = [
+            shared_memory.SharedMemory(create=True, size=self._slot_nbytes)
+            for _ in range(2 * self.workers)
+        ]
+        self._free_slots = deque(self._slots)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(config,),
+        )
+        # Frees the pool and the slots even if `close` is never called.
+        self._finalizer = weakref.finalize(
+            self, _release, self._pool, self._slots)
+
+    def _chunk_seed(self, chunk_index: int) -> np.random.SeedSequence:
+        return np.random.SeedSequence(
+            self._seed_seq.entropy, spawn_key=(chunk_index,))
+
+    def iter_chunks(
+        self,
+        n: int = None,
+        texts: List[str] = None,
+    ) -> Iterator[Union[np.ndarray, List[np.ndarray], Tuple[Union[np.ndarray, List[np.ndarray]], dict]]]:
+        """Yields the images in chunks of `chunk_size`, in order.
+
+        Leaving the loop early cancels the chunks not yet yielded, and the
+        next call draws them again.
+
+        Args:
+            n (int, optional):
+                Number of images. Defaults to `len(texts)`.
+            texts (List[str], optional):
+                Texts to render, used when `random_text` is off.
+
+        Yields:
+            The images of a chunk, stacked when they share a shape, and the
+            columnar infos of the chunk when `return_infos` is set.
+        """
+        if n is None:
+            if texts is None:
+                raise ValueError('Either `n` or `texts` must be given.')
+            n = len(texts)
+        elif texts is not None and n != len(texts):
+            raise ValueError(
+                f'`n` ({n}) does not match the number of texts ({len(texts)}).')
+
+        # Only collected chunks advance `_next_chunk`, so chunks left behind
+        # by an abandoned call are drawn again by the next one.
+        first_chunk = self._next_chunk
+        counts = None if self.char_sampler is None \
+            else self.char_sampler.counts.copy()
+        pending = deque()
+        try:
+            for chunk, start in enumerate(range(0, n, self.chunk_size), first_chunk):
+                if not self._free_slots:
+                    if not pending:
+                        raise RuntimeError(
+                            'All shared chunks are held by another `iter_chunks` call.')
+                    yield self._collect(pending)
+                size = min(self.chunk_size, n - start)
+                slot = self._free_slots.popleft()
+                future = self._pool.submit(
+                    _worker_generate,
+                    slot.name,
+                    size,
+                    self._chunk_seed(chunk),
+                    None if texts is None else texts[start:start + size],
+                    counts,
+                )
+                pending.append((slot, future, chunk))
+
+            while pending:
+                yield self._collect(pending)
+        finally:
+            # The workers may still write into the slots of chunks left
+            # behind, so they are only reused once their tasks are done.
+            for _, future, _ in pending:
+                future.cancel()
+            wait([future for _, future, _ in pending])
+            self._free_slots.extend(slot for slot, _, _ in pending)
+
+    def _collect(self, pending: deque):
+        slot, future, chunk = pending.popleft()
+        try:
+            shapes, infos, counts = future.result()
+            if counts is not None:
+                if self.char_sampler is None:
+                    self.char_sampler = BalancedCharSampler(
+                        len(counts), self.config.get('balance_strength', 1.0))
+                self.char_sampler.merge(counts)
+
+            if all(shape == shapes[0] for shape in shapes):
+                imgs = np.ndarray(
+                    (len(shapes), *shapes[0]), np.uint8, buffer=slot.buf).copy()
+            else:
+                imgs, start = [], 0
+                for shape in shapes:
+                    img = np.ndarray(shape, np.uint8, buffer=slot.buf, offset=start)
+                    imgs.append(img.copy())
+                    start += img.nbytes
+        finally:
+            self._free_slots.append(slot)
+
+        self._next_chunk = chunk + 1
+        if self.return_infos:
+            return imgs, infos
+        return imgs
+
+    def __call__(self, n: int = None, texts: List[str] = None):
+        """Generates `n` images and joins the chunks of `iter_chunks`."""
+        chunks = list(self.iter_chunks(n, texts=texts))
+        if self.return_infos:
+            chunks, infos = zip(*chunks) if chunks else ((), ())
+        if chunks and all(isinstance(c, np.ndarray) for c in chunks) \
+                and all(c.shape[1:] == chunks[0].shape[1:] for c in chunks):
+            imgs = np.concatenate(chunks)
+        else:
+            imgs = [img for chunk in chunks for img in chunk]
+
+        if self.return_infos:
+            keys = dict.fromkeys(key for chunk in infos for key in chunk)
+            merged = {}
+            for key in keys:
+                values = [
+                    chunk.get(key, [None] * len(imgs_chunk))
+                    for chunk, imgs_chunk in zip(infos, chunks)
+                ]
+                if all(isinstance(v, np.ndarray) for v in values):
+                    try:
+                        merged[key] = np.concatenate(values)
+                        continue
+                    except ValueError:
+                        pass
+                merged[key] = [x for v in values for x in v]
+            return imgs, merged
+
+        return imgs
+
+    def close(self):
+        self._finalizer()
+        self._slots = []
+        self._free_slots.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,159 @@
+from typing import Tuple, Union
+
+import numpy as np
+
+__all__ = [
+    'AliasSampler',
+    'BalancedCharSampler',
+]
+
+
+class AliasSampler:
+
+    def __init__(self, weights: np.ndarray):
+        """Samples indices in proportion to `weights` with Walker's alias method.
+
+        The alias table is built once in O(n). Each draw then costs one
+        uniform index and one uniform float, whatever the number of
+        categories, so it replaces `rng.choice(n, p=p)` and its O(n)
+        cumulative sum per call.
+
+        Args:
+            weights (np.ndarray):
+                Non-negative weights of the n categories, not all zero.
+                They do not need to sum to 1.
+
+        Example:
+            ```python
+            sampler = AliasSampler([1, 2, 7])
+            idx = sampler.sample(1000, rng=np.random.default_rng(0))
+            ```
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or len(weights) == 0:
+            raise ValueError('weights must be a non-empty 1-D array.')
+        if not np.isfinite(weights).all() or (weights < 0).any() \
+                or weights.sum() <= 0:
+            raise ValueError(
+                'weights must be finite, non-negative and not all zero.')
+
+        n = len(weights)
+        scaled = (weights * (n / weights.sum())).tolist()
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        # Whatever is left only misses its mass to rounding errors.
+        self.weights = weights
+        self.prob = np.asarray(prob, dtype=np.float64)
+        self.alias = np.asarray(alias, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(
+        self,
+        size: Union[int, Tuple[int, ...]] = None,
+        rng: np.random.Generator = None,
+    ) -> Union[int, np.ndarray]:
+        """Draws `size` indices, a single int if `size` is None."""
+        rng = np.random.default_rng() if rng is None else rng
+        idx = rng.integers(0, len(self.prob), size)
+        keep = rng.random(size) < self.prob[idx]
+        return np.where(keep, idx, self.alias[idx]) if size is not None \
+            else int(idx if keep else self.alias[idx])
+
+
+class BalancedCharSampler:
+
+    def __init__(self, num_chars: int, strength: float = 1.0):
+        """Character sampler that favours the least emitted characters.
+
+        It keeps the number of times each character of a vocabulary (e.g.
+        the indices of `chars_table`) has been emitted in one int64 array.
+        A draw only considers the given candidates, e.g. the characters
+        of the chosen font, weighted by `(count + 1) ** -strength`, so rare
+        characters catch up while font coverage is respected. The counts
+        of several processes can be merged, and the state checkpointed with
+        `state_dict` / `load_state_dict`.
+
+        Args:
+            num_chars (int):
+                Size of the vocabulary.
+            strength (float, optional):
+                Exponent of the bias, 0 samples uniformly. Defaults to 1.0.
+        """
+        if strength < 0:
+            raise ValueError(f'strength must be non-negative, got {strength}.')
+        self.strength = strength
+        self.counts = np.zeros(num_chars, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def weights(self, candidates: np.ndarray) -> np.ndarray:
+        """Returns the current sampling weights of the `candidates`."""
+        return np.power(self.counts[candidates] + 1.0, -self.strength)
+
+    def sample(
+        self,
+        candidates: np.ndarray,
+        size: int,
+        rng: np.random.Generator = None,
+        weights: np.ndarray = None,
+    ) -> np.ndarray:
+        """Draws `size` positions in `candidates` and counts the drawn characters.
+
+        Args:
+            candidates (np.ndarray):
+                Vocabulary indices of the characters to draw from.
+            size (int):
+                Number of draws.
+            rng (np.random.Generator, optional):
+                Random generator. Defaults to a fresh one.
+            weights (np.ndarray, optional):
+                Base weights of the candidates, multiplied by the balancing
+                weights.
+
+        Returns:
+            np.ndarray: Positions in `candidates` of the drawn characters.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        candidates = np.asarray(candidates)
+        p = self.weights(candidates)
+        if weights is not None:
+            p = p * weights
+        cum = np.cumsum(p)
+        if len(cum) == 0 or cum[-1] <= 0:
+            raise ValueError('No candidate has a positive weight.')
+        idx = np.searchsorted(cum, rng.random(size) * cum[-1], side='right')
+        idx = np.minimum(idx, len(cum) - 1)
+        np.add.at(self.counts, candidates[idx], 1)
+        return idx
+
+    def merge(self, other: Union['BalancedCharSampler', np.ndarray]):
+        """Adds the counts of another sampler (or a counts array) to this one."""
+        counts = other.counts if isinstance(other, BalancedCharSampler) \
+            else np.asarray(other)
+        if counts.shape != self.counts.shape:
+            raise ValueError(
+                f'Cannot merge counts of shape {counts.shape} into {self.counts.shape}.')
+        self.counts += counts
+
+    def state_dict(self) -> dict:
+        return {'counts': self.counts.copy(), 'strength': self.strength}
+
+    def load_state_dict(self, state: dict):
+        counts = np.asarray(state['counts'], dtype=np.int64)
+        if counts.shape != self.counts.shape:
+            raise ValueError(
+                f'Cannot load counts of shape {counts.shape} into {self.counts.shape}.')
+        self.counts = counts.copy()
+        self.strength = state.get('strength', self.strength)
@@ -1,11 +1,154 @@
 import math
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Tuple, Union
+from typing import List, NamedTuple, Optional, Tuple, Union
 
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
-__all__ = ["load_truetype_font", "text2image"]
+__all__ = [
+    "load_truetype_font", "text2image", "text2image_batch", "text2mask",
+    "colorize_mask", "measure_text", "GlyphCache", "get_glyph_cache",
+    "FontPool", "get_font_pool", "FontTable",
+]
+
+# Unicode blocks that need contextual shaping (joining, reordering,
+# combining). Text containing them always goes through the Pillow layout.
+_COMPLEX_SCRIPT_RANGES = (
+    (0x0590, 0x08FF),  # Hebrew, Arabic, Syriac, Thaana, NKo, ...
+    (0x0900, 0x0DFF),  # Indic scripts
+    (0x0E00, 0x0FFF),  # Thai, Lao, Tibetan
+    (0x1000, 0x109F),  # Myanmar
+    (0x1100, 0x11FF),  # Hangul Jamo
+    (0x1780, 0x17FF),  # Khmer
+    (0x200B, 0x200F),  # Zero width joiners and directional marks
+    (0x202A, 0x202E),  # Directional formatting
+    (0xFB1D, 0xFDFF),  # Hebrew and Arabic presentation forms
+    (0xFE00, 0xFE0F),  # Variation selectors
+    (0xFE70, 0xFEFF),  # Arabic presentation forms B
+)
+
+# `ImageFont.truetype` arguments that are part of the `FontPool` key.
+_FONT_POOL_KWARGS = {"index", "encoding", "layout_engine"}
+
+
+class FontPool:
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        """LRU pool of loaded `ImageFont.FreeTypeFont` objects.
+
+        Fonts are keyed by `(resolved path, size, index, encoding,
+        layout_engine)`, so a face is parsed at most once no matter how its
+        path is spelled. An entry is reloaded if the file on disk changed.
+        The memory of a face is accounted as the size of its font file, and
+        the least recently used faces are dropped once the total exceeds
+        `max_bytes`. Pooled fonts are shared, do not modify them in place
+        (e.g. with `set_variation_by_name`).
+
+        Args:
+            max_bytes (int, optional):
+                Memory cap of the pooled faces in bytes. Defaults to 512 MiB.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._nbytes = 0
+        self._fonts = OrderedDict()
+
+    def __len__(self):
+        return len(self._fonts)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def get(
+        self,
+        font_path: Union[str, Path],
+        size: Optional[int] = None,
+        index: int = 0,
+        encoding: str = "",
+        layout_engine: Optional[int] = None,
+    ) -> ImageFont.FreeTypeFont:
+        """Returns the pooled font, loading it with `ImageFont.truetype` on a miss."""
+        path = Path(font_path).resolve()
+        key = (str(path), size, index, encoding, layout_engine)
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self._fonts.get(key)
+        if entry is not None and entry[1] == signature:
+            self._fonts.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        font = ImageFont.truetype(
+            str(path), size=size, index=index, encoding=encoding,
+            layout_engine=layout_engine
+        )
+        if entry is not None:
+            self._nbytes -= entry[1][1]
+        self._fonts[key] = (font, signature)
+        self._fonts.move_to_end(key)
+        self._nbytes += signature[1]
+        while self._nbytes > self.max_bytes and len(self._fonts) > 1:
+            _, (_, evicted) = self._fonts.popitem(last=False)
+            self._nbytes -= evicted[1]
+            self.evictions += 1
+
+        return font
+
+    def discard(self, font_path: Union[str, Path]):
+        """Drops every pooled face loaded from `font_path`, and its measurements."""
+        path = str(Path(font_path).resolve())
+        for key in [k for k in self._fonts if k[0] == path]:
+            _, signature = self._fonts.pop(key)
+            self._nbytes -= signature[1]
+        for key in [k for k in _MEASURE_CACHE if k[0] == path]:
+            del _MEASURE_CACHE[key]
+
+    def clear(self):
+        """Drops all pooled fonts and measurements, and resets the counters."""
+        self._fonts.clear()
+        _MEASURE_CACHE.clear()
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and memory usage of the pool."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "num_entries": len(self._fonts),
+            "nbytes": self._nbytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_FONT_POOL = FontPool()
+
+
+def get_font_pool() -> FontPool:
+    """Returns the process-wide font pool used by `load_truetype_font`.
+
+    Example:
+        ```python
+        pool = get_font_pool()
+        pool.max_bytes = 2 * 1024 * 1024 * 1024
+        print(pool.stats())
+        ```
+    """
+    return _FONT_POOL
 
 
 def load_truetype_font(
@@ -34,6 +177,9 @@ def load_truetype_font(
             Defaults to `False`.
         **kwargs:
             Additional keyword arguments to pass to `ImageFont.truetype`.
+            Fonts loaded from a path with only `index`, `encoding` or
+            `layout_engine` are shared through the process-wide `FontPool`
+            (see `get_font_pool`).
 
     Returns:
         Union[ImageFont.FreeTypeFont, Tuple[ImageFont.FreeTypeFont, dict]]:
@@ -62,7 +208,10 @@ def load_truetype_font(
     else:
         if isinstance(font_source, Path):
             font_source = str(font_source)
-        loaded_font = ImageFont.truetype(font_source, size=size, **kwargs)
+        if isinstance(font_source, str) and set(kwargs) <= _FONT_POOL_KWARGS:
+            loaded_font = _FONT_POOL.get(font_source, size=size, **kwargs)
+        else:
+            loaded_font = ImageFont.truetype(font_source, size=size, **kwargs)
         font_path = font_source
         font_size = size
 
@@ -82,6 +231,83 @@ def load_truetype_font(
     return loaded_font
 
 
+class FontTable(Mapping):
+
+    def __init__(
+        self,
+        font_paths: Optional[dict] = None,
+        size: Optional[int] = None,
+        max_open_fonts: Optional[int] = 256,
+        layout_engine: Optional[int] = None,
+    ):
+        """Lazy mapping of font names to `ImageFont.FreeTypeFont` objects.
+
+        Only the font paths are stored up front. A face is loaded through
+        `load_truetype_font` the first time its name is looked up, and at
+        most `max_open_fonts` faces are kept open. The least recently used
+        face is then dropped, together with its entry in the `FontPool`, so
+        it can be freed. Membership, iteration and `len` never open a face.
+
+        Args:
+            font_paths (Optional[dict], optional):
+                Mapping of font names to font file paths. Defaults to `None`.
+            size (Optional[int], optional):
+                The size of the loaded fonts. Defaults to `None`.
+            max_open_fonts (Optional[int], optional):
+                Maximum number of open faces, `None` for no limit.
+                Defaults to 256.
+            layout_engine (Optional[int], optional):
+                The `ImageFont.Layout` of the loaded fonts, `None` for the
+                Pillow default. Defaults to `None`.
+        """
+        if max_open_fonts is not None and max_open_fonts < 1:
+            raise ValueError(
+                f"max_open_fonts must be positive or None, got {max_open_fonts}.")
+        self.size = size
+        self.max_open_fonts = max_open_fonts
+        self.layout_engine = layout_engine
+        self._paths = {}
+        self._fonts = OrderedDict()
+        for name, path in (font_paths or {}).items():
+            self.add(name, path)
+
+    def add(self, name: str, font_path: Union[str, Path]):
+        """Registers `font_path` under `name` without loading it."""
+        self._paths[name] = Path(font_path)
+        self._fonts.pop(name, None)
+
+    def path(self, name: str) -> Path:
+        return self._paths[name]
+
+    @property
+    def num_open(self) -> int:
+        return len(self._fonts)
+
+    def __getitem__(self, name: str) -> ImageFont.FreeTypeFont:
+        font = self._fonts.get(name)
+        if font is not None:
+            self._fonts.move_to_end(name)
+            return font
+
+        font = load_truetype_font(
+            self._paths[name], size=self.size, layout_engine=self.layout_engine)
+        self._fonts[name] = font
+        if self.max_open_fonts is not None:
+            while len(self._fonts) > self.max_open_fonts:
+                evicted, _ = self._fonts.popitem(last=False)
+                _FONT_POOL.discard(self._paths[evicted])
+        return font
+
+    def __contains__(self, name) -> bool:
+        return name in self._paths
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+
 def _clamp_color(
     color: Union[Tuple[int, int, int], List[int]]
 ) -> Tuple[int, int, int]:
@@ -110,6 +336,509 @@ def _clamp_color(
     return tuple(min(255, max(0, int(c))) for c in color)
 
 
+def _pillow_direction(
+    font: ImageFont.FreeTypeFont,
+    direction: str,
+) -> Optional[str]:
+    """Pillow only takes a direction with raqm, the basic layout is LTR."""
+    if direction == 'ltr' and \
+            getattr(font, 'layout_engine', None) == ImageFont.Layout.BASIC:
+        return None
+    return direction
+
+
+def _mask_to_array(mask) -> np.ndarray:
+    """Converts a Pillow core mask returned by `getmask2` into a uint8 array."""
+    return np.asarray(Image.Image()._new(mask))
+
+
+class Glyph(NamedTuple):
+    """A rasterized glyph stored in the `GlyphCache`.
+
+    Attributes:
+        mask (np.ndarray): Coverage mask of the glyph fill, uint8 `(h, w)`.
+        offset (Tuple[int, int]): Top-left position of `mask` relative to
+            the pen position on the baseline.
+        stroke_mask (Optional[np.ndarray]): Coverage mask of the stroked
+            glyph, or `None` if the stroke width is `0`.
+        stroke_offset (Optional[Tuple[int, int]]): Position of `stroke_mask`
+            relative to the pen position on the baseline.
+        advance (float): Horizontal advance of the glyph in pixels.
+    """
+    mask: np.ndarray
+    offset: Tuple[int, int]
+    stroke_mask: Optional[np.ndarray]
+    stroke_offset: Optional[Tuple[int, int]]
+    advance: float
+
+
+class GlyphCache:
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """LRU cache of rasterized glyph masks and advance metrics.
+
+        Glyphs are keyed by `(font path, font size, face index, stroke width,
+        codepoint)`, so every font object loaded from the same file and size
+        shares the same entries. Pair kerning adjustments are cached next to
+        the glyphs. The least recently used entries are evicted once the
+        total size of the cache exceeds `max_bytes`.
+
+        Args:
+            max_bytes (int, optional):
+                Memory cap of the cached masks in bytes. Defaults to 64 MiB.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._nbytes = 0
+        self._glyphs = OrderedDict()
+
+    def __len__(self):
+        return len(self._glyphs)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    @staticmethod
+    def is_cacheable(font: ImageFont.FreeTypeFont) -> bool:
+        """Fonts loaded from file-like objects have no stable key."""
+        return isinstance(getattr(font, "path", None), (str, bytes, Path))
+
+    def get(
+        self,
+        font: ImageFont.FreeTypeFont,
+        char: str,
+        stroke_width: int = 0
+    ) -> Glyph:
+        """Returns the cached glyph of `char`, rasterizing it on a miss."""
+        key = (str(font.path), font.size, font.index, stroke_width, ord(char))
+        glyph = self._glyphs.get(key)
+        if glyph is not None:
+            self._glyphs.move_to_end(key)
+            self.hits += 1
+            return glyph
+
+        self.misses += 1
+        mask, offset = font.getmask2(char, "L", anchor="ls")
+        stroke_mask, stroke_offset = None, None
+        if stroke_width > 0:
+            stroke_mask, stroke_offset = font.getmask2(
+                char, "L", stroke_width=stroke_width, anchor="ls",
+                stroke_filled=True
+            )
+            stroke_mask = _mask_to_array(stroke_mask)
+
+        glyph = Glyph(
+            mask=_mask_to_array(mask),
+            offset=offset,
+            stroke_mask=stroke_mask,
+            stroke_offset=stroke_offset,
+            advance=font.getlength(char),
+        )
+        self._put(key, glyph)
+
+        return glyph
+
+    def get_kerning(
+        self,
+        font: ImageFont.FreeTypeFont,
+        left_char: str,
+        right_char: str,
+    ) -> float:
+        """Returns the kerning adjustment between two glyphs in pixels."""
+        key = (str(font.path), font.size, font.index,
+               "kern", ord(left_char), ord(right_char))
+        kerning = self._glyphs.get(key)
+        if kerning is not None:
+            self._glyphs.move_to_end(key)
+            return kerning
+
+        kerning = font.getlength(left_char + right_char) \
+            - font.getlength(left_char) - font.getlength(right_char)
+        self._put(key, kerning)
+
+        return kerning
+
+    def _put(self, key: tuple, value: Union[Glyph, float]):
+        self._glyphs[key] = value
+        self._nbytes += self._sizeof(value)
+        while self._nbytes > self.max_bytes and len(self._glyphs) > 1:
+            _, evicted = self._glyphs.popitem(last=False)
+            self._nbytes -= self._sizeof(evicted)
+            self.evictions += 1
+
+    @staticmethod
+    def _sizeof(value: Union[Glyph, float]) -> int:
+        if not isinstance(value, Glyph):
+            return 64  # Approximate footprint of a cached kerning pair
+        nbytes = value.mask.nbytes
+        if value.stroke_mask is not None:
+            nbytes += value.stroke_mask.nbytes
+        return nbytes
+
+    def clear(self):
+        """Drops all cached glyphs and resets the counters."""
+        self._glyphs.clear()
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and memory usage of the cache."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "num_entries": len(self._glyphs),
+            "nbytes": self._nbytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_GLYPH_CACHE = GlyphCache()
+
+
+def get_glyph_cache() -> GlyphCache:
+    """Returns the process-wide glyph cache used by `text2image`.
+
+    Example:
+        ```python
+        cache = get_glyph_cache()
+        cache.max_bytes = 256 * 1024 * 1024
+        print(cache.stats())
+        ```
+    """
+    return _GLYPH_CACHE
+
+
+@lru_cache(maxsize=65536)
+def _is_simple_char(char: str) -> bool:
+    codepoint = ord(char)
+    if any(start <= codepoint <= end for start, end in _COMPLEX_SCRIPT_RANGES):
+        return False
+    return unicodedata.category(char) not in ("Mn", "Mc", "Me", "Cc", "Cf")
+
+
+def _is_simple_text(text: str) -> bool:
+    """Whether `text` can be laid out glyph by glyph without shaping."""
+    return len(text) > 0 and all(_is_simple_char(c) for c in text)
+
+
+def _composite_over(target: np.ndarray, source: np.ndarray):
+    """Draws a glyph mask over `target` in place, as Pillow does.
+
+    Overlapping glyphs are blended with `source + target * (255 - source)
+    / 255`, rounded like Pillow's `MULDIV255`.
+    """
+    tmp = target.astype(np.uint32) * (255 - source.astype(np.uint32)) + 128
+    target[:] = source + (((tmp >> 8) + tmp) >> 8)
+
+
+def _compose_glyphs(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    stroke_width: int,
+    cache: GlyphCache,
+) -> Optional["TextMasks"]:
+    """Lays out a single line of LTR text from cached glyphs.
+
+    Returns:
+        Optional[TextMasks]:
+            The fill and stroke masks, both covering the bounding box of the
+            text, using the same top-left anchor as `ImageDraw.textbbox`.
+            Returns `None` if the text has no visible glyph.
+    """
+    glyphs = [cache.get(font, char, stroke_width) for char in text]
+
+    # The pen moves in 26.6 fixed point like FreeType, and is only rounded
+    # (half up) to place each glyph.
+    pen_x = 0
+    boxes = []
+    for i, glyph in enumerate(glyphs):
+        if i > 0:
+            pen_x += round(cache.get_kerning(font, text[i - 1], text[i]) * 64)
+        x = (pen_x + 32) >> 6
+        mask, (ox, oy) = glyph.mask, glyph.offset
+        if glyph.stroke_mask is not None:
+            mask, (ox, oy) = glyph.stroke_mask, glyph.stroke_offset
+        boxes.append((x, x + ox, oy, x + ox + mask.shape[1], oy + mask.shape[0]))
+        pen_x += round(glyph.advance * 64)
+
+    if not any(glyph.mask.any() for glyph in glyphs):
+        return None
+
+    left = min(box[1] for box in boxes)
+    top = min(box[2] for box in boxes)
+    right = max(box[3] for box in boxes)
+    bottom = max(box[4] for box in boxes)
+
+    canvas_size = (bottom - top, right - left)
+    fill_mask = np.zeros(canvas_size, dtype=np.uint8)
+    stroke_mask = np.zeros(canvas_size, dtype=np.uint8) \
+        if stroke_width > 0 else None
+
+    for glyph, (x, *_) in zip(glyphs, boxes):
+        targets = [(fill_mask, glyph.mask, glyph.offset)]
+        if stroke_mask is not None:
+            targets.append(
+                (stroke_mask, glyph.stroke_mask, glyph.stroke_offset))
+        for canvas, mask, (ox, oy) in targets:
+            x0, y0 = x + ox - left, oy - top
+            region = canvas[y0:y0 + mask.shape[0], x0:x0 + mask.shape[1]]
+            _composite_over(region, mask)
+
+    ascent, _ = font.getmetrics()
+    bbox = (left, top + ascent, right, bottom + ascent)
+    offset = bbox[:2]
+
+    return TextMasks(
+        fill_mask, offset, stroke_mask,
+        offset if stroke_mask is not None else None, bbox
+    )
+
+
+# Shared draw object used for measuring multiline text, so `measure_text`
+# never allocates a scratch image per call.
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+# Extra layout options `getmask2` understands; anything else (e.g. `anchor`,
+# `embedded_color`) is left to `ImageDraw.text`.
+_LINE_LAYOUT_KWARGS = ("features", "language")
+
+
+class TextMasks(NamedTuple):
+    """Coverage masks of a single line of text.
+
+    Attributes:
+        fill (np.ndarray): Coverage mask of the text fill, uint8 `(h, w)`.
+        fill_offset (Tuple[int, int]): Top-left position of `fill` relative
+            to the text origin.
+        stroke (Optional[np.ndarray]): Coverage mask of the stroked text, or
+            `None` if the stroke width is `0`.
+        stroke_offset (Optional[Tuple[int, int]]): Top-left position of
+            `stroke` relative to the text origin.
+        bbox (Tuple[int, int, int, int]): Bounding box of the text
+            `(left, top, right, bottom)`, as returned by
+            `ImageDraw.textbbox` at the origin.
+    """
+    fill: np.ndarray
+    fill_offset: Tuple[int, int]
+    stroke: Optional[np.ndarray]
+    stroke_offset: Optional[Tuple[int, int]]
+    bbox: Tuple[int, int, int, int]
+
+
+@lru_cache(maxsize=4096)
+def _resolve_font_path(font_path: Union[str, bytes, Path]) -> str:
+    """Normalizes a font path like `FontPool`, so `discard` finds its entries."""
+    if isinstance(font_path, bytes):
+        font_path = font_path.decode()
+    return str(Path(font_path).resolve())
+
+
+# Bounding boxes memoized by `measure_text`. Keys hold the font path rather
+# than the font, so measuring never keeps a face alive.
+_MEASURE_CACHE = OrderedDict()
+_MEASURE_CACHE_SIZE = 16384
+
+
+def _measure_text(font, text, spacing, align, direction, stroke_width):
+    if not GlyphCache.is_cacheable(font):
+        return _MEASURE_DRAW.textbbox(
+            (0, 0),
+            text,
+            font=font,
+            spacing=spacing,
+            align=align,
+            direction=_pillow_direction(font, direction),
+            stroke_width=stroke_width,
+        )
+
+    key = (_resolve_font_path(font.path), font.size, font.index,
+           font.layout_engine, text, spacing, align, direction, stroke_width)
+    bbox = _MEASURE_CACHE.get(key)
+    if bbox is not None:
+        _MEASURE_CACHE.move_to_end(key)
+        return bbox
+
+    bbox = _MEASURE_DRAW.textbbox(
+        (0, 0),
+        text,
+        font=font,
+        spacing=spacing,
+        align=align,
+        direction=_pillow_direction(font, direction),
+        stroke_width=stroke_width,
+    )
+    _MEASURE_CACHE[key] = bbox
+    if len(_MEASURE_CACHE) > _MEASURE_CACHE_SIZE:
+        _MEASURE_CACHE.popitem(last=False)
+    return bbox
+
+
+def measure_text(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    spacing: int = 4,
+    align: str = 'left',
+    direction: str = 'ltr',
+    stroke_width: int = 0,
+    **kwargs
+) -> Tuple[int, int, int, int]:
+    """Measures the bounding box of text without rasterizing it.
+
+    Results are memoized on the font file, size, index and layout engine
+    together with `(text, spacing, align, direction, stroke_width)`, so
+    measuring the same text again skips the layout. Calls with extra layout
+    `kwargs`, or with fonts loaded from file-like objects, are not memoized.
+
+    Args:
+        text (str): The text to measure.
+        font (ImageFont.FreeTypeFont): A loaded font.
+        spacing (int, optional): Spacing between lines. Defaults to `4`.
+        align (str, optional): Alignment of multiline text. Defaults to `'left'`.
+        direction (str, optional): Direction of the text. Defaults to `'ltr'`.
+        stroke_width (int, optional): Width of the text stroke. Defaults to `0`.
+        **kwargs: Additional arguments passed to `ImageDraw.textbbox`.
+
+    Returns:
+        Tuple[int, int, int, int]: The bounding box `(left, top, right, bottom)`
+            of the text drawn at the origin.
+    """
+    if kwargs:
+        return _MEASURE_DRAW.textbbox(
+            (0, 0),
+            text,
+            font=font,
+            spacing=spacing,
+            align=align,
+            direction=_pillow_direction(font, direction),
+            stroke_width=stroke_width,
+            **kwargs
+        )
+    return _measure_text(font, text, spacing, align, direction, stroke_width)
+
+
+def _render_line_masks(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    direction: str,
+    stroke_width: int,
+    **kwargs
+) -> TextMasks:
+    """Shapes and rasterizes a single line of text in one layout pass.
+
+    The bounding box is taken from the rasterized mask itself, so no
+    separate `textbbox` measurement is needed.
+    """
+    direction = _pillow_direction(font, direction)
+    fill, fill_offset = font.getmask2(text, "L", direction=direction, **kwargs)
+    fill = _mask_to_array(fill)
+
+    if stroke_width > 0:
+        stroke, stroke_offset = font.getmask2(
+            text, "L", direction=direction, stroke_width=stroke_width,
+            stroke_filled=True, **kwargs
+        )
+        stroke = _mask_to_array(stroke)
+        box_mask, box_offset = stroke, stroke_offset
+    else:
+        stroke, stroke_offset = None, None
+        box_mask, box_offset = fill, fill_offset
+
+    bbox = (
+        box_offset[0],
+        box_offset[1],
+        box_offset[0] + box_mask.shape[1],
+        box_offset[1] + box_mask.shape[0],
+    )
+
+    return TextMasks(fill, fill_offset, stroke, stroke_offset, bbox)
+
+
+def _paste_mask(
+    img: Image.Image,
+    color: Tuple[int, int, int],
+    mask: np.ndarray,
+    xy: Tuple[int, int],
+):
+    if mask.size:
+        img.paste(color, xy, Image.fromarray(mask))
+
+
+def _layout_text(
+    text: str,
+    font: Union[str, Path, ImageFont.FreeTypeFont],
+    size: int,
+    direction: str,
+    spacing: int,
+    align: str,
+    stroke_width: int,
+    use_glyph_cache: bool,
+    **kwargs
+) -> Tuple[ImageFont.FreeTypeFont, dict, Optional[TextMasks], Tuple[int, int, int, int]]:
+    """Loads the font and lays out the text for `text2image` and `text2mask`.
+
+    Returns:
+        Tuple[ImageFont.FreeTypeFont, dict, Optional[TextMasks], Tuple[int, int, int, int]]:
+            The loaded font, its metadata, the rasterized masks of single-line
+            text (`None` for text that has to be drawn by `ImageDraw`) and the
+            bounding box of the text.
+    """
+    if direction not in ('ltr', 'rtl', 'ttb'):
+        raise ValueError(
+            f"Invalid direction '{direction}'. Must be 'ltr', 'rtl', or 'ttb'.")
+
+    if isinstance(font, tuple) and isinstance(font[0], ImageFont.FreeTypeFont):
+        loaded_font, font_meta = font
+    elif isinstance(font, (str, Path, ImageFont.FreeTypeFont)):
+        loaded_font, font_meta = load_truetype_font(
+            font, size=size, return_infos=True)
+    else:
+        raise ValueError(
+            "Invalid font source. Must be a file path, a Path object, or an ImageFont.FreeTypeFont object."
+        )
+
+    masks = None
+    try:
+        if "\n" not in text and set(kwargs) <= set(_LINE_LAYOUT_KWARGS):
+            # Raqm may substitute (ligatures) or move (GPOS) glyphs, so only
+            # the basic layout is composed from the cache.
+            if use_glyph_cache and direction == 'ltr' and not kwargs \
+                    and loaded_font.layout_engine == ImageFont.Layout.BASIC \
+                    and _is_simple_text(text) \
+                    and GlyphCache.is_cacheable(loaded_font):
+                masks = _compose_glyphs(
+                    text, loaded_font, stroke_width, get_glyph_cache())
+            if masks is None:
+                masks = _render_line_masks(
+                    text, loaded_font, direction, stroke_width, **kwargs)
+            left, top, right, bottom = masks.bbox
+        else:
+            left, top, right, bottom = measure_text(
+                text,
+                loaded_font,
+                spacing=spacing,
+                align=align,
+                direction=direction,
+                stroke_width=stroke_width,
+                **kwargs
+            )
+    except Exception as e:
+        raise ValueError(
+            f"Error rendering text: '{text}'. Reason: {e}\n"
+            f"Font info: {loaded_font.getname()}\n"
+            f"Do NOT use this font for rendering.\n"
+        )
+
+    return loaded_font, font_meta, masks, (left, top, right, bottom)
+
+
 def text2image(
     text: str,
     font: Union[str, Path, ImageFont.FreeTypeFont],
@@ -125,6 +854,7 @@ def text2image(
     stroke_width: int = 0,
     stroke_fill: Optional[Tuple[int, int, int]] = (0, 0, 0),
     return_infos: bool = False,
+    use_glyph_cache: bool = False,
     **kwargs
 ) -> Tuple[np.ndarray, dict]:
     """Renders text as an image and returns the result as a NumPy array.
@@ -169,6 +899,13 @@ def text2image(
             The RGB color of the text stroke. Defaults to `(0, 0, 0)`.
         return_infos (bool, optional):
             Whether to return metadata about the rendered text. Defaults to `False`.
+        use_glyph_cache (bool, optional):
+            Whether to compose single-line LTR text from the process-wide
+            glyph cache (see `get_glyph_cache`) instead of rasterizing every
+            glyph again, with the same pixels as Pillow. Only fonts loaded
+            with `layout_engine=ImageFont.Layout.BASIC` use it; raqm fonts,
+            text that needs complex shaping and any extra `kwargs` fall back
+            to the Pillow layout. Defaults to `False`.
         **kwargs: Additional arguments to customize text rendering.
 
     Returns:
@@ -207,40 +944,18 @@ def text2image(
         ```
     """
 
-    if direction not in ('ltr', 'rtl', 'ttb'):
-        raise ValueError(
-            f"Invalid direction '{direction}'. Must be 'ltr', 'rtl', or 'ttb'.")
-
-    if isinstance(font, tuple) and isinstance(font[0], ImageFont.FreeTypeFont):
-        loaded_font, font_meta = font
-    elif isinstance(font, (str, Path, ImageFont.FreeTypeFont)):
-        loaded_font, font_meta = load_truetype_font(
-            font, size=size, return_infos=True)
-    else:
-        raise ValueError(
-            "Invalid font source. Must be a file path, a Path object, or an ImageFont.FreeTypeFont object."
-        )
-
-    tmp_img = Image.new("RGB", (1, 1), color=(0, 0, 0))
-    tmp_draw = ImageDraw.Draw(tmp_img)
-    try:
-        left, top, right, bottom = tmp_draw.textbbox(
-            (0, 0),
-            text,
-            font=loaded_font,
-            spacing=spacing,
-            align=align,
-            direction=direction,
-            stroke_width=stroke_width,
-            **kwargs
-        )
-        _offset = (-left, -top)
-    except Exception as e:
-        raise ValueError(
-            f"Error rendering text: '{text}'. Reason: {e}\n"
-            f"Font info: {loaded_font.getname()}\n"
-            f"Do NOT use this font for rendering.\n"
-        )
+    loaded_font, font_meta, masks, (left, top, right, bottom) = _layout_text(
+        text,
+        font,
+        size=size,
+        direction=direction,
+        spacing=spacing,
+        align=align,
+        stroke_width=stroke_width,
+        use_glyph_cache=use_glyph_cache,
+        **kwargs
+    )
+    _offset = (-left, -top)
 
     text_width = max(int(math.ceil(right - left)), 1)
     text_height = max(int(math.ceil(bottom - top)), 1)
@@ -260,27 +975,235 @@ def text2image(
     background_color = _clamp_color(background_color)
     stroke_fill = _clamp_color(stroke_fill)
 
-    img = Image.new(
-        "RGB",
-        (text_width, text_height),
-        color=background_color
-    )
+    if masks is not None and masks.stroke is None:
+        # Single-line text without stroke: the mask is placed and colorized
+        # with NumPy, with the same rounding as `Image.paste`.
+        fill_mask = np.zeros((text_height, text_width), dtype=np.uint8)
+        _blit_mask(fill_mask, masks.fill, (
+            offset[0] + masks.fill_offset[0],
+            offset[1] + masks.fill_offset[1]
+        ))
+        img_arr = colorize_mask(
+            fill_mask,
+            text_color=text_color,
+            background_color=background_color,
+        )
+    else:
+        img = Image.new(
+            "RGB",
+            (text_width, text_height),
+            color=background_color
+        )
+        if masks is not None:
+            _paste_mask(img, stroke_fill, masks.stroke, (
+                offset[0] + masks.stroke_offset[0],
+                offset[1] + masks.stroke_offset[1]
+            ))
+            _paste_mask(img, text_color, masks.fill, (
+                offset[0] + masks.fill_offset[0],
+                offset[1] + masks.fill_offset[1]
+            ))
+        else:
+            drawer = ImageDraw.Draw(img)
+            drawer.text(
+                xy=offset,
+                text=text,
+                font=loaded_font,
+                fill=text_color,
+                spacing=spacing,
+                align=align,
+                direction=_pillow_direction(loaded_font, direction),
+                stroke_width=stroke_width,
+                stroke_fill=stroke_fill,
+                **kwargs
+            )
+        img_arr = np.array(img)
+
+    if return_infos:
+        infos = {
+            "text": text,
+            "bbox(xyxy)": (left, top, right, bottom),
+            "bbox(wh)": (text_width, text_height),
+            "offset": offset,
+            "direction": direction,
+            "background_color": background_color,
+            "text_color": text_color,
+            "spacing": spacing,
+            "align": align,
+            "stroke_width": stroke_width,
+            "stroke_fill": stroke_fill,
+            "font_path": font_meta.get("font_path"),
+            "font_size_actual": font_meta.get("font_size"),
+            "font_name": font_meta.get("font_name"),
+        }
+
+        return img_arr, infos
+
+    return img_arr
+
 
-    drawer = ImageDraw.Draw(img)
-    drawer.text(
-        xy=offset,
-        text=text,
-        font=loaded_font,
-        fill=text_color,
+def _blit_mask(canvas: np.ndarray, mask: np.ndarray, xy: Tuple[int, int]):
+    """Writes `mask` into `canvas` at `xy`, clipping at the canvas borders."""
+    x, y = xy
+    h, w = mask.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1 = min(x + w, canvas.shape[1])
+    y1 = min(y + h, canvas.shape[0])
+    if x1 <= x0 or y1 <= y0:
+        return
+    region = canvas[y0:y1, x0:x1]
+    np.maximum(region, mask[y0 - y:y1 - y, x0 - x:x1 - x], out=region)
+
+
+def _draw_masks(
+    fill_mask: np.ndarray,
+    stroke_mask: Optional[np.ndarray],
+    text: str,
+    loaded_font: ImageFont.FreeTypeFont,
+    masks: Optional[TextMasks],
+    offset: Tuple[int, int],
+    direction: str,
+    spacing: int,
+    align: str,
+    stroke_width: int,
+    **kwargs
+):
+    """Draws the laid out text into zeroed `fill_mask` / `stroke_mask` canvases."""
+    if masks is not None:
+        _blit_mask(fill_mask, masks.fill, (
+            offset[0] + masks.fill_offset[0],
+            offset[1] + masks.fill_offset[1]
+        ))
+        if stroke_mask is not None:
+            _blit_mask(stroke_mask, masks.stroke, (
+                offset[0] + masks.stroke_offset[0],
+                offset[1] + masks.stroke_offset[1]
+            ))
+        return
+
+    # Multiline text: ImageDraw lays out the lines. The fill mask is drawn
+    # with a black stroke so line positions match the stroked layout.
+    layers = [(fill_mask, 0)]
+    if stroke_mask is not None:
+        layers.append((stroke_mask, 255))
+    for canvas, stroke_ink in layers:
+        img = Image.new("L", canvas.shape[::-1], 0)
+        ImageDraw.Draw(img).text(
+            xy=offset,
+            text=text,
+            font=loaded_font,
+            fill=255 if canvas is fill_mask else stroke_ink,
+            spacing=spacing,
+            align=align,
+            direction=_pillow_direction(loaded_font, direction),
+            stroke_width=stroke_width,
+            stroke_fill=stroke_ink,
+            **kwargs
+        )
+        canvas[:] = np.asarray(img)
+
+
+def text2mask(
+    text: str,
+    font: Union[str, Path, ImageFont.FreeTypeFont],
+    size: int = 32,
+    direction: str = 'ltr',
+    offset: Optional[Tuple[int, int]] = None,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    spacing: int = 4,
+    align: str = 'left',
+    stroke_width: int = 0,
+    return_infos: bool = False,
+    use_glyph_cache: bool = False,
+    **kwargs
+) -> Union[Tuple[np.ndarray, Optional[np.ndarray]], Tuple[np.ndarray, Optional[np.ndarray], dict]]:
+    """Renders the coverage masks of text without applying any color.
+
+    This is the mask-first counterpart of `text2image`: the layout and
+    image size are identical, but instead of an RGB image it returns a
+    single-channel coverage mask of the text and, if `stroke_width > 0`, a
+    coverage mask of the stroke. The masks can be turned into any number of
+    colored images with `colorize_mask`, without rendering the text again.
+
+    Args:
+        text (str): The text to render.
+        font (Union[str, Path, ImageFont.FreeTypeFont]):
+            The font source, see `text2image`.
+        size (int, optional): The desired font size. Defaults to `32`.
+        direction (str, optional):
+            The direction of the text. Must be `'ltr'`, `'rtl'`, or `'ttb'`.
+            Defaults to `'ltr'`.
+        offset (Optional[Tuple[int, int]], optional):
+            The offset of the text in the image. If `None`, it is calculated
+            automatically. Defaults to `None`.
+        width (Optional[int], optional):
+            The width of the masks. If `None`, it is calculated automatically.
+            Defaults to `None`.
+        height (Optional[int], optional):
+            The height of the masks. If `None`, it is calculated automatically.
+            Defaults to `None`.
+        spacing (int, optional):
+            The spacing between lines of text. Defaults to `4`.
+        align (str, optional):
+            The alignment of the text. Must be `'left'`, `'center'`, or
+            `'right'`. Defaults to `'left'`.
+        stroke_width (int, optional):
+            The width of the text stroke. Defaults to `0`.
+        return_infos (bool, optional):
+            Whether to return metadata about the rendered text. Defaults to `False`.
+        use_glyph_cache (bool, optional):
+            Whether to compose simple text from the glyph cache, see
+            `text2image`. Defaults to `False`.
+        **kwargs: Additional arguments to customize text rendering.
+
+    Returns:
+        Union[Tuple[np.ndarray, Optional[np.ndarray]], Tuple[np.ndarray, Optional[np.ndarray], dict]]:
+            - `np.ndarray`: The uint8 coverage mask of the text fill `(H, W)`.
+            - `Optional[np.ndarray]`: The uint8 coverage mask of the stroke
+              `(H, W)`, or `None` if `stroke_width` is `0`.
+            - `dict`: If `return_infos` is `True`, the metadata of
+              `text2image` without the color entries.
+
+    Example:
+        ```python
+        fill, stroke = text2mask("Hello", font="arial.ttf", stroke_width=2)
+        img = colorize_mask(fill, stroke, text_color=(255, 0, 0))
+        ```
+    """
+    loaded_font, font_meta, masks, (left, top, right, bottom) = _layout_text(
+        text,
+        font,
+        size=size,
+        direction=direction,
         spacing=spacing,
         align=align,
-        direction=direction,
         stroke_width=stroke_width,
-        stroke_fill=stroke_fill,
+        use_glyph_cache=use_glyph_cache,
         **kwargs
     )
 
-    img_arr = np.array(img)
+    text_width = max(int(math.ceil(right - left)), 1) \
+        if width is None else max(int(math.ceil(width)), 1)
+    text_height = max(int(math.ceil(bottom - top)), 1) \
+        if height is None else max(int(math.ceil(height)), 1)
+    offset = offset if offset is not None else (-left, -top)
+
+    fill_mask = np.zeros((text_height, text_width), dtype=np.uint8)
+    stroke_mask = np.zeros_like(fill_mask) if stroke_width > 0 else None
+    _draw_masks(
+        fill_mask,
+        stroke_mask,
+        text,
+        loaded_font,
+        masks,
+        offset,
+        direction=direction,
+        spacing=spacing,
+        align=align,
+        stroke_width=stroke_width,
+        **kwargs
+    )
 
     if return_infos:
         infos = {
@@ -289,20 +1212,235 @@ def text2image(
             "bbox(wh)": (text_width, text_height),
             "offset": offset,
             "direction": direction,
-            "background_color": background_color,
-            "text_color": text_color,
             "spacing": spacing,
             "align": align,
             "stroke_width": stroke_width,
-            "stroke_fill": stroke_fill,
             "font_path": font_meta.get("font_path"),
             "font_size_actual": font_meta.get("font_size"),
             "font_name": font_meta.get("font_name"),
         }
+        return fill_mask, stroke_mask, infos
 
-        return img_arr, infos
+    return fill_mask, stroke_mask
 
-    return img_arr
+
+def _blend(base: np.ndarray, color: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    # Same rounding as Pillow's `paste(color, box, mask)`, exact in uint16.
+    value = base * (255 - mask) + color * mask + 128
+    return ((value >> 8) + value) >> 8
+
+
+def colorize_mask(
+    fill_mask: np.ndarray,
+    stroke_mask: Optional[np.ndarray] = None,
+    text_color: Union[Tuple[int, int, int], np.ndarray] = (255, 255, 255),
+    background_color: Union[Tuple[int, int, int], np.ndarray] = (0, 0, 0),
+    stroke_fill: Union[Tuple[int, int, int], np.ndarray] = (0, 0, 0),
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Composites coverage masks into an RGB image with vectorized blending.
+
+    The background is blended with `stroke_fill` through `stroke_mask` and
+    then with `text_color` through `fill_mask`, using the same rounding as
+    Pillow, so `colorize_mask(*text2mask(...))` matches `text2image`.
+
+    Every color can also be an array of shape `(N, 3)`, in which case the
+    same masks are colorized `N` times and an `(N, H, W, 3)` array is
+    returned.
+
+    Args:
+        fill_mask (np.ndarray): The uint8 coverage mask of the text `(H, W)`.
+        stroke_mask (Optional[np.ndarray], optional):
+            The uint8 coverage mask of the stroke `(H, W)`. Defaults to `None`.
+        text_color (Union[Tuple[int, int, int], np.ndarray], optional):
+            The RGB color of the text. Defaults to `(255, 255, 255)`.
+        background_color (Union[Tuple[int, int, int], np.ndarray], optional):
+            The RGB color of the background. Defaults to `(0, 0, 0)`.
+        stroke_fill (Union[Tuple[int, int, int], np.ndarray], optional):
+            The RGB color of the stroke. Defaults to `(0, 0, 0)`.
+        out (Optional[np.ndarray], optional):
+            A uint8 array of the output shape to write the result into.
+            Defaults to `None`.
+
+    Returns:
+        np.ndarray: The uint8 RGB image `(H, W, 3)`, or `(N, H, W, 3)` for
+            batched colors.
+    """
+    def as_color(color):
+        color = np.clip(np.asarray(color, dtype=np.int64), 0, 255)
+        return color.astype(np.uint16)[..., None, None, :]
+
+    text_color = as_color(text_color)
+    background_color = as_color(background_color)
+    stroke_fill = as_color(stroke_fill)
+
+    if text_color.ndim == background_color.ndim == stroke_fill.ndim == 3:
+        # Single colors: blend every mask level once into a lookup table
+        # indexed by `stroke << 8 | fill`.
+        levels = np.arange(256, dtype=np.uint16)[:, None]
+        lut = background_color[0]
+        index = fill_mask
+        if stroke_mask is not None:
+            lut = _blend(lut, stroke_fill[0], levels)[:, None]
+            index = (stroke_mask.astype(np.uint16) << 8) | fill_mask
+        lut = _blend(lut, text_color[0], levels).reshape(-1, 3)
+        if out is None:
+            out = np.empty(fill_mask.shape + (3,), dtype=np.uint8)
+        return np.take(lut.astype(np.uint8), index, axis=0, out=out, mode='clip')
+
+    img = background_color
+    if stroke_mask is not None:
+        img = _blend(img, stroke_fill,
+                     stroke_mask[..., None].astype(np.uint16))
+    img = _blend(img, text_color, fill_mask[..., None].astype(np.uint16))
+
+    shape = np.broadcast_shapes(img.shape, fill_mask.shape + (3,))
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+    np.copyto(out, np.broadcast_to(img, shape), casting="unsafe")
+
+    return out
+
+
+def text2image_batch(
+    texts: List[str],
+    font: Union[str, Path, ImageFont.FreeTypeFont],
+    size: int = 32,
+    text_color: Union[Tuple[int, int, int], np.ndarray] = (255, 255, 255),
+    background_color: Union[Tuple[int, int, int], np.ndarray] = (0, 0, 0),
+    direction: str = 'ltr',
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    spacing: int = 4,
+    align: str = 'left',
+    stroke_width: int = 0,
+    stroke_fill: Union[Tuple[int, int, int], np.ndarray] = (0, 0, 0),
+    mask_only: bool = False,
+    use_glyph_cache: bool = False,
+    **kwargs
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Renders a batch of texts into one preallocated uint8 array.
+
+    The font is loaded once for the whole batch. Every text is laid out like
+    in `text2image` and drawn into the top-left corner of its slot; the rest
+    of the slot is background. The slots share the size `(H, W)` of the
+    largest text unless `height` / `width` are given, in which case larger
+    texts are cropped.
+
+    Args:
+        texts (List[str]): The texts to render.
+        font (Union[str, Path, ImageFont.FreeTypeFont]):
+            The font source, see `text2image`.
+        size (int, optional): The desired font size. Defaults to `32`.
+        text_color (Union[Tuple[int, int, int], np.ndarray], optional):
+            The RGB color of the text, or an `(N, 3)` array with one color
+            per text. Defaults to `(255, 255, 255)`.
+        background_color (Union[Tuple[int, int, int], np.ndarray], optional):
+            The RGB background color, or an `(N, 3)` array. Defaults to `(0, 0, 0)`.
+        direction (str, optional):
+            The direction of the text. Must be `'ltr'`, `'rtl'`, or `'ttb'`.
+            Defaults to `'ltr'`.
+        width (Optional[int], optional):
+            The width of every slot. If `None`, the largest text width is
+            used. Defaults to `None`.
+        height (Optional[int], optional):
+            The height of every slot. If `None`, the largest text height is
+            used. Defaults to `None`.
+        spacing (int, optional):
+            The spacing between lines of text. Defaults to `4`.
+        align (str, optional):
+            The alignment of the text. Must be `'left'`, `'center'`, or
+            `'right'`. Defaults to `'left'`.
+        stroke_width (int, optional):
+            The width of the text stroke. Defaults to `0`.
+        stroke_fill (Union[Tuple[int, int, int], np.ndarray], optional):
+            The RGB color of the text stroke, or an `(N, 3)` array.
+            Defaults to `(0, 0, 0)`.
+        mask_only (bool, optional):
+            If `True`, return the coverage masks of the texts (stroke
+            included) as an `(N, H, W)` array instead of colored images.
+            Defaults to `False`.
+        use_glyph_cache (bool, optional):
+            Whether to compose simple text from the glyph cache, see
+            `text2image`. Defaults to `False`.
+        **kwargs: Additional arguments to customize text rendering.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            - `np.ndarray`: The uint8 images `(N, H, W, 3)`, or the masks
+              `(N, H, W)` if `mask_only` is `True`.
+            - `np.ndarray`: The int32 width of every text `(N,)`, before
+              cropping to `W`.
+            - `np.ndarray`: The float64 bounding box of every text
+              `(N, 4)` in `(left, top, right, bottom)` layout coordinates.
+
+    Example:
+        ```python
+        imgs, widths, bboxes = text2image_batch(
+            ["Hello", "World!"], font="arial.ttf", size=48)
+        print(imgs.shape)  # (2, H, W, 3)
+        ```
+    """
+    if isinstance(font, (str, Path, ImageFont.FreeTypeFont)):
+        font = load_truetype_font(font, size=size, return_infos=True)
+
+    layouts = []
+    bboxes = np.zeros((len(texts), 4), dtype=np.float64)
+    for i, text in enumerate(texts):
+        loaded_font, _, masks, bbox = _layout_text(
+            text,
+            font,
+            size=size,
+            direction=direction,
+            spacing=spacing,
+            align=align,
+            stroke_width=stroke_width,
+            use_glyph_cache=use_glyph_cache,
+            **kwargs
+        )
+        layouts.append((masks, (-bbox[0], -bbox[1])))
+        bboxes[i] = bbox
+
+    widths = np.maximum(np.ceil(bboxes[:, 2] - bboxes[:, 0]), 1).astype(np.int32)
+    heights = np.maximum(np.ceil(bboxes[:, 3] - bboxes[:, 1]), 1).astype(np.int32)
+    batch_w = max(int(math.ceil(width)), 1) if width is not None \
+        else int(widths.max(initial=1))
+    batch_h = max(int(math.ceil(height)), 1) if height is not None \
+        else int(heights.max(initial=1))
+
+    fill_masks = np.zeros((len(texts), batch_h, batch_w), dtype=np.uint8)
+    stroke_masks = np.zeros_like(fill_masks) if stroke_width > 0 else None
+
+    for i, (text, (masks, offset)) in enumerate(zip(texts, layouts)):
+        h, w = min(heights[i], batch_h), min(widths[i], batch_w)
+        _draw_masks(
+            fill_masks[i, :h, :w],
+            stroke_masks[i, :h, :w] if stroke_masks is not None else None,
+            text,
+            loaded_font,
+            masks,
+            offset,
+            direction=direction,
+            spacing=spacing,
+            align=align,
+            stroke_width=stroke_width,
+            **kwargs
+        )
+
+    if mask_only:
+        if stroke_masks is not None:
+            np.maximum(fill_masks, stroke_masks, out=fill_masks)
+        return fill_masks, widths, bboxes
+
+    imgs = colorize_mask(
+        fill_masks,
+        stroke_masks,
+        text_color=text_color,
+        background_color=background_color,
+        stroke_fill=stroke_fill,
+    )
+
+    return imgs, widths, bboxes
 
 
 # if __name__ == "__main__":
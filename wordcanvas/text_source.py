@@ -0,0 +1,192 @@
+import mmap
+import os
+from pathlib import Path
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .font_utils import remove_control_characters
+
+__all__ = [
+    'CorpusTextSource',
+]
+
+
+class CorpusTextSource:
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        index_path: Union[str, Path] = None,
+        max_tries: int = 8,
+        chunk_size: int = 1 << 26,
+    ):
+        """Samples text spans from a UTF-8 corpus without loading it in memory.
+
+        The corpus is memory-mapped and the byte offset of every line start
+        is indexed once, in chunks of `chunk_size` bytes. A span starts at a
+        uniformly random byte of the corpus, so long lines are drawn in
+        proportion to their size, and only the bytes of the span are read
+        and decoded. Spans are cleaned with `remove_control_characters`,
+        and newlines never occur in them.
+
+        Args:
+            path (Union[str, Path]):
+                The UTF-8 corpus file.
+            index_path (Union[str, Path], optional):
+                File caching the line index. It is rebuilt when the corpus
+                changes. Defaults to None, which indexes in memory only.
+            max_tries (int, optional):
+                Spans drawn before giving up on a span fully covered by a
+                font, see `sample`. Defaults to 8.
+            chunk_size (int, optional):
+                Bytes scanned at a time while indexing. Defaults to 64 MiB.
+
+        Example:
+            ```python
+            source = CorpusTextSource('corpus.txt')
+            texts = source.sample([5, 10], rng=np.random.default_rng(0))
+            ```
+        """
+        self.path = Path(path)
+        self.index_path = None if index_path is None else Path(index_path)
+        self.max_tries = max_tries
+        self.chunk_size = chunk_size
+        self._open()
+
+    def _open(self, starts: np.ndarray = None):
+        stat = os.stat(self.path)
+        if stat.st_size == 0:
+            raise ValueError(f'Corpus {self.path} is empty.')
+        self.size = stat.st_size
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._data = np.frombuffer(self._mm, np.uint8)
+        self.starts = self._load_index(stat) if starts is None else starts
+
+    def _load_index(self, stat: os.stat_result) -> np.ndarray:
+        if self.index_path is not None and self.index_path.exists():
+            with np.load(self.index_path) as index:
+                if int(index['size']) == stat.st_size \
+                        and int(index['mtime_ns']) == stat.st_mtime_ns:
+                    return index['starts']
+
+        starts = [np.zeros(1, np.int64)]
+        for offset in range(0, self.size, self.chunk_size):
+            chunk = self._data[offset:offset + self.chunk_size]
+            starts.append(np.flatnonzero(chunk == 10) + (offset + 1))
+        starts = np.concatenate(starts)
+        if starts[-1] == self.size:
+            starts = starts[:-1]
+
+        if self.index_path is not None:
+            with open(self.index_path, 'wb') as f:
+                np.savez(
+                    f, starts=starts, size=stat.st_size,
+                    mtime_ns=stat.st_mtime_ns)
+        return starts
+
+    def __len__(self):
+        """Returns the number of lines of the corpus."""
+        return len(self.starts)
+
+    def _line_bounds(self, index: int) -> Tuple[int, int]:
+        start = int(self.starts[index])
+        if index + 1 < len(self.starts):
+            return start, int(self.starts[index + 1]) - 1
+        return start, self.size - int(self._data[-1] == 10)
+
+    def line(self, index: int) -> str:
+        """Returns the `index`-th line, without its newline."""
+        start, stop = self._line_bounds(index)
+        return bytes(self._mm[start:stop]).decode('utf-8', 'ignore').rstrip('\r')
+
+    def _span(self, offset: int, length: int) -> str:
+        line = int(np.searchsorted(self.starts, offset, side='right')) - 1
+        line_start, line_stop = self._line_bounds(line)
+
+        # Keep the span inside its line, starting on a character boundary.
+        # A character takes up to 4 bytes, so reading from `4 * length`
+        # bytes before the line end always leaves `length` characters.
+        start = min(offset, max(line_start, line_stop - 4 * length))
+        while start < line_stop and self._data[start] & 0xC0 == 0x80:
+            start += 1
+        stop = min(line_stop, max(offset, start) + 4 * length)
+        text = bytes(self._mm[start:stop]).decode('utf-8', 'ignore')
+
+        # Begin at `offset` unless fewer than `length` characters follow it.
+        skip = len(bytes(self._mm[start:offset]).decode('utf-8', 'ignore'))
+        text = text[min(skip, max(len(text) - length, 0)):]
+        return remove_control_characters(text).strip()[:length]
+
+    def sample(
+        self,
+        lengths: Sequence[int],
+        rng: np.random.Generator = None,
+        codepoints: np.ndarray = None,
+    ) -> List[str]:
+        """Draws one span of at most `lengths[i]` characters for each `i`.
+
+        Args:
+            lengths (Sequence[int]):
+                Maximum number of characters of each span.
+            rng (np.random.Generator, optional):
+                Random generator. Defaults to a fresh one.
+            codepoints (np.ndarray, optional):
+                Sorted code points covered by the font, e.g.
+                `FontCharsTables.codepoints(name)`. A span with other
+                characters is drawn again, up to `max_tries` times, then the
+                unsupported characters of the last one are dropped. The
+                result may thus be empty.
+
+        Returns:
+            List[str]: The spans.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        texts = []
+        for length in lengths:
+            for _ in range(max(self.max_tries, 1)):
+                text = self._span(int(rng.integers(0, self.size)), int(length))
+                if codepoints is None:
+                    break
+                covered = _covered(text, codepoints)
+                if text and covered.all():
+                    break
+            else:
+                text = ''.join(c for c, ok in zip(text, covered) if ok)
+            texts.append(text)
+        return texts
+
+    def close(self):
+        self._data = None
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getstate__(self):
+        # The map is reopened by each process, the index travels only if
+        # it is not cached on disk.
+        state = self.__dict__.copy()
+        for key in ('_mm', '_data', 'size'):
+            state.pop(key)
+        if self.index_path is not None:
+            state.pop('starts')
+        return state
+
+    def __setstate__(self, state):
+        starts = state.pop('starts', None)
+        self.__dict__.update(state)
+        self._open(starts)
+
+
+def _covered(text: str, codepoints: np.ndarray) -> np.ndarray:
+    """Returns whether each character of `text` is in the sorted `codepoints`."""
+    cps = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), '<u4')
+    if len(codepoints) == 0:
+        return np.zeros(len(cps), bool)
+    idx = np.searchsorted(codepoints, cps)
+    return codepoints[np.minimum(idx, len(codepoints) - 1)] == cps
@@ -1,15 +1,27 @@
-import random
+import math
+import os
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from enum import IntEnum
 from pathlib import Path
-from typing import List, Tuple, Union
+from typing import Dict, List, Tuple, Union
 
 import capybara as cb
+import cv2
 import numpy as np
 import regex
-from prettytable import PrettyTable
+from PIL import ImageFont, features
 
-from .font_utils import get_supported_characters
-from .text_image_renderer import load_truetype_font, text2image
+from .font_utils import (CharsTable, FontCharsTables, FontCoverageIndex,
+                         get_supported_codepoints)
+from .samplers import AliasSampler, BalancedCharSampler
+from .text_image_renderer import (FontTable, GlyphCache, _clamp_color,
+                                  _pillow_direction, colorize_mask,
+                                  load_truetype_font, measure_text,
+                                  text2image, text2mask)
+from .text_source import CorpusTextSource
 
 DIR = cb.get_curdir(__file__)
 
@@ -21,6 +33,86 @@ __all__ = [
 ]
 
 
+# Number of font size buckets kept by `render_at_output_size`.
+_FIT_SIZES_LIMIT = 4096
+
+def _default_font_index_path() -> Path:
+    """Returns the per-user font coverage index, under `$XDG_CACHE_HOME`.
+
+    Fonts are indexed by their resolved path, so a single file serves
+    every font directory and nothing is written next to the fonts.
+    """
+    cache_dir = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_dir) / 'wordcanvas' / 'font_index.sqlite'
+
+
+def _open_font_index(
+    font_index: Union[str, Path, bool],
+) -> Union[FontCoverageIndex, None]:
+    """Opens the coverage index selected by `font_index`, `None` if disabled."""
+    if font_index is False or font_index is None:
+        return None
+    index_path = _default_font_index_path() \
+        if font_index is True else Path(font_index)
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        return FontCoverageIndex(index_path)
+    except (OSError, sqlite3.Error) as e:
+        print(
+            f"\n\tCannot use the font index {cb.colorstr(index_path, 'YELLOW')}: {e}\n"
+            f"\tFonts will be parsed without it.\n"
+        )
+        return None
+
+
+def _supported_codepoints(
+    index: Union[FontCoverageIndex, None],
+    font_path: Union[str, Path],
+) -> np.ndarray:
+    if index is not None:
+        try:
+            return index.get_supported_codepoints(font_path)
+        except sqlite3.Error:
+            pass
+    return get_supported_codepoints(font_path)
+
+
+# Coverage indexes opened by the bank scanning processes, by index setting.
+_SCAN_INDEXES = {}
+
+
+def _scan_font(
+    font_path: Path,
+    font_index: Union[str, Path, bool],
+) -> np.ndarray:
+    """Returns the supported code points of `font_path` in a scanning process."""
+    key = str(font_index)
+    if key not in _SCAN_INDEXES:
+        _SCAN_INDEXES[key] = _open_font_index(font_index)
+    return _supported_codepoints(_SCAN_INDEXES[key], font_path)
+
+
+def _collate_infos(infos_list: List[dict]) -> dict:
+    """Turns a list of infos into columns.
+
+    Columns of numbers or color tuples become NumPy arrays, all the others
+    stay lists. Keys missing from some infos are filled with `None`.
+    """
+    keys = dict.fromkeys(key for infos in infos_list for key in infos)
+    columns = {}
+    for key in keys:
+        values = [infos.get(key) for infos in infos_list]
+        columns[key] = values
+        if all(isinstance(v, (int, float, np.number, tuple))
+               and not isinstance(v, IntEnum)
+               for v in values):
+            try:
+                columns[key] = np.asarray(values)
+            except ValueError:
+                pass
+    return columns
+
+
 class AlignMode(cb.EnumCheckMixin, IntEnum):
     Left = 0
     Right = 1
@@ -52,6 +144,12 @@ class WordCanvas:
         stroke_fill: Tuple[int, int, int] = (0, 0, 0),
         spacing: int = 4,
         return_infos: bool = False,
+        use_glyph_cache: bool = False,
+        mask_first: bool = False,
+        mask_cache_size: int = 128,
+        render_at_output_size: bool = False,
+        font_index: Union[str, Path, bool] = True,
+        layout_engine: int = None,
     ):
 
         for block_font in block_font_list:
@@ -87,14 +185,31 @@ class WordCanvas:
         self.stroke_fill = stroke_fill
         self.spacing = spacing
         self.return_infos = return_infos
-
-        self.font = load_truetype_font(font_path, size=font_size)
-
-        _chars = get_supported_characters(font_path)
-        self.chars_table = {char: i for i, char in enumerate(_chars)}
-
-        self.font_chars_tables = {}
-        self.font_chars_tables[Path(font_path).stem] = _chars
+        self.use_glyph_cache = use_glyph_cache
+        self.mask_first = mask_first
+        self.mask_cache_size = mask_cache_size
+        self._mask_cache = OrderedDict()
+        self.render_at_output_size = render_at_output_size
+        self._fit_sizes = OrderedDict()
+        self.font_index = font_index
+
+        # The glyph cache only composes fonts of the basic layout.
+        if layout_engine is None and use_glyph_cache:
+            layout_engine = ImageFont.Layout.BASIC
+        self.layout_engine = layout_engine
+
+        self.font = load_truetype_font(
+            font_path, size=font_size, layout_engine=layout_engine)
+
+        index = _open_font_index(font_index)
+        _codepoints = _supported_codepoints(index, font_path)
+        if index is not None:
+            index.close()
+
+        # Array-backed views, see `CharsTable` and `FontCharsTables`.
+        self.chars_table = CharsTable(_codepoints)
+        self.font_chars_tables = FontCharsTables()
+        self.font_chars_tables.add(Path(font_path).stem, _codepoints)
 
     @ property
     def font_size(self):
@@ -115,6 +230,7 @@ class WordCanvas:
 
     @ property
     def dashboard(self):
+        from prettytable import PrettyTable
 
         table = PrettyTable()
         table.field_names = [
@@ -140,6 +256,17 @@ class WordCanvas:
                 "AlignMode", "Text alignment mode. (Left | Right | Center | Scatter)"],
             ["output_direction", self.output_direction.name, "set",
                 "OutputDirection", "Output image direction. (Remain | Horizontal | Vertical)"],
+            ["use_glyph_cache", self.colorize(self.use_glyph_cache), "set",
+                "bool", "Compose simple text from cached glyphs. (basic layout fonts)"],
+            ["layout_engine", None if self.layout_engine is None
+                else ImageFont.Layout(self.layout_engine).name, "reinit", "int",
+                "Pillow layout of the fonts, basic by default with the glyph cache."],
+            ["mask_first", self.colorize(self.mask_first), "set",
+                "bool", "Render masks once and colorize them with NumPy."],
+            ["render_at_output_size", self.colorize(self.render_at_output_size),
+                "set", "bool", "Render at the font size that fits output_size, no resize."],
+            ["font_index", self.font_index, "reinit", "Union[str, Path, bool]",
+                "Font coverage index file, True for the per-user cache."],
         ]
 
         for row in data:
@@ -148,210 +275,524 @@ class WordCanvas:
         # print(table)
         return table.get_string()
 
-    def regularize_image(self, img, direction, align_mode, background_color) -> np.ndarray:
-        h, w = self.output_size
+    def _fit_placement(self, img_size, direction, align_mode, h, w):
+        """Returns the `(x, y, width, height)` of the text in the canvas."""
+        img_h, img_w = img_size
+        x, y, fit_h, fit_w = 0, 0, h, w
         if direction == 'ltr':
             if self.text_aspect_ratio != 1.0:
-                img = cb.imresize(
-                    img,
-                    (img.shape[0], int(img.shape[1] // self.text_aspect_ratio))
-                )
-
-            img = cb.imresize(img, (h, None))
-            img_w = img.shape[1]
-            if img_w >= w:
-                img = cb.imresize(img, (h, w))
-            else:
-                # Align mode will affect the padding position
-                if align_mode == AlignMode.Left:
-                    pad_size = (0, 0, 0, w - img_w)
-                elif align_mode == AlignMode.Right:
-                    pad_size = (0, 0, w - img_w, 0)
-                else:
-                    # Accepted align mode: Center, Scatter
-                    pad_size = (0, 0, (w - img_w) // 2, (w - img_w) // 2)
-                img = cb.pad(img, pad_size, pad_value=background_color)
+                img_w = max(int(img_w // self.text_aspect_ratio), 1)
+            fit_w = max(int(img_w * (h / img_h) + 0.5), 1)
+            if fit_w >= w:
+                fit_w = w
+            elif align_mode == AlignMode.Right:
+                x = w - fit_w
+            elif align_mode != AlignMode.Left:
+                # Accepted align mode: Center, Scatter
+                x = (w - fit_w) // 2
         elif direction == 'ttb':
-            h, w = w, h
-
             if align_mode != AlignMode.Scatter and \
                     self.text_aspect_ratio != 1.0:
-                img = cb.imresize(
-                    img,
-                    (img.shape[0], int(img.shape[1] // self.text_aspect_ratio))
-                )
-
-            img = cb.imresize(img, (None, w))
-            img_h = img.shape[0]
-            if img_h >= h:
-                img = cb.imresize(img, (h, w))
-            else:
-                # Align mode will affect the padding position
-                if align_mode == AlignMode.Left:
-                    pad_size = (0, h - img_h, 0, 0)
-                elif align_mode == AlignMode.Right:
-                    pad_size = (h - img_h, 0, 0, 0)
-                else:
-                    # Accepted align mode: Center, Scatter
-                    pad_size = ((h - img_h) // 2, (h - img_h) // 2, 0, 0)
-
-                img = cb.pad(img, pad_size, pad_value=background_color)
-        img = cb.imresize(img, (h, w))
-        return img
-
-    def gen_scatter_image(
-        self, text, font, direction, text_color, background_color,
-        stroke_width, stroke_fill, spacing, **kwargs
+                img_w = max(int(img_w // self.text_aspect_ratio), 1)
+            fit_h = max(int(img_h * (w / img_w) + 0.5), 1)
+            if fit_h >= h:
+                fit_h = h
+            elif align_mode == AlignMode.Right:
+                y = h - fit_h
+            elif align_mode != AlignMode.Left:
+                # Accepted align mode: Center, Scatter
+                y = (h - fit_h) // 2
+        return x, y, fit_w, fit_h
+
+    def regularize_image(
+        self, img, direction, align_mode, background_color, out=None
     ) -> np.ndarray:
+        """Resizes and pads `img` to `output_size`.
+
+        The text is scaled to the output height (the output width for `ttb`,
+        where the canvas is `output_size` transposed) and padded according
+        to `align_mode`; text longer than the canvas is squeezed to fit. The
+        final placement is computed up front, so `img` is resampled only
+        once, straight into the canvas.
+
+        Args:
+            img (np.ndarray): The image `(H, W)` or `(H, W, C)` to regularize.
+            direction (str): The text direction, `'ltr'`, `'rtl'` or `'ttb'`.
+            align_mode (AlignMode): The alignment of the text in the canvas.
+            background_color (Union[int, Tuple[int, ...]]):
+                The padding value, one value per channel of `img`.
+            out (Optional[np.ndarray], optional):
+                A uint8 canvas of the output shape to write into, which
+                allows reusing one buffer across calls. Defaults to `None`.
+
+        Returns:
+            np.ndarray: The regularized image, `out` if it is given.
+        """
+        h, w = self.output_size
+        if direction == 'ttb':
+            h, w = w, h
 
-        def split_text(text: str):
-            """ Split text into a list of characters. """
-            pattern = r"[a-zA-Z0-9\p{P}\p{S}]+|."
-            matches = regex.findall(pattern, text)
-            matches = [m for m in matches if not regex.match(r'\p{Z}', m)]
-            if len(matches) == 1:
-                matches = list(text)
-            return matches
+        shape = (h, w) + img.shape[2:]
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.shape != shape or out.dtype != np.uint8:
+            raise ValueError(
+                f"`out` must be a uint8 array of shape {shape}, "
+                f"got {out.dtype} {out.shape}."
+            )
+
+        x, y, fit_w, fit_h = self._fit_placement(
+            img.shape[:2], direction, align_mode, h, w)
 
+        region = out[y:y + fit_h, x:x + fit_w]
+        if img.shape[:2] == (fit_h, fit_w):
+            region[...] = img
+        else:
+            resized = cv2.resize(
+                img, (fit_w, fit_h), dst=region,
+                interpolation=cv2.INTER_LINEAR
+            )
+            if resized is not region:
+                region[...] = resized.reshape(region.shape)
+
+        background_color = np.asarray(background_color).astype(np.uint8)
+        for pad in (
+            out[:y],
+            out[y + fit_h:],
+            out[y:y + fit_h, :x],
+            out[y:y + fit_h, x + fit_w:],
+        ):
+            if pad.size:
+                # Fill one row and replicate it, much faster than broadcasting
+                # the color over every pixel.
+                pad[0] = background_color
+                pad[1:] = pad[0]
+
+        return out
+
+    @staticmethod
+    def _split_text(text: str) -> List[Tuple[int, int]]:
+        """Splits text into the `(start, end)` spans of the scattered tokens.
+
+        Runs of letters, digits, punctuation and symbols stay together, any
+        other character is a token of its own, and whitespace is dropped. If
+        that leaves a single token, every character becomes a token.
+        """
+        pattern = r"[a-zA-Z0-9\p{P}\p{S}]+|."
+        spans = [
+            m.span() for m in regex.finditer(pattern, text)
+            if not regex.match(r'\p{Z}', m.group())
+        ]
+        if len(spans) == 1:
+            spans = [(i, i + 1) for i in range(len(text))]
+        return spans
+
+    def gen_scatter_masks(
+        self, text, font, direction, stroke_width, spacing, **kwargs
+    ) -> Tuple[np.ndarray, Union[np.ndarray, None]]:
+        """Renders the coverage masks of `text` in the scatter mode.
+
+        The whole line is laid out and rasterized once. Every token is cut
+        out of the line at its pen position, trimmed to its ink, and written
+        into a single canvas with the tokens spread evenly over the output
+        width (the output height for `ttb`).
+
+        Returns:
+            Tuple[np.ndarray, Union[np.ndarray, None]]:
+                The uint8 fill mask and stroke mask (or `None`) of the
+                scattered text.
+        """
         if "\n" in text:
             raise ValueError(
                 f"\nText:\n {cb.colorstr(text, 'RED')} \tcontains '\\n'.\n"
                 f"It is not supported in the scatter mode.\n"
             )
 
+        if direction not in ('ltr', 'ttb'):
+            raise ValueError(
+                f"Invalid direction '{direction}' for the scatter mode. "
+                f"Must be 'ltr' or 'ttb'."
+            )
+
         if 'return_infos' in kwargs:
             kwargs.pop('return_infos')
 
-        _, infos = text2image(
+        font = load_truetype_font(font, size=self._font_size)
+        fill, stroke, infos = text2mask(
             text=text,
             font=font,
             direction=direction,
-            text_color=text_color,
-            background_color=background_color,
             stroke_width=stroke_width,
-            stroke_fill=stroke_fill,
             spacing=spacing,
             return_infos=True,
+            use_glyph_cache=self.use_glyph_cache,
             **kwargs
         )
 
-        offset = infos['offset']
-        width, height = infos['bbox(wh)']
-
-        texts = split_text(text)
-
-        if len(texts):
-            imgs = [
-                text2image(
-                    text=t,
-                    font=font,
-                    direction=direction,
-                    text_color=text_color,
-                    background_color=background_color,
-                    stroke_width=stroke_width,
-                    stroke_fill=stroke_fill,
-                    spacing=spacing,
-                    height=height if direction == 'ltr' else None,
-                    offset=offset if direction == 'ltr' else None,
-                    return_infos=False,
-                    **kwargs
-                ) for t in texts
-            ]
+        masks = fill[..., None] if stroke is None else np.dstack([fill, stroke])
+        origin = infos['offset']
+
+        # Work along the text: columns for `ltr`, rows for `ttb`.
+        if direction == 'ttb':
+            masks = masks.transpose(1, 0, 2)
+            origin = origin[::-1]
+        ink = masks.max(axis=2)
+        line_len = ink.shape[1]
+
+        spans = self._split_text(text)
+        if spans:
+            # Pen positions from the advances of the tokens and of the gaps
+            # between them, each laid out once.
+            bounds = [0] + [i for span in spans for i in span]
+            advances = np.cumsum([
+                font.getlength(
+                    text[i:j], direction=_pillow_direction(font, direction),
+                    **kwargs)
+                if j > i else 0.0
+                for i, j in zip(bounds[:-1], bounds[1:])
+            ]) + origin[0]
+            pens = list(zip(advances[0::2], advances[1::2]))
+            cuts = [0] + [
+                int(round((pens[i][1] + pens[i + 1][0]) / 2))
+                for i in range(len(pens) - 1)
+            ] + [line_len]
+            cuts = np.maximum.accumulate(np.clip(cuts, 0, line_len))
         else:
-            img = np.zeros((height, width, 3)) + background_color
-            imgs = [img.astype(np.uint8)]
-
-        if direction == 'ltr':
-
-            # For `self.text_aspect_ratio` is not 1.0
-            if self.text_aspect_ratio != 1.0:
-                imgs = [
-                    cb.imresize(
-                        img, (img.shape[0], int(
-                            img.shape[1] // self.text_aspect_ratio))
-                    ) for img in imgs
-                ]
-
-            # If there is only one image, return it directly
-            if len(imgs) == 1:
-                return imgs[0]
-
-            align_h = max([img.shape[0] for img in imgs])
-            imgs = [cb.imresize(img, (align_h, None)) for img in imgs]
-            sum_w = sum([img.shape[1] for img in imgs])
-            interval = (self.output_size[1] - sum_w) // (len(imgs) - 1)
+            # Nothing to scatter, keep the blank line as a single token.
+            pens = [(0, line_len)]
+            cuts = [0, line_len]
+
+        tokens = []
+        for (pen_start, pen_end), x0, x1 in zip(pens, cuts[:-1], cuts[1:]):
+            # Like the bbox of the token on its own: from the pen position to
+            # the advance, widened by the stroke and by any ink beyond them.
+            start = int(round(pen_start))
+            a = start - stroke_width
+            b = start + int(math.ceil(pen_end - pen_start)) + stroke_width
+            y0, y1 = 0, ink.shape[0]
+            cols = np.flatnonzero(ink[:, x0:x1].any(axis=0))
+            if len(cols):
+                a, b = min(a, x0 + cols[0]), max(b, x0 + cols[-1] + 1)
+                if direction == 'ttb':
+                    # Vertical layouts center every glyph on the widest one,
+                    # so the token is trimmed to its own ink across the line.
+                    rows = np.flatnonzero(ink[:, x0:x1].any(axis=1))
+                    y0, y1 = rows[0], rows[-1] + 1
+            if not spans:
+                a, b = 0, line_len
+
+            token = np.zeros((y1 - y0, b - a, masks.shape[2]), dtype=np.uint8)
+            c0, c1 = max(a, x0), min(b, x1)
+            if c1 > c0:
+                token[:, c0 - a:c1 - a] = masks[y0:y1, c0:c1]
+            if direction == 'ttb':
+                # Back to (H, W, C) so the token is upright again
+                token = token.transpose(1, 0, 2)
+            tokens.append(token)
+
+        # For `self.text_aspect_ratio` is not 1.0
+        if self.text_aspect_ratio != 1.0:
+            resized = []
+            for token in tokens:
+                h, w = token.shape[:2]
+                if direction == 'ltr':
+                    w = max(int(w // self.text_aspect_ratio), 1)
+                else:
+                    h = max(int(h * self.text_aspect_ratio), 1)
+                resized.append(
+                    cv2.resize(token, (w, h)).reshape(h, w, masks.shape[2]))
+            tokens = resized
+
+        axis = 1 if direction == 'ltr' else 0
+        sizes = [token.shape[axis] for token in tokens]
+        interval = 0
+        if len(tokens) > 1 and self.output_size is not None:
+            interval = (self.output_size[1] - sum(sizes)) // (len(tokens) - 1)
             interval = max(interval, 0)
+        length = sum(sizes) + interval * (len(tokens) - 1)
 
-            imgs_add_interval = []
-            img_interval = np.zeros((align_h, interval, 3))
-            img_interval = img_interval + background_color
-
-            for i, img in enumerate(imgs):
-                imgs_add_interval.append(img)
-                if i != len(imgs) - 1:
-                    imgs_add_interval.append(img_interval)
-
-            img = np.concatenate(imgs_add_interval, axis=1)
-
-        elif direction == 'ttb':
-
-            # For `self.text_aspect_ratio` is not 1.0
-            if self.text_aspect_ratio != 1.0:
-                imgs = [
-                    cb.imresize(
-                        img,
-                        (max(int(img.shape[0] * self.text_aspect_ratio), 1),
-                            img.shape[1])
-                    ) for img in imgs
-                ]
-
-            # If there is only one image, return it directly
-            if len(imgs) == 1:
-                return imgs[0]
-
-            align_w = max([img.shape[1] for img in imgs])
-
-            pad_imgs = []
-            for img in imgs:
-                pad_r = (align_w - img.shape[1]) // 2
-                pad_r = max(pad_r, 0)
-                pad_l = align_w - pad_r - img.shape[1]
-                pad_l = max(pad_l, 0)
-
-                background_color = tuple(np.array(background_color).tolist())
-                img = cb.pad(img, (0, 0, pad_l, pad_r), background_color)
-
-                pad_imgs.append(img)
+        if direction == 'ltr':
+            canvas = np.zeros((masks.shape[0], length, masks.shape[2]), dtype=np.uint8)
+            x = 0
+            for token in tokens:
+                canvas[:, x:x + token.shape[1]] = token
+                x += token.shape[1] + interval
+        else:
+            align_w = max(token.shape[1] for token in tokens)
+            canvas = np.zeros((length, align_w, masks.shape[2]), dtype=np.uint8)
+            y = 0
+            for token in tokens:
+                h, w = token.shape[:2]
+                pad_l = align_w - (align_w - w) // 2 - w
+                canvas[y:y + h, pad_l:pad_l + w] = token
+                y += h + interval
+
+        fill = canvas[..., 0]
+        stroke = canvas[..., 1] if canvas.shape[2] > 1 else None
+        return fill, stroke
 
-            sum_h = sum([img.shape[0] for img in pad_imgs])
-            interval = (self.output_size[1] - sum_h) // (len(pad_imgs) - 1)
-            interval = max(interval, 0)
+    def gen_scatter_image(
+        self, text, font, direction, text_color, background_color,
+        stroke_width, stroke_fill, spacing, **kwargs
+    ) -> np.ndarray:
+        fill, stroke = self.gen_scatter_masks(
+            text=text,
+            font=font,
+            direction=direction,
+            stroke_width=stroke_width,
+            spacing=spacing,
+            **kwargs
+        )
+        return colorize_mask(
+            fill,
+            stroke,
+            text_color=text_color,
+            background_color=background_color,
+            stroke_fill=stroke_fill,
+        )
 
-            imgs_add_interval = []
-            img_interval = np.zeros((interval, align_w, 3))
-            img_interval = img_interval + background_color
+    def _fit_font(
+        self, text, font, direction, align_mode, stroke_width, spacing
+    ) -> Tuple[Union[tuple, None], ImageFont.FreeTypeFont, int, int]:
+        """Picks the font size that renders `text` inside the output box.
+
+        The first size of a bucket is the one whose line box fills the
+        output height (the output width for `ttb`), scaling up as well as
+        down; `_place_fitted` then adjusts it to the rasters of the bucket.
+        Sizes are kept per (font, direction, stroke width, spacing, number
+        of lines, text length bucket), so no text is measured. The font,
+        stroke width and spacing are scaled alike.
+
+        Returns:
+            Tuple[Union[tuple, None], ImageFont.FreeTypeFont, int, int]:
+                The key of the fitted size, `None` when the text cannot be
+                fitted, and the font, stroke width and spacing to render with.
+        """
+        if align_mode == AlignMode.Scatter or self.text_aspect_ratio != 1.0 \
+                or not GlyphCache.is_cacheable(font):
+            return None, font, stroke_width, spacing
+
+        num_lines = text.count('\n') + 1
+        key = (
+            str(font.path), font.size, font.index, font.layout_engine,
+            direction, stroke_width, spacing, num_lines,
+            len(text).bit_length(), self.output_size,
+        )
+        sizes = self._fit_sizes.get(key)
+        if sizes is None:
+            ascent, descent = font.getmetrics()
+            line = num_lines * (ascent + descent + 2 * stroke_width) \
+                + (num_lines - 1) * spacing
+            max_size = max(int(font.size * self.output_size[0] / line), 1)
+            sizes = self._fit_sizes[key] = [max_size, max_size]
+            if len(self._fit_sizes) > _FIT_SIZES_LIMIT:
+                self._fit_sizes.popitem(last=False)
+
+        size = sizes[0]
+        if size == font.size:
+            return key, font, stroke_width, spacing
+        scale = size / font.size
+        font = load_truetype_font(
+            font.path,
+            size=size,
+            index=font.index,
+            encoding=font.encoding,
+            layout_engine=font.layout_engine,
+        )
+        return key, font, int(round(stroke_width * scale)), int(round(spacing * scale))
+
+    def _place_fitted(
+        self, img, key, top, stroke_width, direction, align_mode,
+        background_color
+    ) -> Union[np.ndarray, None]:
+        """Writes a raster rendered by `_fit_font` into the output canvas.
+
+        The size of the bucket `key` is updated to the largest one that
+        fits this raster, capped by the line box size. A raster that fits
+        is copied as is, aligned like `regularize_image` along the text and
+        centered across it (on the line box for `ltr`, `top` being the top
+        of the raster relative to the origin of the text, drawn with
+        `stroke_width`). A raster that overflows is left to
+        `regularize_image`.
+
+        Returns:
+            Union[np.ndarray, None]: The canvas, `None` if `img` overflows.
+        """
+        h, w = self.output_size
+        if direction == 'ttb':
+            h, w = w, h
+        img_h, img_w = img.shape[:2]
+
+        sizes = self._fit_sizes[key]
+        scale = min(h / img_h, w / img_w)
+        size = sizes[0]
+        sizes[0] = min(max(int(size * scale), 1), sizes[1])
+        if scale < 1:
+            return None
+
+        if direction == 'ttb':
+            x = (w - img_w) // 2
+            y = {AlignMode.Left: 0, AlignMode.Right: h - img_h}.get(
+                align_mode, (h - img_h) // 2)
+        else:
+            x = {AlignMode.Left: 0, AlignMode.Right: w - img_w}.get(
+                align_mode, (w - img_w) // 2)
+            # Centers the line box, so texts keep a common baseline.
+            line = round(h * size / sizes[1]) if sizes[1] else h
+            y = (h - line) // 2 + stroke_width + top
+            y = min(max(y, 0), h - img_h)
+
+        out = np.empty((h, w) + img.shape[2:], dtype=np.uint8)
+        out[0] = np.asarray(background_color).astype(np.uint8)
+        out[1:] = out[0]
+        out[y:y + img_h, x:x + img_w] = img
+        return out
+
+    @staticmethod
+    def _layout_font(font, direction: str):
+        """Returns a raqm twin of a basic layout font for `rtl` and `ttb` text.
+
+        The basic layout only lays out LTR text, so the other directions
+        are drawn with the same face under raqm when it is available.
+        """
+        if direction == 'ltr' \
+                or getattr(font, 'layout_engine', None) != ImageFont.Layout.BASIC \
+                or not isinstance(getattr(font, 'path', None), (str, Path)) \
+                or not features.check_feature('raqm'):
+            return font
+        return load_truetype_font(
+            font.path,
+            size=font.size,
+            index=font.index,
+            encoding=font.encoding,
+            layout_engine=ImageFont.Layout.RAQM,
+        )
 
-            for i, img in enumerate(pad_imgs):
-                imgs_add_interval.append(img)
-                if i != len(pad_imgs) - 1:
-                    imgs_add_interval.append(img_interval)
+    def _rotate_output(self, img: np.ndarray, direction: str) -> np.ndarray:
+        if self.output_direction == OutputDirection.Vertical \
+                and direction == 'ltr':
+            img = cb.imrotate90(img, rotate_code=cb.ROTATE.ROTATE_90)
+        elif self.output_direction == OutputDirection.Horizontal \
+                and direction == 'ttb':
+            img = cb.imrotate90(img, rotate_code=cb.ROTATE.ROTATE_270)
+        return img
 
-            img = np.concatenate(imgs_add_interval, axis=0)
+    def gen_masks(
+        self, text, font, direction, align_mode, stroke_width, spacing
+    ) -> Tuple[np.ndarray, Union[np.ndarray, None], dict]:
+        """Renders the regularized coverage masks of `text`.
+
+        The masks are resized, padded and rotated exactly like the RGB image
+        of the default mode, so they only need to be colorized with
+        `colorize_mask`. The last `mask_cache_size` results are kept, which
+        lets the same text be drawn in many colors with a single rendering.
+
+        Returns:
+            Tuple[np.ndarray, Union[np.ndarray, None], dict]:
+                The fill mask, the stroke mask (or `None`) and the infos of
+                `text2mask`.
+        """
+        # Keyed on the font file rather than the face, so cached masks do
+        # not keep evicted fonts alive. Fonts without a path are not cached.
+        key = None
+        if GlyphCache.is_cacheable(font):
+            key = (
+                str(font.path), font.size, font.index, font.layout_engine,
+                text, direction, align_mode, stroke_width, spacing,
+                self.output_size, self.text_aspect_ratio,
+                self.output_direction, self.render_at_output_size,
+            )
+        if key in self._mask_cache:
+            self._mask_cache.move_to_end(key)
+            fill, stroke, infos = self._mask_cache[key]
+            return fill, stroke, infos.copy()
 
-        return img.astype(np.uint8)
+        font = self._layout_font(font, direction)
+        fit_key = None
+        if self.render_at_output_size and self.output_size is not None:
+            fit_key, font, stroke_width, spacing = self._fit_font(
+                text, font, direction, align_mode, stroke_width, spacing)
 
-    def __call__(self, text: str = None) -> np.ndarray:
+        if align_mode == AlignMode.Scatter and self.output_size is not None:
+            fill, stroke = self.gen_scatter_masks(
+                text=text,
+                font=font,
+                direction=direction,
+                stroke_width=stroke_width,
+                spacing=spacing,
+            )
+            infos = {'text': text, 'direction': direction}
+        else:
+            fill, stroke, infos = text2mask(
+                text=text,
+                font=font,
+                direction=direction,
+                stroke_width=stroke_width,
+                spacing=spacing,
+                align=align_mode.name.lower(),
+                return_infos=True,
+                use_glyph_cache=self.use_glyph_cache,
+            )
 
-        font = self.font
-        font_name = Path(self._font_path).stem
+        # Both masks go through the same resize / pad as one image.
+        masks = fill if stroke is None else np.dstack([fill, stroke])
+        if self.output_size is not None:
+            fitted = None
+            if fit_key is not None:
+                fitted = self._place_fitted(
+                    masks, fit_key, infos['bbox(xyxy)'][1], stroke_width,
+                    direction, align_mode, 0)
+            masks = self.regularize_image(
+                masks,
+                direction=direction,
+                align_mode=align_mode,
+                background_color=0
+            ) if fitted is None else fitted
+        masks = self._rotate_output(masks, infos['direction'])
+        masks = masks.reshape(masks.shape[0], masks.shape[1], -1)
+        fill = masks[..., 0]
+        stroke = masks[..., 1] if masks.shape[-1] > 1 else None
+
+        if self.mask_cache_size > 0 and key is not None:
+            self._mask_cache[key] = (fill, stroke, infos)
+            while len(self._mask_cache) > self.mask_cache_size:
+                self._mask_cache.popitem(last=False)
+
+        return fill, stroke, infos.copy()
+
+    def _render(
+        self, text, font, direction, align_mode, text_color,
+        background_color, stroke_width, stroke_fill, spacing
+    ) -> Tuple[np.ndarray, dict]:
+
+        if self.mask_first:
+            fill, stroke, infos = self.gen_masks(
+                text=text,
+                font=font,
+                direction=direction,
+                align_mode=align_mode,
+                stroke_width=stroke_width,
+                spacing=spacing,
+            )
+            infos.update({
+                'background_color': _clamp_color(background_color),
+                'text_color': _clamp_color(text_color),
+                'stroke_fill': _clamp_color(stroke_fill),
+            })
+            img = colorize_mask(
+                fill,
+                stroke,
+                text_color=infos['text_color'],
+                background_color=infos['background_color'],
+                stroke_fill=infos['stroke_fill'],
+            )
+            return img, infos
 
-        text_color = self.text_color
-        background_color = self.background_color
-        direction = self.direction
-        align_mode = self.align_mode
-        stroke_width = self.stroke_width
-        stroke_fill = self.stroke_fill
-        spacing = self.spacing
+        font = self._layout_font(font, direction)
+        fit_key = None
+        if self.render_at_output_size and self.output_size is not None:
+            fit_key, font, stroke_width, spacing = self._fit_font(
+                text, font, direction, align_mode, stroke_width, spacing)
 
         if align_mode == AlignMode.Scatter and self.output_size is not None:
             img = self.gen_scatter_image(
@@ -363,7 +804,6 @@ class WordCanvas:
                 stroke_width=stroke_width,
                 stroke_fill=stroke_fill,
                 spacing=spacing,
-                return_infos=True
             )
 
             infos = {
@@ -383,30 +823,124 @@ class WordCanvas:
                 stroke_fill=stroke_fill,
                 spacing=spacing,
                 align=align_mode.name.lower(),
-                return_infos=True
+                return_infos=True,
+                use_glyph_cache=self.use_glyph_cache,
             )
 
         if self.output_size is not None:
+            fitted = None
+            if fit_key is not None:
+                fitted = self._place_fitted(
+                    img, fit_key, infos['bbox(xyxy)'][1], stroke_width,
+                    direction, align_mode, infos['background_color'])
             img = self.regularize_image(
                 img,
                 direction=direction,
                 align_mode=align_mode,
                 background_color=infos['background_color']
-            )
-
-        if self.output_direction == OutputDirection.Vertical \
-                and infos['direction'] == 'ltr':
-            img = cb.imrotate90(img, rotate_code=cb.ROTATE.ROTATE_90)
-        elif self.output_direction == OutputDirection.Horizontal \
-                and infos['direction'] == 'ttb':
-            img = cb.imrotate90(img, rotate_code=cb.ROTATE.ROTATE_270)
+            ) if fitted is None else fitted
+
+        img = self._rotate_output(img, infos['direction'])
+
+        return img, infos
+
+    def _sample_params(
+        self, n: int, texts: List[str], rng: np.random.Generator = None
+    ) -> dict:
+        """Returns the rendering parameters of `n` images as columns.
+
+        Each key maps to a sequence of length `n`, so a batch is drawn in
+        one go. Subclasses override it to randomize the columns with `rng`.
+        """
+        return {
+            'font': [self.font] * n,
+            'font_name': [Path(self._font_path).stem] * n,
+            'text': list(texts),
+            'text_color': [self.text_color] * n,
+            'background_color': [self.background_color] * n,
+            'direction': [self.direction] * n,
+            'align_mode': [self.align_mode] * n,
+            'stroke_width': [self.stroke_width] * n,
+            'stroke_fill': [self.stroke_fill] * n,
+            'spacing': [self.spacing] * n,
+        }
+
+    def _render_params(self, params: dict, index: int) -> Tuple[np.ndarray, dict]:
+        img, infos = self._render(
+            text=params['text'][index],
+            font=params['font'][index],
+            direction=params['direction'][index],
+            align_mode=params['align_mode'][index],
+            text_color=params['text_color'][index],
+            background_color=params['background_color'][index],
+            stroke_width=params['stroke_width'][index],
+            stroke_fill=params['stroke_fill'][index],
+            spacing=params['spacing'][index],
+        )
 
         infos.update({
-            'font_name': font_name,
-            'align_mode': align_mode,
+            'font_name': params['font_name'][index],
+            'align_mode': params['align_mode'][index],
             'output_direction': self.output_direction,
         })
 
+        return img, infos
+
+    def generate_batch(
+        self,
+        n: int = None,
+        texts: Union[str, List[str]] = None,
+    ) -> Union[np.ndarray, List[np.ndarray], Tuple[Union[np.ndarray, List[np.ndarray]], dict]]:
+        """Renders a batch of images.
+
+        All parameters of the batch are drawn at once by `_sample_params`.
+        When `output_size` is set and every image has the same shape, the
+        images are stacked into one (N, H, W, 3) array; otherwise (e.g.
+        mixed directions with `OutputDirection.Remain`) a list is returned.
+
+        Args:
+            n (int, optional):
+                Number of images. Defaults to `len(texts)`.
+            texts (Union[str, List[str]], optional):
+                Texts to render. A single string is repeated `n` times.
+
+        Returns:
+            The images, and the infos as columns when `return_infos` is set.
+            Numeric and color columns are NumPy arrays, the others are lists.
+        """
+        if texts is None:
+            if n is None:
+                raise ValueError('Either `n` or `texts` must be given.')
+            texts = [None] * n
+        elif isinstance(texts, str):
+            texts = [texts] * (1 if n is None else n)
+        elif n is not None and n != len(texts):
+            raise ValueError(
+                f'`n` ({n}) does not match the number of texts ({len(texts)}).')
+
+        params = self._sample_params(len(texts), texts)
+        imgs, infos = [], []
+        for i in range(len(texts)):
+            img, info = self._render_params(params, i)
+            imgs.append(img)
+            infos.append(info)
+
+        if self.output_size is not None and imgs \
+                and all(img.shape == imgs[0].shape for img in imgs):
+            imgs = np.stack(imgs)
+
+        if self.return_infos:
+            return imgs, _collate_infos(infos)
+
+        return imgs
+
+    def __call__(self, text: str = None, texts: List[str] = None) -> np.ndarray:
+
+        if texts is not None:
+            return self.generate_batch(texts=texts)
+
+        img, infos = self._render_params(self._sample_params(1, [text]), 0)
+
         if self.return_infos:
             return img, infos
 
@@ -442,6 +976,15 @@ class RandomWordCanvas(WordCanvas):
         min_random_lines: int = 1,
         max_random_lines: int = 2,
         return_infos: bool = False,
+        seed: Union[int, np.random.Generator] = None,
+        max_open_fonts: int = 256,
+        num_scan_workers: int = 1,
+        font_coverage_policy: str = 'best',
+        char_weights: Dict[str, float] = None,
+        font_weights: Dict[str, float] = None,
+        balance_chars: bool = False,
+        balance_strength: float = 1.0,
+        text_source: Union[str, Path, CorpusTextSource] = None,
         **kwargs
     ):
         super().__init__(**kwargs)
@@ -479,16 +1022,30 @@ class RandomWordCanvas(WordCanvas):
         self.min_random_lines = min_random_lines
         self.max_random_lines = max_random_lines
         self.random_font_weight = random_font_weight
+        self.num_scan_workers = num_scan_workers
+        self.font_coverage_policy = font_coverage_policy
 
-        # Using random fonts with bank
-        self.font_table = {}
+        # An integer seed also makes `sample(index)` reproducible.
+        if isinstance(seed, np.random.Generator):
+            self.seed = None
+            self.rng = seed
+        else:
+            self.seed = np.random.SeedSequence(seed).entropy
+            self.rng = np.random.default_rng(self.seed)
+
+        # Using random fonts with bank, the faces are opened on first use.
+        self.font_table = FontTable(
+            size=font_size,
+            max_open_fonts=max_open_fonts,
+            layout_engine=self.layout_engine,
+        )
         if self.random_font:
-            print('Loading all fonts from bank...')
+            print('Scanning all fonts from bank...')
 
-            unique_chars = set()
-            number_font_chars = {}
+            # Block list and duplicates are checked here, only the coverage
+            # extraction is spread over the scanning processes.
             font_bank_fs = []
-            for font in cb.Tqdm(cb.get_files(self.font_bank, suffix=['.ttf', '.otf'])):
+            for font in cb.get_files(self.font_bank, suffix=['.ttf', '.otf']):
 
                 is_block_font = False
                 for block_font in block_font_list:
@@ -508,18 +1065,47 @@ class RandomWordCanvas(WordCanvas):
                         f'Find duplicated font in FONT_BANK: {cb.colorstr(font.stem, "BLUE")}, Skip.')
                     continue
 
-                font_chars = get_supported_characters(font)
-                number_font_chars[font.stem] = len(font_chars)
-                unique_chars.update(font_chars)
                 font_bank_fs.append(font)
+                self.font_table.add(font.stem, font)
+
+            if num_scan_workers > 1 and len(font_bank_fs) > 1:
+                with ProcessPoolExecutor(num_scan_workers) as executor:
+                    chunksize = max(
+                        1, len(font_bank_fs) // (4 * num_scan_workers))
+                    all_font_codepoints = list(cb.Tqdm(
+                        executor.map(
+                            _scan_font,
+                            font_bank_fs,
+                            repeat(self.font_index),
+                            chunksize=chunksize,
+                        ),
+                        total=len(font_bank_fs),
+                    ))
+            else:
+                index = _open_font_index(self.font_index)
+                all_font_codepoints = [
+                    _supported_codepoints(index, font)
+                    for font in cb.Tqdm(font_bank_fs)
+                ]
+                if index is not None:
+                    index.close()
 
-                self.font_chars_tables[font.stem] = font_chars
-                self.font_table[font.stem] = load_truetype_font(
-                    font, size=font_size)
+            # Merge in bank order, the same as a sequential scan.
+            number_font_chars = {}
+            for font, font_codepoints in zip(font_bank_fs, all_font_codepoints):
+                number_font_chars[font.stem] = len(font_codepoints)
+                self.font_chars_tables.add(font.stem, font_codepoints)
 
-            self.chars_table = {
-                char: i for i, char in enumerate(sorted(unique_chars, key=ord))
-            }
+            self.chars_table = CharsTable(np.unique(np.concatenate(
+                [np.zeros(0, np.uint32), *all_font_codepoints])))
+
+            # Inverted index: one bit per font (in bank order) for each
+            # character of `chars_table`.
+            self._font_bits = np.zeros(
+                (len(self.chars_table), (len(font_bank_fs) + 7) // 8), np.uint8)
+            for i, font_codepoints in enumerate(all_font_codepoints):
+                rows = self.chars_table.indices(font_codepoints)
+                self._font_bits[rows, i // 8] |= np.uint8(0x80 >> (i % 8))
 
             if self.random_font_weight:
                 sum_chars = sum(number_font_chars.values())
@@ -530,12 +1116,43 @@ class RandomWordCanvas(WordCanvas):
         else:
             self.weighted_font = {Path(self._font_path).stem: 1.0}
 
+        # Sampling tables, built once so every draw is O(1).
+        self.char_weights = char_weights
+        self.font_weights = font_weights
+        self._font_names = list(self.font_table)
+        if self.random_font:
+            weights = np.array([
+                (self.weighted_font[name] if self.random_font_weight else 1.0)
+                * (font_weights or {}).get(name, 1.0)
+                for name in self._font_names
+            ])
+            self._font_sampler = AliasSampler(weights)
+
+        self._char_samplers = {}
+        if char_weights:
+            codepoints = np.array([ord(c) for c in char_weights], np.uint32)
+            order = np.argsort(codepoints)
+            self._char_weight_codepoints = CharsTable(codepoints[order])
+            self._char_weight_values = np.array(
+                list(char_weights.values()), np.float64)[order]
+
+        # Emitted counts over `chars_table`, biasing the random texts
+        # toward the characters drawn the least so far.
+        self.char_sampler = BalancedCharSampler(
+            len(self.chars_table), balance_strength) if balance_chars else None
+        self._font_char_rows = {}
+
+        # Random texts are spans of a corpus when a source is given.
+        self.text_source = CorpusTextSource(text_source) \
+            if isinstance(text_source, (str, Path)) else text_source
+
     @ property
     def font_bank(self):
         return self._font_bank
 
     @ property
     def dashboard(self):
+        from prettytable import PrettyTable
 
         table = PrettyTable()
         table.field_names = [
@@ -560,6 +1177,15 @@ class RandomWordCanvas(WordCanvas):
                 "AlignMode", "Text alignment mode. (Left | Right | Center | Scatter)"],
             ["output_direction", self.output_direction.name, "set",
                 "OutputDirection", "Output image direction. (Remain | Horizontal | Vertical)"],
+            ["use_glyph_cache", self.colorize(self.use_glyph_cache), "set",
+                "bool", "Compose simple text from cached glyphs. (basic layout fonts)"],
+            ["layout_engine", None if self.layout_engine is None
+                else ImageFont.Layout(self.layout_engine).name, "reinit", "int",
+                "Pillow layout of the fonts, basic by default with the glyph cache."],
+            ["mask_first", self.colorize(self.mask_first), "set",
+                "bool", "Render masks once and colorize them with NumPy."],
+            ["render_at_output_size", self.colorize(self.render_at_output_size),
+                "set", "bool", "Render at the font size that fits output_size, no resize."],
             ["min_random_text_length", self.min_random_text_length, "set", "int",
                 "Random minimum text length."],
             ["max_random_text_length", self.max_random_text_length, "set", "int",
@@ -598,6 +1224,25 @@ class RandomWordCanvas(WordCanvas):
                 self.random_stroke_fill), "set", "bool", "Randomize stroke fill."],
             ["random_lines", self.colorize(
                 self.random_lines), "set", "bool", "Randomize lines."],
+            ["seed", self.seed, "reinit", "int", "Seed of the random generator."],
+            ["font_index", self.font_index, "reinit", "Union[str, Path, bool]",
+                "Font coverage index file, True for the per-user cache."],
+            ["num_scan_workers", self.num_scan_workers, "reinit", "int",
+                "Number of processes scanning the font bank."],
+            ["font_coverage_policy", self.font_coverage_policy, "set", "str",
+                "Font choice when no font covers the text. (raise | best | random)"],
+            ["char_weights", None if self.char_weights is None else len(self.char_weights),
+                "reinit", "Dict[str, float]", "Sampling weights of characters, 1 if missing."],
+            ["font_weights", None if self.font_weights is None else len(self.font_weights),
+                "reinit", "Dict[str, float]", "Sampling weights of fonts, 1 if missing."],
+            ["max_open_fonts", self.font_table.max_open_fonts, "set", "int",
+                "Maximum number of open font faces of the bank."],
+            ["text_source", None if self.text_source is None else str(self.text_source.path),
+                "reinit", "Union[str, Path, CorpusTextSource]", "Corpus of the random texts."],
+            ["balance_chars", self.colorize(self.char_sampler is not None), "reinit", "bool",
+                "Bias random texts toward the least emitted characters."],
+            ["balance_strength", None if self.char_sampler is None else self.char_sampler.strength,
+                "set", "float", "Exponent of the character balancing."],
         ]
 
         for row in data:
@@ -606,123 +1251,215 @@ class RandomWordCanvas(WordCanvas):
         # print(table)
         return table.get_string()
 
-    def __call__(self, text: str = None) -> np.ndarray:
+    def _sample_params(
+        self, n: int, texts: List[str], rng: np.random.Generator = None
+    ) -> dict:
+        params = super()._sample_params(n, texts)
+        rng = self.rng if rng is None else rng
 
         if self.random_font:
-            weighted_font = None
-            if self.random_font_weight:
-                weighted_font = list(self.weighted_font.values())
-            candi_font = list(self.font_table.keys())
-            font_idx = np.random.choice(len(candi_font), p=weighted_font)
-            font = self.font_table[candi_font[font_idx]]
-            font_name = Path(font.path).stem
-        else:
-            font = self.font
-            font_name = Path(self._font_path).stem
+            if self.random_text:
+                font_idx = self._font_sampler.sample(n, rng)
+            else:
+                font_idx = self._choose_covering_fonts(
+                    params['text'], self._font_sampler.weights, rng)
+            params['font_name'] = [self._font_names[i] for i in font_idx]
+            params['font'] = [self.font_table[name] for name in params['font_name']]
 
         if self.random_text:
-            candidates = self.font_chars_tables[font_name]
-            text_length = np.random.randint(
-                self.min_random_text_length, self.max_random_text_length + 1)
-            text = ''.join(np.random.choice(candidates, text_length))
+            text_lengths = rng.integers(
+                self.min_random_text_length, self.max_random_text_length + 1, n)
+
+            # Draw the code points of all texts sharing a font at once.
+            font_names = np.asarray(params['font_name'])
+            texts = [None] * n
+            for font_name in dict.fromkeys(params['font_name']):
+                idx = np.flatnonzero(font_names == font_name)
+                codepoints = self.font_chars_tables.codepoints(font_name)
+                if self.text_source is not None:
+                    spans = self.text_source.sample(
+                        text_lengths[idx], rng, codepoints)
+                    for i, span in zip(idx, spans):
+                        texts[i] = span or None
+                    # Fall back to random characters for the empty spans.
+                    idx = idx[[not span for span in spans]]
+                num_chars = text_lengths[idx].sum()
+                if self.char_sampler is not None:
+                    codepoints = codepoints[self.char_sampler.sample(
+                        self._char_rows(font_name),
+                        num_chars,
+                        rng,
+                        weights=self._char_sampler(font_name).weights
+                        if self.char_weights else None,
+                    )]
+                elif self.char_weights:
+                    codepoints = codepoints[
+                        self._char_sampler(font_name).sample(num_chars, rng)]
+                else:
+                    codepoints = codepoints[
+                        rng.integers(0, len(codepoints), num_chars)]
+                chars = codepoints.astype('<u4').tobytes().decode(
+                    'utf-32-le', 'surrogatepass')
+                start = 0
+                for i, length in zip(idx, text_lengths[idx]):
+                    texts[i] = chars[start:start + length]
+                    start += length
 
             if self.random_lines:
-                lines = np.random.randint(
-                    self.min_random_lines, self.max_random_lines + 1)
-                num_change = lines - 1
-                if num_change > 0 and len(text) > num_change:
-                    for _ in range(num_change):
-                        idx = np.random.randint(1, len(text))
-                        text = text[:idx] + '\n' + text[idx:]
+                lines = rng.integers(
+                    self.min_random_lines, self.max_random_lines + 1, n)
+                breaks = rng.random((n, max(self.max_random_lines - 1, 0)))
+                for i, text in enumerate(texts):
+                    num_change = lines[i] - 1
+                    if num_change > 0 and len(text) > num_change:
+                        for u in breaks[i, :num_change]:
+                            idx = 1 + int(u * (len(text) - 1))
+                            text = text[:idx] + '\n' + text[idx:]
+                    texts[i] = text
+
+            params['text'] = texts
 
         # Overwrite text color with random color
-        text_color = np.random.randint(0, 255, 3) \
-            if self.random_text_color else self.text_color
+        if self.random_text_color:
+            params['text_color'] = rng.integers(0, 255, (n, 3))
 
         # Overwrite background color with random color
-        background_color = np.random.randint(0, 255, 3) \
-            if self.random_background_color else self.background_color
+        if self.random_background_color:
+            params['background_color'] = rng.integers(0, 255, (n, 3))
 
         # Randomize text direction
-        direction = np.random.choice(['ltr', 'ttb']) \
-            if self.random_direction else self.direction
-
-        # Randomize align mode
-        align_mode = list(AlignMode)
-        if "\n" in text:
-            align_mode.remove(AlignMode.Scatter)
+        if self.random_direction:
+            params['direction'] = rng.choice(['ltr', 'ttb'], n)
 
-        align_mode = random.choice(align_mode) \
-            if self.random_align_mode else self.align_mode
+        # Randomize align mode, Scatter (the last mode) is not for multiline text
+        if self.random_align_mode:
+            multiline = np.array(
+                [bool(text) and '\n' in text for text in params['text']])
+            modes = rng.integers(
+                0, np.where(multiline, len(AlignMode) - 1, len(AlignMode)))
+            params['align_mode'] = [AlignMode(mode) for mode in modes]
 
         # Randomize stroke width
-        min_stroke_width = self.min_random_stroke_width
-        max_stroke_width = self.max_random_stroke_width
-        stroke_width = np.random.randint(min_stroke_width, max_stroke_width) \
-            if self.random_stroke_width else self.stroke_width
+        if self.random_stroke_width:
+            params['stroke_width'] = rng.integers(
+                self.min_random_stroke_width, self.max_random_stroke_width, n)
 
         # Randomize stroke fill
-        stroke_fill = np.random.randint(0, 255, 3) \
-            if self.random_stroke_fill else self.stroke_fill
+        if self.random_stroke_fill:
+            params['stroke_fill'] = rng.integers(0, 255, (n, 3))
 
         # Randomize spacing
-        min_spacing = self.min_random_spacing
-        max_spacing = self.max_random_spacing
-        spacing = np.random.randint(min_spacing, max_spacing) \
-            if self.random_spacing else self.spacing
-
-        if align_mode == AlignMode.Scatter and self.output_size is not None:
-            img = self.gen_scatter_image(
-                text=text,
-                font=font,
-                direction=direction,
-                text_color=text_color,
-                background_color=background_color,
-                stroke_width=stroke_width,
-                stroke_fill=stroke_fill,
-                spacing=spacing,
-            )
-
-            infos = {
-                'text': text,
-                'direction': direction,
-                'background_color': tuple(background_color.tolist()) if isinstance(background_color, np.ndarray) else background_color,
-                'text_color': tuple(text_color.tolist()) if isinstance(text_color, np.ndarray) else text_color,
-            }
-        else:
-            img, infos = text2image(
-                text=text,
-                font=font,
-                direction=direction,
-                text_color=text_color,
-                background_color=background_color,
-                stroke_width=stroke_width,
-                stroke_fill=stroke_fill,
-                spacing=spacing,
-                return_infos=True,
-                align=align_mode.name.lower()
-            )
+        if self.random_spacing:
+            params['spacing'] = rng.integers(
+                self.min_random_spacing, self.max_random_spacing, n)
+
+        return params
+
+    def _char_sampler(self, font_name: str) -> AliasSampler:
+        """Returns the alias table of the characters of a font under `char_weights`."""
+        sampler = self._char_samplers.get(font_name)
+        if sampler is None:
+            codepoints = self.font_chars_tables.codepoints(font_name)
+            idx = self._char_weight_codepoints.indices(codepoints)
+            weights = np.where(
+                idx >= 0, self._char_weight_values[np.maximum(idx, 0)], 1.0)
+            sampler = self._char_samplers[font_name] = AliasSampler(weights)
+        return sampler
+
+    def _char_rows(self, font_name: str) -> np.ndarray:
+        """Returns the indices in `chars_table` of the characters of a font."""
+        rows = self._font_char_rows.get(font_name)
+        if rows is None:
+            rows = self._font_char_rows[font_name] = self.chars_table.indices(
+                self.font_chars_tables.codepoints(font_name))
+        return rows
+
+    def _choose_covering_fonts(
+        self,
+        texts: List[str],
+        weights: np.ndarray,
+        rng: np.random.Generator,
+    ) -> np.ndarray:
+        """Draws for each text a bank font that supports all its characters.
+
+        The font bitsets of the characters of each text are intersected
+        with `np.bitwise_and.reduceat`, and the font is drawn among the
+        remaining ones, by weight. Whitespace is ignored. When no font
+        covers a text, `font_coverage_policy` decides:
+            - 'raise': raise a ValueError.
+            - 'best': draw among the fonts covering the most characters.
+            - 'random': draw among all fonts, as without the index.
+        """
+        policy = self.font_coverage_policy
+        if policy not in ('raise', 'best', 'random'):
+            raise ValueError(
+                f"font_coverage_policy must be 'raise', 'best' or 'random', got {policy!r}.")
 
-        if self.output_size is not None:
-            img = self.regularize_image(
-                img,
-                direction=direction,
-                align_mode=align_mode,
-                background_color=infos['background_color']
-            )
+        n, num_fonts = len(texts), len(weights)
 
-        if self.output_direction == OutputDirection.Vertical \
-                and infos['direction'] == 'ltr':
-            img = cb.imrotate90(img, rotate_code=cb.ROTATE.ROTATE_90)
-        elif self.output_direction == OutputDirection.Horizontal \
-                and infos['direction'] == 'ttb':
-            img = cb.imrotate90(img, rotate_code=cb.ROTATE.ROTATE_270)
+        codepoints = [
+            np.frombuffer(
+                ''.join(c for c in text or '' if not c.isspace())
+                .encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+            for text in texts
+        ]
+        lengths = np.array([len(c) for c in codepoints])
+        rows = self.chars_table.indices(
+            np.concatenate([np.zeros(0, np.uint32), *codepoints]))
+        bits = self._font_bits[np.maximum(rows, 0)]
+        bits[rows < 0] = 0
+
+        covered = np.ones((n, num_fonts), dtype=bool)
+        nonempty = np.flatnonzero(lengths)
+        if len(nonempty):
+            starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])[nonempty]
+            common = np.bitwise_and.reduceat(bits, starts, axis=0)
+            covered[nonempty] = np.unpackbits(
+                common, axis=1, count=num_fonts).astype(bool)
+
+        for i in np.flatnonzero(~(covered & (weights > 0)).any(axis=1)):
+            if policy == 'raise':
+                raise ValueError(
+                    f"No font in the bank supports all the characters of {texts[i]!r}.")
+            if policy == 'best':
+                start = lengths[:i].sum()
+                counts = np.unpackbits(
+                    bits[start:start + lengths[i]], axis=1, count=num_fonts
+                ).sum(axis=0, dtype=np.int64)
+                counts[weights <= 0] = -1
+                covered[i] = counts == counts.max()
+            else:
+                covered[i] = True
+
+        cum = np.cumsum(covered * weights, axis=1)
+        u = rng.random(n) * cum[:, -1]
+        return np.minimum((cum <= u[:, None]).sum(axis=1), num_fonts - 1)
+
+    def sample(self, index: int, text: str = None) -> np.ndarray:
+        """Renders the `index`-th image of the dataset defined by `seed`.
+
+        All randomness comes from `np.random.default_rng([seed, index])`, so
+        the same (seed, index) always gives the same image, independent of
+        any other call. This allows random access to the dataset and lets
+        it be sharded by index across processes. With `balance_chars`, the
+        texts also depend on the counts of `char_sampler` at the time of
+        the call.
+
+        Args:
+            index (int):
+                Non-negative index of the sample.
+            text (str, optional):
+                Text to render, used when `random_text` is off.
+        """
+        if self.seed is None:
+            raise ValueError(
+                '`sample` needs an integer `seed`, not a `np.random.Generator`.')
+        if index < 0:
+            raise ValueError(f'`index` must be non-negative, got {index}.')
 
-        infos.update({
-            'font_name': font_name,
-            'align_mode': align_mode,
-            'output_direction': self.output_direction,
-        })
+        rng = np.random.default_rng([self.seed, index])
+        img, infos = self._render_params(
+            self._sample_params(1, [text], rng), 0)
 
         if self.return_infos:
             return img, infos